@@ -0,0 +1,94 @@
+"""
+Dataset sintetis deterministik untuk benchmark.
+
+Dibangun dengan `utils.synthetic_data.SyntheticDataGenerator` (skema, data referensi
+dan password sama dengan data load test), dengan seed dan waktu akhir tetap serta
+distribusi uniform. Jadi dua kali build dengan preset + seed yang sama di database
+kosong menghasilkan isi tabel yang identik, dan hasil benchmark antar commit
+tidak dipengaruhi bentuk distribusi.
+"""
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+import model.models as models
+from utils.synthetic_data import Cardinality, SyntheticDataGenerator
+
+EPOCH = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+# Alias: preset benchmark memakai kardinalitas generator (tanpa report/submission log)
+Scale = Cardinality
+
+PRESETS: Dict[str, Scale] = {
+    "full": Scale(dinas=50, users=20_000, vehicles=50_000, reports=2_000_000, submissions=500_000, logs=False),
+    "medium": Scale(dinas=50, users=2_000, vehicles=5_000, reports=200_000, submissions=50_000, logs=False),
+    "small": Scale(dinas=5, users=200, vehicles=500, reports=5_000, submissions=1_000, logs=False),
+}
+
+
+@dataclass
+class DatasetInfo:
+    """Id contoh yang dipakai skenario benchmark."""
+
+    scale: Scale
+    seed: int
+    admin_id: int
+    admin_nip: str
+    kadis_id: int
+    kadis_nip: str
+    pic_id: int
+    pic_nip: str
+    dinas_id: int
+    vehicle_id: int
+    report_id: int
+    submission_id: int
+    month: int
+    year: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def build(engine: Engine, scale: Scale, seed: int = 42, batch_size: int = 5000) -> DatasetInfo:
+    models.Base.metadata.create_all(bind=engine)
+    SyntheticDataGenerator(engine, scale, seed=seed, batch_size=batch_size, end=EPOCH, uniform=True).run()
+    return describe(engine, scale, seed)
+
+
+def describe(engine: Engine, scale: Scale, seed: int = 42) -> DatasetInfo:
+    """Pilih id contoh dari dataset yang sudah ada (deterministik: PIC dengan report terbanyak, dst)."""
+    user_t, report_t, sub_t = models.User.__table__, models.Report.__table__, models.Submission.__table__
+    with engine.connect() as conn:
+        pic_id, dinas_id = conn.execute(
+            select(report_t.c.user_id, report_t.c.dinas_id)
+            .group_by(report_t.c.user_id, report_t.c.dinas_id)
+            .order_by(func.count().desc(), report_t.c.user_id)
+            .limit(1)
+        ).one()
+        vehicle_id = conn.execute(
+            select(report_t.c.vehicle_id).where(report_t.c.user_id == pic_id).order_by(report_t.c.id).limit(1)
+        ).scalar_one()
+        report_id = conn.execute(
+            select(func.max(report_t.c.id)).where(report_t.c.user_id == pic_id)
+        ).scalar_one()
+        submission_id = conn.execute(select(func.min(sub_t.c.id)).where(sub_t.c.dinas_id == dinas_id)).scalar_one()
+        kadis_id = conn.execute(
+            select(func.min(user_t.c.id))
+            .where(user_t.c.dinas_id == dinas_id, user_t.c.role == models.RoleEnum.kepala_dinas)
+        ).scalar_one()
+        admin_id = conn.execute(
+            select(func.min(user_t.c.id)).where(user_t.c.role == models.RoleEnum.admin)
+        ).scalar_one()
+        nips = dict(conn.execute(select(user_t.c.id, user_t.c.nip).where(user_t.c.id.in_((admin_id, kadis_id, pic_id)))).all())
+        latest = conn.execute(select(func.max(report_t.c.timestamp)).where(report_t.c.user_id == pic_id)).scalar_one()
+    if isinstance(latest, str):  # SQLite mengembalikan string untuk agregat datetime
+        latest = datetime.fromisoformat(latest)
+    return DatasetInfo(
+        scale=scale, seed=seed, admin_id=admin_id, admin_nip=nips[admin_id], kadis_id=kadis_id,
+        kadis_nip=nips[kadis_id], pic_id=pic_id, pic_nip=nips[pic_id], dinas_id=dinas_id, vehicle_id=vehicle_id,
+        report_id=report_id, submission_id=submission_id, month=latest.month, year=latest.year,
+    )
@@ -0,0 +1,465 @@
+"""
+Load test dengan skenario trafik PIC, Kadis dan Admin terhadap server yang berjalan.
+
+    python -m utils.synthetic_data --profile small --create-tables
+    uvicorn main:app --workers 4 --port 8000
+    python -m benchmarks.load --base-url http://localhost:8000 --concurrency 1,5,10,25,50 --duration 30
+
+Setiap level concurrency menjalankan N virtual user (closed loop: request berikutnya
+dikirim setelah response + think time). Peran tiap virtual user dipilih berbobot
+(--mix), akun diambil dari database (--database-url) dan semuanya login dengan
+--password. Skenario:
+
+- PIC: /stat/pic, paging /report/my/reports, detail report, upload report 4 foto;
+- Kadis: /stat/kadis, review massal submission & report berstatus Pending;
+- Admin: /users/detailed/search, /stat/admin per dinas.
+
+Skenario PIC/Kadis menulis ke database (upload, perubahan status); pakai database
+khusus load test atau --read-only. Hasil per level (throughput, error, p50/p95/p99
+total dan per endpoint) ditulis ke benchmarks/results/load-<waktu>.json beserta
+kurva .csv dan .svg.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import Engine
+
+import model.models as models
+from benchmarks.run import DEFAULT_RESULTS_DIR, percentile
+from utils.synthetic_data import DEFAULT_PASSWORD
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIX = {"pic": 70, "kadis": 20, "admin": 10}
+ROLE_ENUMS = {
+    "pic": models.RoleEnum.pic,
+    "kadis": models.RoleEnum.kepala_dinas,
+    "admin": models.RoleEnum.admin,
+}
+PHOTO_FIELDS = ("vehicle_physical_photo", "odometer_photo", "invoice_photo", "my_pertamina_photo")
+
+
+@dataclass(frozen=True)
+class Account:
+    id: int
+    nip: str
+    role: str
+    dinas_id: Optional[int]
+
+
+@dataclass
+class Sample:
+    name: str
+    latency_ms: float
+    ok: bool
+
+
+@dataclass
+class LoadContext:
+    accounts: Dict[str, List[Account]]
+    dinas_ids: List[int]
+    password: str = DEFAULT_PASSWORD
+    read_only: bool = False
+    think_ms: float = 500.0
+    photos: Sequence[bytes] = ()
+    samples: List[Sample] = field(default_factory=list)
+
+
+def load_accounts(engine: Engine, per_role: int = 200, seed: int = 42) -> Tuple[Dict[str, List[Account]], List[int]]:
+    """Sampel akun per peran (PIC hanya yang memegang kendaraan) dan daftar id dinas."""
+    user_t, link_t = models.User.__table__, models.user_vehicle_association
+    rng = random.Random(seed)
+    accounts: Dict[str, List[Account]] = {}
+    with engine.connect() as conn:
+        for role, enum_value in ROLE_ENUMS.items():
+            stmt = select(user_t.c.id, user_t.c.nip, user_t.c.dinas_id).where(user_t.c.role == enum_value)
+            if role == "pic":
+                stmt = stmt.where(user_t.c.id.in_(select(link_t.c.user_id)))
+            rows = conn.execute(stmt.order_by(user_t.c.id).limit(per_role * 20)).all()
+            picked = rng.sample(rows, min(per_role, len(rows)))
+            accounts[role] = [Account(id=r.id, nip=r.nip, role=role, dinas_id=r.dinas_id) for r in picked]
+        dinas_ids = list(conn.execute(select(models.Dinas.__table__.c.id)).scalars())
+    return accounts, dinas_ids
+
+
+def make_photos(count: int = 4, size: Tuple[int, int] = (1024, 768), seed: int = 0) -> List[bytes]:
+    """JPEG ber-noise supaya ukuran file mendekati foto kamera (tidak terkompresi habis)."""
+    from PIL import Image
+
+    photos = []
+    for i in range(count):
+        noise = Image.effect_noise(size, 40 + 10 * i).convert("RGB")
+        buf = io.BytesIO()
+        noise.save(buf, format="JPEG", quality=85)
+        photos.append(buf.getvalue())
+    return photos
+
+
+# ---------------- Virtual users ----------------
+
+class VirtualUser:
+    TASKS: Tuple[Tuple[int, str], ...] = ()
+
+    def __init__(self, client: httpx.AsyncClient, account: Account, ctx: LoadContext, rng: random.Random):
+        self.client = client
+        self.account = account
+        self.ctx = ctx
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+        self._tasks = [getattr(self, name) for _, name in self.TASKS]
+        self._weights = [w for w, _ in self.TASKS]
+
+    async def request(self, name: str, method: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, headers=self.headers, **kwargs)
+            ok = resp.status_code < 400
+        except httpx.HTTPError as exc:
+            logger.debug(f"{name}: {exc!r}")
+            resp, ok = None, False
+        self.ctx.samples.append(Sample(name, (time.perf_counter() - start) * 1000, ok))
+        return resp if ok else None
+
+    @staticmethod
+    def _data(resp: Optional[httpx.Response]) -> Any:
+        return resp.json().get("data") if resp is not None else None
+
+    async def login(self) -> bool:
+        resp = await self.request(
+            "POST /login", "POST", "/login", data={"username": self.account.nip, "password": self.ctx.password}
+        )
+        token = (self._data(resp) or {}).get("access_token")
+        if token:
+            self.headers = {"Authorization": f"Bearer {token}"}
+        return bool(token)
+
+    async def setup(self) -> None:
+        pass
+
+    async def think(self) -> None:
+        if self.ctx.think_ms > 0:
+            await asyncio.sleep(self.rng.expovariate(1000.0 / self.ctx.think_ms))
+
+    async def run(self, stop_at: float) -> None:
+        loop = asyncio.get_running_loop()
+        if not await self.login():
+            return
+        await self.setup()
+        while loop.time() < stop_at:
+            task = self.rng.choices(self._tasks, weights=self._weights, k=1)[0]
+            await task()
+            await self.think()
+
+
+class PicUser(VirtualUser):
+    TASKS = ((3, "stat"), (4, "page_reports"), (2, "report_detail"), (1, "upload_report"))
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.vehicle_ids: List[int] = []
+        self.report_ids: List[int] = []
+        self.has_more = True
+
+    async def setup(self) -> None:
+        page = self._data(await self.request("GET /vehicle/my/vehicles", "GET", "/vehicle/my/vehicles", params={"limit": 50}))
+        self.vehicle_ids = [v["id"] for v in (page or {}).get("list", [])]
+
+    async def stat(self) -> None:
+        await self.request("GET /stat/pic", "GET", "/stat/pic")
+
+    async def page_reports(self) -> None:
+        # Kebanyakan user hanya membuka halaman awal
+        offset = 10 * min(int(self.rng.expovariate(1.0)), 5) if self.has_more else 0
+        page = self._data(await self.request(
+            "GET /report/my/reports", "GET", "/report/my/reports", params={"limit": 10, "offset": offset}
+        ))
+        if page:
+            self.report_ids = [r["id"] for r in page["list"]] or self.report_ids
+            self.has_more = page["has_more"]
+
+    async def report_detail(self) -> None:
+        if not self.report_ids:
+            return await self.page_reports()
+        report_id = self.rng.choice(self.report_ids)
+        await self.request("GET /report/{report_id}", "GET", f"/report/{report_id}")
+
+    async def upload_report(self) -> None:
+        if self.ctx.read_only or not self.vehicle_ids or not self.ctx.photos:
+            return await self.stat()
+        liter = round(self.rng.uniform(3, 45), 2)
+        files = {
+            name: (f"{name}.jpg", self.ctx.photos[i % len(self.ctx.photos)], "image/jpeg")
+            for i, name in enumerate(PHOTO_FIELDS)
+        }
+        await self.request("POST /report", "POST", "/report", files=files, data={
+            "kode_unik": f"LOAD-{uuid.uuid4().hex[:12]}", "user_id": self.account.id,
+            "vehicle_id": self.rng.choice(self.vehicle_ids), "amount_liter": liter,
+            "amount_rupiah": round(liter * 10_000), "odometer": self.rng.randrange(1_000, 200_000),
+        })
+
+
+class KadisUser(VirtualUser):
+    TASKS = ((3, "stat"), (2, "review_submissions"), (2, "review_reports"))
+
+    async def stat(self) -> None:
+        await self.request("GET /stat/kadis", "GET", "/stat/kadis")
+
+    async def review_submissions(self) -> None:
+        page = self._data(await self.request("GET /submission", "GET", "/submission", params={"limit": 20}))
+        pending = [s["id"] for s in (page or {}).get("list", []) if s.get("status") == "Pending"]
+        if self.ctx.read_only:
+            return
+        for submission_id in pending[:10]:
+            status = "Accepted" if self.rng.random() < 0.85 else "Rejected"
+            await self.request("PATCH /submission/{submission_id}", "PATCH", f"/submission/{submission_id}", json={"status": status})
+
+    async def review_reports(self) -> None:
+        page = self._data(await self.request("GET /report", "GET", "/report", params={"limit": 20}))
+        pending = [r["id"] for r in (page or {}).get("list", []) if r.get("status") == "Pending"]
+        if self.ctx.read_only:
+            return
+        for report_id in pending[:10]:
+            status = "Accepted" if self.rng.random() < 0.9 else "Rejected"
+            await self.request(
+                "PATCH /report/{report_id}/status", "PATCH", f"/report/{report_id}/status", json={"status": status}
+            )
+
+
+class AdminUser(VirtualUser):
+    TASKS = ((2, "search_users"), (2, "stat_admin"))
+
+    async def search_users(self) -> None:
+        params: Dict[str, Any] = {"limit": 50, "offset": 50 * self.rng.randrange(3)}
+        if self.rng.random() < 0.5:
+            params["search"] = self.rng.choice(("Pegawai", "1", "2", "Budi"))
+        if self.ctx.dinas_ids and self.rng.random() < 0.5:
+            params["dinas_id"] = self.rng.choice(self.ctx.dinas_ids)
+        await self.request("GET /users/detailed/search", "GET", "/users/detailed/search", params=params)
+
+    async def stat_admin(self) -> None:
+        if not self.ctx.dinas_ids:
+            return await self.search_users()
+        await self.request("GET /stat/admin", "GET", "/stat/admin", params={"dinas_id": self.rng.choice(self.ctx.dinas_ids)})
+
+
+USER_CLASSES: Dict[str, Callable[..., VirtualUser]] = {"pic": PicUser, "kadis": KadisUser, "admin": AdminUser}
+
+
+# ---------------- Eksekusi & ringkasan ----------------
+
+def summarize(samples: List[Sample], concurrency: int, elapsed: float) -> Dict[str, Any]:
+    def stats(group: List[Sample]) -> Dict[str, Any]:
+        latencies = [s.latency_ms for s in group]
+        errors = sum(1 for s in group if not s.ok)
+        return {
+            "requests": len(group),
+            "errors": errors,
+            "rps": round(len(group) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+        }
+
+    by_name: Dict[str, List[Sample]] = {}
+    for s in samples:
+        by_name.setdefault(s.name, []).append(s)
+    total = stats(samples)
+    total["error_rate"] = round(total["errors"] / total["requests"], 4) if total["requests"] else 0.0
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        **total,
+        "endpoints": {name: stats(group) for name, group in sorted(by_name.items())},
+    }
+
+
+def assign_roles(mix: Dict[str, int], roles: Sequence[str], concurrency: int) -> List[str]:
+    """Weighted round-robin: komposisi peran tiap level mengikuti --mix, bukan undian."""
+    assigned = {r: 0 for r in roles}
+    result = []
+    for _ in range(concurrency):
+        role = min(roles, key=lambda r: ((assigned[r] + 1) / mix[r], -mix[r]))
+        assigned[role] += 1
+        result.append(role)
+    return result
+
+
+async def run_level(
+    base_url: str,
+    ctx: LoadContext,
+    concurrency: int,
+    duration: float,
+    mix: Dict[str, int] = DEFAULT_MIX,
+    seed: int = 42,
+    timeout: float = 30.0,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Dict[str, Any]:
+    rng = random.Random(seed + concurrency)
+    roles = [r for r in mix if mix[r] > 0 and ctx.accounts.get(r)]
+    if not roles:
+        raise ValueError("Tidak ada akun untuk peran di --mix; cek database dan data seed")
+    ctx.samples = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits, transport=transport) as client:
+        users = []
+        for role in assign_roles(mix, roles, concurrency):
+            pool = ctx.accounts[role]
+            account = pool[sum(1 for u in users if u.account.role == role) % len(pool)]
+            users.append(USER_CLASSES[role](client, account, ctx, random.Random(rng.random())))
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(u.run(start + duration) for u in users))
+        elapsed = loop.time() - start
+    summary = summarize(ctx.samples, concurrency, elapsed)
+    summary["roles"] = {r: sum(1 for u in users if u.account.role == r) for r in roles}
+    return summary
+
+
+def run(
+    base_url: str,
+    ctx: LoadContext,
+    levels: Sequence[int],
+    duration: float,
+    mix: Dict[str, int] = DEFAULT_MIX,
+    seed: int = 42,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Dict[str, Any]:
+    results = []
+    for level in levels:
+        logger.info(f"Level concurrency {level} selama {duration}s...")
+        summary = asyncio.run(run_level(base_url, ctx, level, duration, mix, seed, transport=transport))
+        logger.info(
+            f"  {summary['rps']} req/s, p95 {summary['p95_ms']}ms, error {summary['errors']}/{summary['requests']}"
+        )
+        results.append(summary)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "base_url": base_url,
+            "duration_s": duration,
+            "mix": mix,
+            "think_ms": ctx.think_ms,
+            "read_only": ctx.read_only,
+            "seed": seed,
+        },
+        "levels": results,
+    }
+
+
+def write_curve_csv(report: Dict[str, Any], path: Path) -> None:
+    with path.open("w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["concurrency", "rps", "p50_ms", "p95_ms", "p99_ms", "requests", "errors"])
+        for lv in report["levels"]:
+            writer.writerow([lv["concurrency"], lv["rps"], lv["p50_ms"], lv["p95_ms"], lv["p99_ms"], lv["requests"], lv["errors"]])
+
+
+def _polyline(points: List[Tuple[float, float]], box: Tuple[int, int, int, int], xmax: float, ymax: float, color: str) -> str:
+    x0, y0, w, h = box
+    coords = " ".join(f"{x0 + w * x / xmax:.1f},{y0 + h - h * y / ymax:.1f}" for x, y in points)
+    return f'<polyline fill="none" stroke="{color}" stroke-width="2" points="{coords}"/>'
+
+
+def render_svg(report: Dict[str, Any]) -> str:
+    """Dua kurva: throughput vs concurrency dan latency p50/p95/p99 vs concurrency."""
+    levels = [lv for lv in report["levels"] if lv["requests"]]
+    xmax = max((lv["concurrency"] for lv in levels), default=1)
+    charts = [
+        ("Throughput (req/s)", [("rps", "#1f77b4")]),
+        ("Latency (ms)", [("p50_ms", "#2ca02c"), ("p95_ms", "#ff7f0e"), ("p99_ms", "#d62728")]),
+    ]
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" width="900" height="340" font-family="sans-serif" font-size="12">']
+    for i, (title, series) in enumerate(charts):
+        box = (60 + i * 440, 40, 360, 240)
+        x0, y0, w, h = box
+        ymax = max((lv[key] or 0 for lv in levels for key, _ in series), default=1) or 1
+        parts.append(f'<text x="{x0}" y="24" font-weight="bold">{title}</text>')
+        parts.append(f'<rect x="{x0}" y="{y0}" width="{w}" height="{h}" fill="none" stroke="#999"/>')
+        parts.append(f'<text x="{x0 - 6}" y="{y0 + 4}" text-anchor="end">{ymax:.0f}</text>')
+        parts.append(f'<text x="{x0 - 6}" y="{y0 + h}" text-anchor="end">0</text>')
+        for lv in levels:
+            x = x0 + w * lv["concurrency"] / xmax
+            parts.append(f'<text x="{x:.1f}" y="{y0 + h + 16}" text-anchor="middle">{lv["concurrency"]}</text>')
+        for j, (key, color) in enumerate(series):
+            points = [(lv["concurrency"], lv[key] or 0) for lv in levels]
+            parts.append(_polyline(points, box, xmax, ymax, color))
+            parts.append(f'<text x="{x0 + w - 4}" y="{y0 + 16 + 14 * j}" text-anchor="end" fill="{color}">{key}</text>')
+        parts.append(f'<text x="{x0 + w / 2}" y="{y0 + h + 34}" text-anchor="middle">concurrency</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def _parse_mix(text: str) -> Dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        role, _, weight = part.partition("=")
+        if role.strip() not in USER_CLASSES or not weight.strip().isdigit():
+            raise argparse.ArgumentTypeError(f"Format mix: pic=70,kadis=20,admin=10 (bukan {text!r})")
+        mix[role.strip()] = int(weight)
+    return mix
+
+
+def main(argv: list[str] | None = None) -> None:
+    from config import get_settings
+
+    parser = argparse.ArgumentParser(description="Load test skenario PIC/Kadis/Admin SIBEDA")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--database-url", default=get_settings().database_url, help="Sumber akun untuk login")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--concurrency", default="1,5,10,25,50", help="Level concurrency dipisah koma")
+    parser.add_argument("--duration", type=float, default=30.0, help="Detik per level")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help="Bobot peran, misal pic=70,kadis=20,admin=10")
+    parser.add_argument("--think-ms", type=float, default=500.0, help="Rata-rata jeda antar aksi per user (eksponensial)")
+    parser.add_argument("--accounts-per-role", type=int, default=200)
+    parser.add_argument("--read-only", action="store_true", help="Tanpa upload dan perubahan status")
+    parser.add_argument("--photo-size", default="1024x768", help="Resolusi foto upload, misal 1600x1200")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Path JSON hasil (default: benchmarks/results/load-<waktu>.json)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    engine = create_engine(args.database_url)
+    accounts, dinas_ids = load_accounts(engine, args.accounts_per_role, args.seed)
+    engine.dispose()
+    logger.info("Akun: " + ", ".join(f"{role}={len(a)}" for role, a in accounts.items()))
+    width, _, height = args.photo_size.partition("x")
+    ctx = LoadContext(
+        accounts=accounts, dinas_ids=dinas_ids, password=args.password, read_only=args.read_only,
+        think_ms=args.think_ms, photos=() if args.read_only else make_photos(size=(int(width), int(height))),
+    )
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    try:
+        report = run(args.base_url, ctx, levels, args.duration, args.mix, args.seed)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+
+    output = Path(args.output) if args.output else DEFAULT_RESULTS_DIR / f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    write_curve_csv(report, output.with_suffix(".csv"))
+    output.with_suffix(".svg").write_text(render_svg(report))
+
+    print(f"\n{'concurrency':>11} {'req/s':>9} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'error':>7}")
+    for lv in report["levels"]:
+        print(f"{lv['concurrency']:>11} {lv['rps']:>9.1f} {lv['p50_ms'] or 0:>9.1f} {lv['p95_ms'] or 0:>9.1f} "
+              f"{lv['p99_ms'] or 0:>9.1f} {lv['errors']:>7}")
+    print(f"\nHasil: {output} (+ .csv, .svg)")
+
+
+if __name__ == "__main__":
+    main()
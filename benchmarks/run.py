@@ -0,0 +1,359 @@
+"""
+Benchmark service & route utama di atas dataset sintetis.
+
+    python -m benchmarks.run --preset small
+    python -m benchmarks.run --preset full --database-url mysql+pymysql://.../sibeda_bench
+    python -m benchmarks.run --preset small --compare benchmarks/results/baseline.json
+
+Setiap kasus diukur `--iterations` kali setelah warmup; hasil p50/p95 (ms) dan
+jumlah query per panggilan ditulis ke file JSON. Dengan --compare, kasus yang
+p95-nya naik melewati --threshold atau jumlah query-nya bertambah dianggap
+regresi dan proses keluar dengan kode 1.
+"""
+from __future__ import annotations
+import argparse
+import contextvars
+import json
+import logging
+import math
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, inspect as sa_inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+import model.models as models
+from benchmarks.dataset import PRESETS, DatasetInfo, Scale, build, describe
+from utils import sql_stats
+
+logger = logging.getLogger(__name__)
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_DATA_DIR = BENCH_DIR / ".data"
+DEFAULT_RESULTS_DIR = BENCH_DIR / "results"
+
+
+@dataclass
+class Case:
+    name: str
+    kind: str  # "service" | "route"
+    run: Callable[..., Any]
+    role: Optional[str] = None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; cukup untuk sampel kecil dan stabil antar run."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+# --- kasus ------------------------------------------------------------------
+
+def service_cases() -> List[Case]:
+    from services.report_service import ReportService
+    from services.stat_service import StatService
+    from services.submission_service import SubmissionService
+    from services.sync_service import SyncService
+    from services.user_service import UserService
+    from services.vehicle_service import VehicleService
+    from utils.reference_cache import dinas_cache, vehicle_type_cache
+
+    def svc(name, fn):
+        return Case(name=name, kind="service", run=fn)
+
+    return [
+        svc("ReportService.list[admin,50]", lambda db, i, u: ReportService.list(db, None, None, None, None, None, 50, 0, u["admin"], None)),
+        svc("ReportService.list[dinas,50]", lambda db, i, u: ReportService.list(db, None, None, None, None, i.dinas_id, 50, 0, u["kadis"], None)),
+        svc("ReportService.get_my_reports[10]", lambda db, i, u: ReportService.get_my_reports(db, i.pic_id, None, None, None, 10, 0)),
+        svc("ReportService.get_my_reports[100]", lambda db, i, u: ReportService.get_my_reports(db, i.pic_id, None, None, None, 100, 0)),
+        svc("ReportService.get", lambda db, i, u: ReportService.get(db, i.report_id)),
+        svc("ReportService.get_report_logs", lambda db, i, u: ReportService.get_report_logs(db, i.report_id)),
+        svc("SubmissionService.list[dinas,50]", lambda db, i, u: SubmissionService.list(db, None, None, None, None, None, i.dinas_id, 50, 0, u["kadis"])),
+        svc("SubmissionService.get_my_submissions[10]", lambda db, i, u: SubmissionService.get_my_submissions(db, i.pic_id, None, None, 10, 0)),
+        svc("SubmissionService.get_monthly_summary", lambda db, i, u: SubmissionService.get_monthly_summary(db, i.month, i.year)),
+        svc("SubmissionService.get_monthly_details_optimized", lambda db, i, u: SubmissionService.get_monthly_details_optimized(db, i.month, i.year)),
+        svc("StatService.get_pic_stats", lambda db, i, u: StatService.get_pic_stats(db, i.pic_id)),
+        svc("StatService.get_kadis_stats", lambda db, i, u: StatService.get_kadis_stats(db, i.dinas_id)),
+        svc("StatService.get_admin_stats", lambda db, i, u: StatService.get_admin_stats(db, i.dinas_id)),
+        svc("VehicleService.list[50]", lambda db, i, u: VehicleService.list(db, 50, 0, None)),
+        svc("VehicleService.get_my_vehicles", lambda db, i, u: VehicleService.get_my_vehicles(db, i.pic_id, 10, 0)),
+        svc("VehicleService.get_vehicle_detail", lambda db, i, u: VehicleService.get_vehicle_detail(db, i.vehicle_id, i.pic_id)),
+        svc("VehicleService.get_by_dinas[50]", lambda db, i, u: VehicleService.get_by_dinas(db, i.dinas_id, 50, 0)),
+        svc("UserService.search_users_detailed[100]", lambda db, i, u: UserService.search_users_detailed(db, None, None, i.dinas_id, None, None, 100, 0)),
+        svc("UserService.count_users", lambda db, i, u: UserService.count_users(db, None, None, None, None)),
+        svc("UserService.get_user_detail_complete", lambda db, i, u: UserService.get_user_detail_complete(db, i.pic_id)),
+        svc("UserService.get_user_balance", lambda db, i, u: UserService.get_user_balance(db, i.pic_id)),
+        svc("SyncService.changes[reports]", lambda db, i, u: SyncService.changes(db, "reports", u["pic"], None, 500)),
+        # /dinas dan /vehicle-type dilayani dari cache referensi: hit biasa dan load ulang setelah invalidasi
+        svc("dinas_cache.get", lambda db, i, u: dinas_cache.get(db)),
+        svc("dinas_cache.get[miss]", lambda db, i, u: (dinas_cache.invalidate(), dinas_cache.get(db))),
+        svc("vehicle_type_cache.get", lambda db, i, u: vehicle_type_cache.get(db)),
+        svc("vehicle_type_cache.get[miss]", lambda db, i, u: (vehicle_type_cache.invalidate(), vehicle_type_cache.get(db))),
+    ]
+
+
+def route_cases(info: DatasetInfo) -> List[Case]:
+    def route(role, path):
+        return Case(name=f"GET {path.split('?')[0]}" + (f"?{path.split('?')[1]}" if "?" in path else ""),
+                    kind="route", run=lambda client, headers, p=path: client.get(p, headers=headers), role=role)
+
+    return [
+        route("pic", "/stat/pic"),
+        route("pic", "/report/my/reports?limit=10"),
+        route("pic", "/report/my/reports?limit=100"),
+        route("pic", f"/report/my/reports/{info.report_id}"),
+        route("pic", "/vehicle/my/vehicles"),
+        route("pic", "/submission/my/submissions"),
+        route("pic", "/wallet/my"),
+        route("pic", "/sync/reports"),
+        route("kadis", "/stat/kadis"),
+        route("kadis", "/report?limit=50"),
+        route("kadis", "/submission?limit=50"),
+        route("admin", f"/stat/admin?dinas_id={info.dinas_id}"),
+        route("admin", "/users/detailed/search?limit=100"),
+        route("admin", "/vehicle?limit=50"),
+        route("admin", f"/submission/monthly/summary?month={info.month}&year={info.year}"),
+        route("admin", "/dinas"),
+        route("admin", "/vehicle-type"),
+    ]
+
+
+# --- eksekusi ---------------------------------------------------------------
+
+def _measure(call: Callable[[], Optional[int]], iterations: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        call()
+    durations: List[float] = []
+    queries: List[int] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        count = call()
+        durations.append((time.perf_counter() - start) * 1000)
+        if count is not None:
+            queries.append(count)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(durations, 50), 3),
+        "p95_ms": round(percentile(durations, 95), 3),
+        "mean_ms": round(sum(durations) / len(durations), 3),
+        "max_ms": round(max(durations), 3),
+        "queries": max(queries) if queries else None,
+    }
+
+
+def run_services(SessionBench, info: DatasetInfo, cases: List[Case], iterations: int, warmup: int) -> Dict[str, Any]:
+    with SessionBench() as db:
+        users = {
+            "admin": db.get(models.User, info.admin_id),
+            "kadis": db.get(models.User, info.kadis_id),
+            "pic": db.get(models.User, info.pic_id),
+        }
+        db.expunge_all()
+
+    results: Dict[str, Any] = {}
+    for case in cases:
+        def call(case=case):
+            def body():
+                stats = sql_stats.begin_request(case.name)
+                with SessionBench() as db:
+                    bound = {role: db.merge(user, load=False) for role, user in users.items()}
+                    case.run(db, info, bound)
+                return stats.count
+            # Context baru per panggilan agar stats tidak bocor antar kasus
+            return contextvars.copy_context().run(body)
+        results[case.name] = {"kind": "service", **_measure(call, iterations, warmup)}
+        logger.info(f"{case.name}: p95 {results[case.name]['p95_ms']}ms, {results[case.name]['queries']} query")
+    return results
+
+
+def run_routes(SessionBench, info: DatasetInfo, cases: List[Case], iterations: int, warmup: int) -> Dict[str, Any]:
+    from fastapi.testclient import TestClient
+
+    import controller.auth as auth
+    import middleware
+    from database.database import get_db
+    from main import app
+
+    def override_get_db():
+        db = SessionBench()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    middleware.console.quiet = True  # log per request mendominasi waktu bila tidak dimatikan
+    previous_override = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    tokens = {
+        role: auth.create_access_token({"sub": nip, "role": role})
+        for role, nip in (("admin", info.admin_nip), ("kadis", info.kadis_nip), ("pic", info.pic_nip))
+    }
+    results: Dict[str, Any] = {}
+    try:
+        client = TestClient(app)
+        for case in cases:
+            headers = {"Authorization": f"Bearer {tokens[case.role]}"}
+            status: Dict[str, int] = {}
+
+            def call(case=case, headers=headers):
+                resp = case.run(client, headers)
+                status["code"] = resp.status_code
+                header = resp.headers.get("X-DB-Queries")
+                return int(header) if header is not None else None
+
+            results[case.name] = {"kind": "route", "role": case.role, **_measure(call, iterations, warmup)}
+            results[case.name]["status"] = status.get("code")
+            if status.get("code") != 200:
+                logger.warning(f"{case.name}: status {status.get('code')}")
+            logger.info(f"{case.name}: p95 {results[case.name]['p95_ms']}ms, {results[case.name]['queries']} query")
+    finally:
+        if previous_override is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous_override
+        middleware.console.quiet = False
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Daftar regresi: p95 naik > threshold kali lipat, atau jumlah query bertambah."""
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = cur["p95_ms"] / base["p95_ms"] if base["p95_ms"] else 1.0
+        flag = ""
+        if ratio > threshold:
+            flag = f"p95 {base['p95_ms']} -> {cur['p95_ms']}ms (x{ratio:.2f})"
+        if base.get("queries") is not None and cur.get("queries") is not None and cur["queries"] > base["queries"]:
+            flag += f"{'; ' if flag else ''}query {base['queries']} -> {cur['queries']}"
+        if flag:
+            regressions.append(f"{name}: {flag}")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=BENCH_DIR, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def prepare(database_url: str, scale: Scale, seed: int, rebuild: bool) -> tuple[Engine, DatasetInfo]:
+    if database_url.startswith("sqlite") and rebuild:
+        db_file = database_url.split("///", 1)[-1]
+        Path(db_file).unlink(missing_ok=True)
+    engine = create_engine(database_url, connect_args={"check_same_thread": False} if database_url.startswith("sqlite") else {})
+    if sa_inspect(engine).has_table(models.Report.__tablename__) and not rebuild:
+        logger.info("Memakai dataset yang sudah ada (pakai --rebuild untuk membuat ulang)")
+        info = describe(engine, scale, seed)
+    else:
+        logger.info(f"Membangun dataset {scale}...")
+        info = build(engine, scale, seed=seed)
+    sql_stats.install(engine)
+    return engine, info
+
+
+def run(
+    database_url: str,
+    scale: Scale,
+    preset: str = "custom",
+    seed: int = 42,
+    iterations: int = 30,
+    warmup: int = 3,
+    only: Optional[str] = None,
+    kinds: tuple = ("service", "route"),
+    rebuild: bool = False,
+) -> Dict[str, Any]:
+    engine, info = prepare(database_url, scale, seed, rebuild)
+    SessionBench = sessionmaker(bind=engine, autoflush=False)
+
+    def selected(cases: List[Case]) -> List[Case]:
+        return [c for c in cases if not only or only in c.name]
+
+    results: Dict[str, Any] = {}
+    if "service" in kinds:
+        results.update(run_services(SessionBench, info, selected(service_cases()), iterations, warmup))
+    if "route" in kinds:
+        results.update(run_routes(SessionBench, info, selected(route_cases(info)), iterations, warmup))
+    engine.dispose()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "dialect": engine.dialect.name,
+            "preset": preset,
+            "scale": info.to_dict()["scale"],
+            "seed": seed,
+            "iterations": iterations,
+            "warmup": warmup,
+            "sample_ids": {k: v for k, v in info.to_dict().items() if k not in ("scale", "seed")},
+        },
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark latency & jumlah query service/route SIBEDA")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--database-url", help="Default: SQLite di benchmarks/.data/bench-<preset>.db")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", help="Hanya kasus yang namanya mengandung teks ini")
+    parser.add_argument("--kind", choices=("all", "service", "route"), default="all")
+    parser.add_argument("--rebuild", action="store_true", help="Bangun ulang dataset walaupun sudah ada")
+    parser.add_argument("--output", help="Path file JSON hasil (default: benchmarks/results/<waktu>-<preset>.json)")
+    parser.add_argument("--compare", help="File JSON hasil run sebelumnya sebagai baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Rasio p95 yang dianggap regresi")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    database_url = args.database_url
+    if not database_url:
+        DEFAULT_DATA_DIR.mkdir(parents=True, exist_ok=True)
+        database_url = f"sqlite:///{DEFAULT_DATA_DIR / f'bench-{args.preset}.db'}"
+    kinds = ("service", "route") if args.kind == "all" else (args.kind,)
+
+    report = run(
+        database_url, PRESETS[args.preset], preset=args.preset, seed=args.seed, iterations=args.iterations,
+        warmup=args.warmup, only=args.only, kinds=kinds, rebuild=args.rebuild,
+    )
+
+    output = Path(args.output) if args.output else DEFAULT_RESULTS_DIR / (
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{args.preset}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\n{'kasus':<55} {'p50_ms':>9} {'p95_ms':>9} {'query':>6}")
+    for name, r in report["results"].items():
+        print(f"{name:<55} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['queries'] if r['queries'] is not None else '-':>6}")
+    print(f"\nHasil: {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("\nREGRESI:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("Tidak ada regresi dibanding baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,56 @@ class Settings(BaseModel):
     smtp_tls: bool = True
     mail_from: str | None = None
     mail_from_name: str | None = None
+    image_processing_enabled: bool = True
+    image_workers: int = 2
+    image_max_dimension: int = 1600
+    image_thumb_dimension: int = 320
+    storage_backend: str = "local"
+    s3_bucket: str | None = None
+    s3_endpoint_url: str | None = None
+    s3_region: str | None = None
+    s3_access_key: str | None = None
+    s3_secret_key: str | None = None
+    s3_public_base_url: str | None = None
+    s3_presign_expires: int = 3600
+    s3_multipart_threshold_mb: int = 8
+    assets_accel_redirect_prefix: str | None = None
+    code_store_backend: str = "auto"
+    redis_url: str | None = None
+    qr_stateless_tokens: bool = True
+    qr_image_cache_size: int = 512
+    maintenance_jobs_enabled: bool = True
+    code_purge_interval_seconds: int = 300
+    code_purge_batch_size: int = 500
+    reference_cache_ttl_seconds: int = 300
+    sql_stats_enabled: bool = True
+    sql_stats_max_queries: int = 50
+    sql_stats_max_db_ms: float = 500.0
+    sql_n_plus_one_threshold: int = 10
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    metrics_enabled: bool = True
+    metrics_token: str | None = None
+    slow_query_log_enabled: bool = False
+    slow_query_threshold_ms: float = 200.0
+    slow_query_log_path: str = "logs/slow_queries.jsonl"
+    slow_query_log_max_bytes: int = 10 * 1024 * 1024
+    slow_query_log_backups: int = 5
+    slow_query_explain: bool = True
+    profiling_enabled: bool = False
+    profiling_artifact_dir: str = "logs/profiles"
+    profiling_interval_ms: float = 5.0
+    profiling_max_artifacts: int = 50
+    tracing_enabled: bool = False
+    tracing_exporter: str = "file"
+    tracing_file_path: str = "logs/traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318"
+    tracing_sample_ratio: float = 1.0
+    tracing_service_name: str = "sibeda-api"
+    schema_check_enabled: bool = True
+    sync_safety_lag_seconds: float = 5.0
 
     @staticmethod
     def load() -> "Settings":
@@ -53,6 +103,56 @@ class Settings(BaseModel):
             smtp_tls=os.getenv("SMTP_TLS", "true").lower() == "true",
             mail_from=os.getenv("MAIL_FROM"),
             mail_from_name=os.getenv("MAIL_FROM_NAME"),
+            image_processing_enabled=os.getenv("IMAGE_PROCESSING_ENABLED", "true").lower() == "true",
+            image_workers=int(os.getenv("IMAGE_WORKERS", "2")),
+            image_max_dimension=int(os.getenv("IMAGE_MAX_DIMENSION", "1600")),
+            image_thumb_dimension=int(os.getenv("IMAGE_THUMB_DIMENSION", "320")),
+            storage_backend=os.getenv("STORAGE_BACKEND", "local").lower(),
+            s3_bucket=os.getenv("S3_BUCKET"),
+            s3_endpoint_url=os.getenv("S3_ENDPOINT_URL"),
+            s3_region=os.getenv("S3_REGION"),
+            s3_access_key=os.getenv("S3_ACCESS_KEY"),
+            s3_secret_key=os.getenv("S3_SECRET_KEY"),
+            s3_public_base_url=os.getenv("S3_PUBLIC_BASE_URL"),
+            s3_presign_expires=int(os.getenv("S3_PRESIGN_EXPIRES", "3600")),
+            s3_multipart_threshold_mb=int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8")),
+            assets_accel_redirect_prefix=os.getenv("ASSETS_ACCEL_REDIRECT_PREFIX") or None,
+            code_store_backend=os.getenv("CODE_STORE_BACKEND", "auto").lower(),
+            redis_url=os.getenv("REDIS_URL") or None,
+            qr_stateless_tokens=os.getenv("QR_STATELESS_TOKENS", "true").lower() == "true",
+            qr_image_cache_size=int(os.getenv("QR_IMAGE_CACHE_SIZE", "512")),
+            maintenance_jobs_enabled=os.getenv("MAINTENANCE_JOBS_ENABLED", "true").lower() == "true",
+            code_purge_interval_seconds=int(os.getenv("CODE_PURGE_INTERVAL_SECONDS", "300")),
+            code_purge_batch_size=int(os.getenv("CODE_PURGE_BATCH_SIZE", "500")),
+            reference_cache_ttl_seconds=int(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300")),
+            sql_stats_enabled=os.getenv("SQL_STATS_ENABLED", "true").lower() == "true",
+            sql_stats_max_queries=int(os.getenv("SQL_STATS_MAX_QUERIES", "50")),
+            sql_stats_max_db_ms=float(os.getenv("SQL_STATS_MAX_DB_MS", "500")),
+            sql_n_plus_one_threshold=int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10")),
+            compression_enabled=os.getenv("COMPRESSION_ENABLED", "true").lower() == "true",
+            compression_min_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+            compression_gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+            compression_brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+            metrics_enabled=os.getenv("METRICS_ENABLED", "true").lower() == "true",
+            metrics_token=os.getenv("METRICS_TOKEN") or None,
+            slow_query_log_enabled=os.getenv("SLOW_QUERY_LOG_ENABLED", "false").lower() == "true",
+            slow_query_threshold_ms=float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200")),
+            slow_query_log_path=os.getenv("SLOW_QUERY_LOG_PATH", "logs/slow_queries.jsonl"),
+            slow_query_log_max_bytes=int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            slow_query_log_backups=int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5")),
+            slow_query_explain=os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true",
+            profiling_enabled=os.getenv("PROFILING_ENABLED", "false").lower() == "true",
+            profiling_artifact_dir=os.getenv("PROFILING_ARTIFACT_DIR", "logs/profiles"),
+            profiling_interval_ms=float(os.getenv("PROFILING_INTERVAL_MS", "5")),
+            profiling_max_artifacts=int(os.getenv("PROFILING_MAX_ARTIFACTS", "50")),
+            tracing_enabled=os.getenv("TRACING_ENABLED", "false").lower() == "true",
+            tracing_exporter=os.getenv("TRACING_EXPORTER", "file").lower(),
+            tracing_file_path=os.getenv("TRACING_FILE_PATH", "logs/traces.jsonl"),
+            tracing_otlp_endpoint=os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318"),
+            tracing_sample_ratio=float(os.getenv("TRACING_SAMPLE_RATIO", "1.0")),
+            tracing_service_name=os.getenv("TRACING_SERVICE_NAME", "sibeda-api"),
+            schema_check_enabled=os.getenv("SCHEMA_CHECK_ENABLED", "true").lower() == "true",
+            sync_safety_lag_seconds=float(os.getenv("SYNC_SAFETY_LAG_SECONDS", "5")),
         )
 
 @lru_cache
@@ -14,6 +14,7 @@ from sqlalchemy.orm import Session
 from config import get_settings
 from database import database
 from model import models
+from utils import tracing
 
 # --- Konfigurasi Passlib & Bcrypt Shim ---
 try:
@@ -47,15 +48,17 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Memverifikasi apakah password plain cocok dengan hash."""
-    try:
-        return pwd_context.verify(plain_password, hashed_password)
-    except UnknownHashError:
-        return False
+    with tracing.span("auth.verify_password"):
+        try:
+            return pwd_context.verify(plain_password, hashed_password)
+        except UnknownHashError:
+            return False
 
 
 def get_password_hash(password: str) -> str:
     """Membuat hash dari password plain."""
-    return pwd_context.hash(password)
+    with tracing.span("auth.hash_password"):
+        return pwd_context.hash(password)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -72,6 +75,14 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
+    """Claim JWT yang valid (signature & exp), atau None. Tanpa query database."""
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+
 # --- Core Logic ---
 
 def authenticate_user(db: Session, nip: str, password: str) -> Optional[models.User]:
@@ -0,0 +1,215 @@
+"""
+Versi skema database dan migration berurutan.
+
+Migration dijalankan sekali per deploy lewat CLI, bukan oleh worker:
+
+    python -m database.migrations upgrade    # database baru: create_all + stamp head
+    python -m database.migrations current
+    python -m database.migrations check      # exit 1 bila versi != head (untuk pipeline deploy)
+
+Worker hanya memanggil `check()` saat startup (satu SELECT ke tabel schema_version)
+dan menolak jalan bila versinya tidak sama dengan HEAD.
+
+Menambah perubahan skema: ubah model di model/models.py, lalu tambahkan Migration
+baru di akhir MIGRATIONS dengan versi berikutnya. Fungsi upgrade-nya mengubah
+database yang sudah ada (ALTER/CREATE INDEX); database baru langsung dibuat dari
+model terbaru dan di-stamp ke HEAD tanpa menjalankan migration satu per satu.
+"""
+from __future__ import annotations
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+import model.models as models
+
+logger = logging.getLogger(__name__)
+
+# Sengaja di luar models.Base.metadata: create_all milik aplikasi/test tidak ikut membuatnya
+version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    version_metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def _baseline(conn: Connection) -> None:
+    models.Base.metadata.create_all(bind=conn)
+
+
+def _tombstone_scope(conn: Connection) -> None:
+    # Cek kolom/index dulu: DDL MySQL auto-commit, jadi migration ini harus aman diulang
+    columns = {c["name"] for c in inspect(conn).get_columns("tombstones")}
+    for name in ("dinas_id", "user_id"):
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE tombstones ADD COLUMN {name} INTEGER NULL"))
+    for index in models.Tombstone.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+
+
+MIGRATIONS: List[Migration] = [
+    # Skema models.py per Oktober 2026, setara semua migration_*.sql di root repo
+    Migration(1, "baseline", _baseline),
+    Migration(2, "tombstone scope (dinas_id, user_id)", _tombstone_scope),
+]
+
+
+def head() -> int:
+    return MIGRATIONS[-1].version
+
+
+def current_version(engine: Engine) -> Optional[int]:
+    """Versi terakhir yang tercatat; None bila tabel schema_version belum ada."""
+    with engine.connect() as conn:  # gagal koneksi tetap raise apa adanya
+        try:
+            return conn.execute(select(func.max(schema_version.c.version))).scalar()
+        except DBAPIError:
+            return None
+
+
+def check(engine: Engine) -> int:
+    """Satu query saat startup worker; raise SchemaVersionError bila versi != HEAD."""
+    current = current_version(engine)
+    if current == head():
+        return current
+    if current is None:
+        state = "belum ada versi skema"
+    elif current < head():
+        state = f"skema versi {current}, aplikasi butuh {head()}"
+    else:
+        state = f"skema versi {current} lebih baru dari aplikasi ({head()})"
+    raise SchemaVersionError(
+        f"Database tidak sesuai ({state}); jalankan `python -m database.migrations upgrade` "
+        "dengan kode versi ini sebelum menjalankan server"
+    )
+
+
+def _record(conn: Connection, migrations: List[Migration]) -> None:
+    now = datetime.now(timezone.utc)
+    conn.execute(insert(schema_version), [
+        {"version": m.version, "name": m.name, "applied_at": now} for m in migrations
+    ])
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    """Jalankan migration yang belum tercatat sampai `target` (default HEAD)."""
+    target = head() if target is None else target
+    if target not in {m.version for m in MIGRATIONS}:
+        raise SchemaVersionError(f"Versi {target} tidak dikenal (HEAD = {head()})")
+
+    version_metadata.create_all(bind=engine)
+    current = current_version(engine)
+    if current is None:
+        existing = set(inspect(engine).get_table_names()) & set(models.Base.metadata.tables)
+        if existing:
+            raise SchemaVersionError(
+                f"Database sudah berisi tabel aplikasi ({len(existing)}) tanpa versi skema. Pastikan semua "
+                "migration_*.sql sudah dijalankan, lalu `python -m database.migrations stamp 1` dan `upgrade`"
+            )
+        if target == head():
+            # Database baru: skema terbaru langsung dari model
+            with engine.begin() as conn:
+                _baseline(conn)
+                _record(conn, MIGRATIONS)
+            logger.info(f"Skema dibuat dari model dan di-stamp ke versi {target}")
+            return list(MIGRATIONS)
+        current = 0
+    if current > target:
+        raise SchemaVersionError(f"Skema versi {current} lebih baru dari target {target}; downgrade tidak didukung")
+
+    applied = []
+    for migration in MIGRATIONS:
+        if not current < migration.version <= target:
+            continue
+        logger.info(f"Migration {migration.version}: {migration.name}")
+        # Satu transaksi per migration. Catatan: DDL di MySQL auto-commit, jadi migration
+        # yang gagal di tengah harus aman dijalankan ulang (IF NOT EXISTS, cek kolom dulu).
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            _record(conn, [migration])
+        applied.append(migration)
+    return applied
+
+
+def stamp(engine: Engine, version: int) -> None:
+    """Tandai database sudah di versi tertentu tanpa menjalankan migration (adopsi database lama)."""
+    if version not in {m.version for m in MIGRATIONS}:
+        raise SchemaVersionError(f"Versi {version} tidak dikenal (HEAD = {head()})")
+    version_metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(schema_version.delete())
+        _record(conn, [m for m in MIGRATIONS if m.version <= version])
+
+
+def history(engine: Engine) -> List[dict]:
+    with engine.connect() as conn:
+        try:
+            rows = conn.execute(select(schema_version).order_by(schema_version.c.version)).mappings().all()
+        except DBAPIError:
+            rows = []
+    applied = {r["version"]: r["applied_at"] for r in rows}
+    return [{"version": m.version, "name": m.name, "applied_at": applied.get(m.version)} for m in MIGRATIONS]
+
+
+def main(argv: list[str] | None = None) -> None:
+    from sqlalchemy import create_engine
+
+    from config import get_settings
+
+    parser = argparse.ArgumentParser(description="Migration skema database SIBEDA")
+    parser.add_argument("--database-url", default=get_settings().database_url)
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("upgrade", help="Jalankan migration yang belum diterapkan")
+    up.add_argument("--to", type=int, help="Versi target (default HEAD)")
+    st = sub.add_parser("stamp", help="Catat versi tanpa menjalankan migration")
+    st.add_argument("version", help="Nomor versi atau 'head'")
+    sub.add_parser("current", help="Tampilkan versi database dan HEAD")
+    sub.add_parser("history", help="Daftar migration beserta waktu diterapkan")
+    sub.add_parser("check", help="Exit 1 bila versi database != HEAD")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    engine = create_engine(args.database_url)
+    try:
+        if args.command == "upgrade":
+            applied = upgrade(engine, args.to)
+            logger.info(f"{len(applied)} migration diterapkan, versi sekarang {current_version(engine)}")
+        elif args.command == "stamp":
+            version = head() if args.version == "head" else int(args.version)
+            stamp(engine, version)
+            logger.info(f"Database di-stamp ke versi {version}")
+        elif args.command == "current":
+            print(f"database: {current_version(engine)}  head: {head()}")
+        elif args.command == "history":
+            for m in history(engine):
+                applied_at = m["applied_at"].isoformat() if m["applied_at"] else "belum"
+                print(f"{m['version']:>4}  {m['name']:<40} {applied_at}")
+        else:
+            logger.info(f"Skema versi {check(engine)} sesuai HEAD")
+    except SchemaVersionError as exc:
+        raise SystemExit(str(exc))
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Dict
+import sys
+from typing import Dict, Tuple
 
 # Katalog pesan multibahasa.
 # Key konvensi snake_case.
@@ -250,26 +251,55 @@ _MESSAGES: Dict[str, Dict[str, str]] = {
 DEFAULT_LANG = "id"
 
 
+# --- Katalog terkompilasi ---
+# Dibangun sekali saat import: setiap key dapat ID integer, setiap bahasa menjadi
+# tuple pesan yang key kosongnya sudah diisi fallback DEFAULT_LANG (lalu key itu sendiri).
+MESSAGE_KEYS: Tuple[str, ...] = tuple(
+    dict.fromkeys(key for lang in (DEFAULT_LANG, *_MESSAGES) for key in _MESSAGES[lang])
+)
+KEY_IDS: Dict[str, int] = {key: i for i, key in enumerate(MESSAGE_KEYS)}
+
+
+def _compile(lang: str) -> Tuple[str, ...]:
+    table, default = _MESSAGES[lang], _MESSAGES[DEFAULT_LANG]
+    return tuple(sys.intern(table.get(key) or default.get(key) or key) for key in MESSAGE_KEYS)
+
+
+_CATALOG: Dict[str, Tuple[str, ...]] = {sys.intern(lang): _compile(lang) for lang in _MESSAGES}
+# Lookup kode bahasa apa adanya dulu (kasus umum), baru lower() bila perlu
+_LANG_CODES: Dict[str, str] = {lang: lang for lang in _CATALOG}
+
+
 def normalize_lang(lang: str | None) -> str:
     if not lang:
         return DEFAULT_LANG
-    lang = lang.lower()
-    if lang not in _MESSAGES:
-        return DEFAULT_LANG
-    return lang
+    code = _LANG_CODES.get(lang)
+    if code is None:
+        code = _LANG_CODES.get(lang.lower(), DEFAULT_LANG)
+    return code
+
+
+def message_id(key: str) -> int:
+    """ID integer untuk key pesan; dipakai caller yang memanggil pesan yang sama berulang kali."""
+    return KEY_IDS[key]
+
+
+def get_message_by_id(key_id: int, lang: str | None = None) -> str:
+    return _CATALOG[normalize_lang(lang)][key_id]
 
 
 def get_message(key: str, lang: str | None = None) -> str:
-    lang_code = normalize_lang(lang)
-    # fallback ke default bila key tidak ditemukan di bahasa yg dipilih
-    return _MESSAGES.get(lang_code, {}).get(key, _MESSAGES[DEFAULT_LANG].get(key, key))
+    key_id = KEY_IDS.get(key)
+    if key_id is None:
+        return key
+    return _CATALOG[normalize_lang(lang)][key_id]
 
 
 def available_languages() -> list[str]:
-    return list(_MESSAGES.keys())
+    return list(_CATALOG.keys())
 
 
 def is_supported_lang(lang: str | None) -> bool:
     if not lang:
         return False
-    return lang.lower() in _MESSAGES
+    return lang in _LANG_CODES or lang.lower() in _LANG_CODES
@@ -1,6 +1,5 @@
 import os
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 import model.models as models
 import logging
 from rich.logging import RichHandler
@@ -10,10 +9,22 @@ from routers import submission as submission_router
 from routers import qr as qr_router
 from routers import stat as stat_router
 from routers import seeder as seeder_router
+from routers import system as system_router
+from routers import sync as sync_router
+from database import migrations
 from database.database import SessionLocal, engine
+from utils import metrics, slow_query, sql_stats, tracing
+from utils.profiler import ProfilingMiddleware
 from contextlib import asynccontextmanager
-from middleware import RequestLoggingMiddleware, LanguagePrefixMiddleware, add_exception_handlers
+from middleware import RequestLoggingMiddleware, LanguagePrefixMiddleware, CompressionMiddleware, add_exception_handlers
 from pathlib import Path
+from utils import image_processing
+from utils.static_assets import AssetStaticFiles
+from utils.scheduler import PeriodicJob, scheduler
+from utils.code_store import purge_expired_codes
+from utils.reference_cache import warm_reference_caches
+from config import get_settings
+from functools import partial
 
 # --- TAMBAHKAN KONFIGURASI INI SEBELUM APP DIBUAT ---
 logging.basicConfig(
@@ -29,12 +40,34 @@ logging.basicConfig(
         )
     ]
 )
+def register_maintenance_jobs() -> None:
+    """Daftarkan job maintenance periodik ke scheduler (idempotent)."""
+    settings = get_settings()
+    if "purge_expired_codes" not in scheduler.jobs:
+        scheduler.register(PeriodicJob(
+            name="purge_expired_codes",
+            func=partial(purge_expired_codes, settings.code_purge_batch_size),
+            interval_seconds=settings.code_purge_interval_seconds,
+        ))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: ensure tables exist (development). In production, prefer migrations.
-    models.Base.metadata.create_all(bind=engine)
+    # Startup: skema dibuat/diubah oleh `python -m database.migrations upgrade`, worker hanya
+    # mengecek versinya (satu query) dan menolak jalan bila tidak sama dengan HEAD
+    if get_settings().schema_check_enabled:
+        migrations.check(engine)
+    with SessionLocal() as db:
+        warm_reference_caches(db)
+    if get_settings().maintenance_jobs_enabled:
+        register_maintenance_jobs()
+        scheduler.start()
     yield
-    # Shutdown: add cleanup if needed.
+    # Shutdown: hentikan job periodik, lalu tunggu antrean image processing selesai
+    await scheduler.stop()
+    image_processing.shutdown(wait=True)
+    metrics.mark_process_dead()
+    slow_query.shutdown()
+    tracing.shutdown()
 
 app = FastAPI(title="SIBEDA API", version="0.1.0", lifespan=lifespan)
 
@@ -48,11 +81,45 @@ st_abs_file_path = os.path.join(script_dir, "assets")
 # app.mount("/assets", StaticFiles(directory=st_abs_file_path), name="assets")
 assets_path = Path("assets")
 if assets_path.exists():
-    app.mount("/assets", StaticFiles(directory=st_abs_file_path), name="assets")
+    app.mount("/assets", AssetStaticFiles(directory=st_abs_file_path), name="assets")
 
 # Register middleware
+_settings = get_settings()
+if _settings.sql_stats_enabled:
+    sql_stats.install(engine)
+if _settings.slow_query_log_enabled:
+    slow_query.install(
+        engine,
+        path=_settings.slow_query_log_path,
+        threshold_ms=_settings.slow_query_threshold_ms,
+        explain=_settings.slow_query_explain,
+        max_bytes=_settings.slow_query_log_max_bytes,
+        backup_count=_settings.slow_query_log_backups,
+    )
+if _settings.profiling_enabled:
+    # Paling dalam: berjalan di task yang sama dengan router, dan request_id sudah ada
+    app.add_middleware(
+        ProfilingMiddleware,
+        artifact_dir=_settings.profiling_artifact_dir,
+        interval_ms=_settings.profiling_interval_ms,
+        max_artifacts=_settings.profiling_max_artifacts,
+    )
+if _settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=_settings.compression_min_size,
+        gzip_level=_settings.compression_gzip_level,
+        brotli_quality=_settings.compression_brotli_quality,
+    )
 app.add_middleware(LanguagePrefixMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
+if _settings.tracing_enabled:
+    # Di luar RequestLogging agar X-Request-ID yang dibuat tracing dipakai juga di log
+    app.add_middleware(tracing.TracingMiddleware, request_id_header=_settings.request_id_header)
+if _settings.metrics_enabled:
+    # Paling luar: latency mencakup seluruh stack middleware
+    metrics.install_pool_metrics(engine)
+    app.add_middleware(metrics.MetricsMiddleware)
 
 # Register global exception handlers
 add_exception_handlers(app)
@@ -69,6 +136,21 @@ app.include_router(qr_router.router)
 app.include_router(submission_router.router)
 app.include_router(stat_router.router)
 app.include_router(seeder_router.router)
+app.include_router(system_router.router)
+if _settings.metrics_enabled:
+    app.include_router(system_router.metrics_router)
+app.include_router(sync_router.router)
+
+if _settings.tracing_enabled:
+    if _settings.tracing_exporter == "otlp":
+        _span_exporter = tracing.OtlpHttpSpanExporter(_settings.tracing_otlp_endpoint, _settings.tracing_service_name)
+    else:
+        _span_exporter = tracing.FileSpanExporter(_settings.tracing_file_path, _settings.tracing_service_name)
+    tracing.install(_span_exporter, sample_ratio=_settings.tracing_sample_ratio)
+    tracing.instrument_engine(engine)
+    tracing.instrument_services()
+    # Setelah semua router terdaftar
+    tracing.instrument_routes(app)
 
 
 def get_db():
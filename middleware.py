@@ -3,25 +3,36 @@
 import time
 import uuid
 import json
-from typing import Callable, Awaitable, Dict, Any, cast, Mapping
+import gzip
+import zlib
+from typing import Callable, Awaitable, Dict, Any, Optional, cast, Mapping
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
 
 from fastapi import Request, FastAPI
 from fastapi.responses import JSONResponse
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 from fastapi.exceptions import HTTPException as FastAPIHTTPException
 from fastapi.exceptions import RequestValidationError
-from starlette.middleware.base import RequestResponseEndpoint
 
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
 from rich.theme import Theme
 
 from config import get_settings
 from utils.responses import error_payload, detect_lang
-from i18n.messages import is_supported_lang, normalize_lang
+from utils import metrics, sql_stats
+from i18n.messages import available_languages, normalize_lang
+
+try:
+    import brotli
+except ImportError:  # Brotli opsional; tanpa paket ini hanya gzip yang dipakai
+    brotli = None
 
 settings = get_settings()
 
@@ -91,6 +102,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         method = request.method
         request_id = request.headers.get(settings.request_id_header) or uuid.uuid4().hex
         request.state.request_id = request_id
+        # Dibuat sebelum call_next agar task/thread endpoint mewarisi ContextVar-nya
+        query_stats = sql_stats.begin_request(request_id) if settings.sql_stats_enabled else None
 
         # Clone request body
         body_bytes = await request.body()
@@ -123,6 +136,12 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 self._print_debug_details(request, body_bytes, response, request_id, status_color)
 
             response.headers[settings.request_id_header] = request_id
+            if query_stats is not None:
+                self._apply_query_stats(response, query_stats, method, path)
+                if settings.metrics_enabled:
+                    # scope["route"] sudah diisi router saat call_next selesai
+                    route = metrics.route_template(request.scope)
+                    metrics.observe_db(route, query_stats.count, query_stats.total_ms)
             return response
 
         except Exception as e:
@@ -131,6 +150,18 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             console.print_exception(show_locals=False) # Tampilkan traceback yang cantik
             raise e
 
+    def _apply_query_stats(self, response, stats, method, path):
+        """Header Server-Timing/X-DB-Queries, plus log bila melewati threshold."""
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers.append("Server-Timing", stats.server_timing())
+        if stats.count > settings.sql_stats_max_queries or stats.total_ms > settings.sql_stats_max_db_ms:
+            console.print(
+                f"[warning]SQL BERAT[/warning] {method} {path} - {stats.count} query, "
+                f"{stats.total_ms:.1f}ms DB (request {stats.request_id})"
+            )
+        for shape, count in stats.repeated(settings.sql_n_plus_one_threshold):
+            console.print(f"[warning]KEMUNGKINAN N+1[/warning] {method} {path} - {count}x: {escape(shape[:200])}")
+
     def _print_debug_details(self, request, body_bytes, response, request_id, color):
         """Helper untuk mencetak detail body/response saat debug"""
         try:
@@ -169,52 +200,231 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             pass # Jangan sampai logging bikin error aplikasi
 
 
-class LanguagePrefixMiddleware(BaseHTTPMiddleware):
+class LanguagePrefixMiddleware:
     """Middleware untuk mendukung prefix bahasa di path: /en/..., /id/..., /ja/... dll.
 
     Mekanisme:
     - Cek segmen pertama path
     - Jika bahasa didukung, simpan di request.state.lang
     - Strip segmen bahasa sebelum diteruskan ke router FastAPI
-    - Jika hanya prefix bahasa (misal '/en') redirect ke '/en/' agar konsisten
+    - Jika hanya prefix bahasa (misal '/en/') diteruskan sebagai root '/'
+
+    Ditulis sebagai middleware ASGI murni (bukan BaseHTTPMiddleware) agar request
+    tanpa prefix hanya membayar satu lookup dict, tanpa task/stream tambahan.
     """
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:  # type: ignore[override]
-        original_path = request.scope.get("path", "")
-        if not isinstance(original_path, str) or len(original_path) < 4:  # minimal '/en'
-            return await call_next(request)
-        # Pisah segmen
-        # path selalu diawali '/', jadi split akan hasilkan pertama kosong
-        segments = original_path.split('/')
-        # ['', 'en', 'login'] -> kandidat bahasa di index 1
-        candidate = segments[1] if len(segments) > 1 else None
-        if candidate and is_supported_lang(candidate.lower()):
-            # Normalisasi
-            lang_norm = normalize_lang(candidate.lower())
-            request.state.lang = lang_norm
-            # Bangun ulang path tanpa segmen bahasa
-            remainder_segments = segments[2:]  # sisakan setelah kode bahasa
-            new_path = '/' + '/'.join([s for s in remainder_segments if s])
-            if new_path == '/':
-                # jika user akses '/en' atau '/en/' arahkan ke root tapi lang terset
-                request.scope['path'] = '/'  # root
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            path = scope.get("path", "")
+            # minimal '/en/'; kode bahasa = segmen di antara '/' pertama dan kedua
+            end = path.find("/", 1) if len(path) >= 4 else -1
+            if end > 1:
+                lang = _LANG_PREFIXES.get(path[1:end].lower())
+                if lang is not None:
+                    scope.setdefault("state", {})["lang"] = lang
+                    rest = path[end:]
+                    if "//" in rest or (len(rest) > 1 and rest.endswith("/")):
+                        rest = "/" + "/".join(s for s in rest.split("/") if s)
+                    scope["path"] = rest or "/"
+        await self.app(scope, receive, send)
+
+
+_LANG_PREFIXES: Dict[str, str] = {lang: normalize_lang(lang) for lang in available_languages()}
+
+# Detail HTTPException (string bawaan FastAPI/auth) yang punya padanan key pesan
+_DETAIL_KEY_MAP: Dict[str, str] = {
+    "Not authenticated": "not_authenticated",
+    "Tidak bisa validasi token": "not_authenticated",
+    "NIP atau password salah": "invalid_credentials",
+    "Validation error": "validation_error",
+    "Data tidak valid": "validation_error",
+}
+
+
+# --- Kompresi response ---
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+# Body sebesar ini ke atas dikompres di thread pool agar event loop tidak tertahan
+OFFLOAD_THRESHOLD = 256 * 1024
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flush per chunk agar client menerima data streaming tanpa menunggu akhir
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._gz.flush()
+
+
+class CompressionMiddleware:
+    """Kompresi gzip/brotli untuk response JSON/teks sebagai middleware ASGI murni.
+
+    - Encoding dipilih dari Accept-Encoding (brotli diutamakan bila terpasang)
+    - Hanya content-type di COMPRESSIBLE_TYPES; gambar/file upload di /assets dilewati
+    - Response satu bagian di bawah `minimum_size` dikirim apa adanya; body besar
+      dikompres di thread pool
+    - Response streaming tetap streaming: setiap chunk dikompres lalu di-flush
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        exclude_paths: tuple[str, ...] = ("/assets",),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("method") == "HEAD" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self, encoding, send)(scope, receive)
+
+    def compress(self, encoding: str, data: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Dict[str, Any]] = None
+        self.active = False  # True bila response ini memenuhi syarat kompresi
+        self.streamer: Optional[_StreamCompressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    def _eligible(self, message: Dict[str, Any]) -> bool:
+        if message["status"] in (204, 206, 304) or message["status"] < 200:
+            return False
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _mark_compressed(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        # Representasi terkompresi bukan byte yang sama: ETag kuat diturunkan jadi weak
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def _run(self, func: Callable[[bytes], bytes], data: bytes) -> bytes:
+        if len(data) >= OFFLOAD_THRESHOLD:
+            return await anyio.to_thread.run_sync(func, data)
+        return func(data)
+
+    async def send_wrapper(self, message: Dict[str, Any]) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            self.active = self._eligible(message)
+            if self.active:
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
             else:
-                request.scope['path'] = new_path
-        return await call_next(request)
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or not self.active:
+            if self.start_message is not None and self.active and self.streamer is None:
+                # Pesan lain (misal http.response.pathsend) -> kirim apa adanya
+                await self.send(self.start_message)
+                self.active = False
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.streamer is None and not more_body:
+            # Response satu bagian (JSONResponse dkk.)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if len(body) >= self.middleware.minimum_size:
+                compressed = await self._run(lambda data: self.middleware.compress(self.encoding, data), body)
+                if len(compressed) < len(body):
+                    body = compressed
+                    self._mark_compressed(headers)
+                    headers["Content-Length"] = str(len(body))
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        if self.streamer is None:
+            # Awal response streaming: panjang akhir tidak diketahui
+            self.streamer = _StreamCompressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            self._mark_compressed(headers)
+            del headers["Content-Length"]
+            await self.send(self.start_message)
+
+        data = await self._run(self.streamer.chunk, body) if body else b""
+        if not more_body:
+            data += self.streamer.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
 
 
 async def http_exception_handler(request: Request, exc: FastAPIHTTPException):
     request_id = getattr(request.state, "request_id", None)
     lang = detect_lang(request)
     detail = exc.detail
-    detail_key_map = {
-        "Not authenticated": "not_authenticated",
-        "Tidak bisa validasi token": "not_authenticated",
-        "NIP atau password salah": "invalid_credentials",
-        "Validation error": "validation_error",
-        "Data tidak valid": "validation_error",
-    }
-    key = detail_key_map.get(str(detail))
+    key = _DETAIL_KEY_MAP.get(str(detail))
 
     body: Dict[str, Any]  # anotasi eksplisit agar Pylance tahu tipe
     if key:
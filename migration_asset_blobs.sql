@@ -0,0 +1,19 @@
+-- Migration: Content-addressed asset store with reference counting
+-- Date: 2026-10-19
+-- Description: Menambahkan tabel asset_blobs untuk menghitung jumlah row yang
+--              mereferensikan setiap file di assets/. File upload baru disimpan
+--              di assets/blobs/ab/cd/<sha256>.<ext> sehingga foto yang sama
+--              hanya disimpan sekali.
+
+CREATE TABLE IF NOT EXISTS asset_blobs (
+    path VARCHAR(255) NOT NULL PRIMARY KEY,
+    ref_count INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Notes:
+-- - Isi awal reference count dari data yang sudah ada:
+--     python -m utils.asset_store rebuild
+-- - File tanpa referensi dihapus oleh GC (default grace period 60 menit):
+--     python -m utils.asset_store gc --dry-run
+--     python -m utils.asset_store gc --rebuild   (termasuk assets/reports & assets/vehicles lama)
@@ -0,0 +1,32 @@
+-- Migration: Change tracking for delta sync
+-- Date: 2026-10-19
+-- Description: updated_at pada users, index updated_at untuk tabel yang ikut
+--              delta sync, dan tabel tombstones untuk mencatat row yang dihapus.
+--              Jalankan setelah migration_updated_at.sql.
+
+ALTER TABLE users
+    ADD COLUMN updated_at DATETIME(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+CREATE INDEX ix_reports_updated_at ON reports (updated_at);
+CREATE INDEX ix_submissions_updated_at ON submissions (updated_at);
+CREATE INDEX ix_vehicles_updated_at ON vehicles (updated_at);
+CREATE INDEX ix_users_updated_at ON users (updated_at);
+
+CREATE TABLE IF NOT EXISTS tombstones (
+    id BIGINT NOT NULL AUTO_INCREMENT,
+    entity VARCHAR(32) NOT NULL,
+    entity_id INT NOT NULL,
+    deleted_at DATETIME(6) NOT NULL,
+    PRIMARY KEY (id),
+    INDEX ix_tombstones_entity_deleted_at (entity, deleted_at, id)
+);
+
+-- Notes:
+-- - Endpoint: GET /sync/{reports|submissions|vehicles|users}?since=<watermark>
+-- - Tombstone dibuat otomatis saat row dihapus lewat ORM (utils/change_tracking.py)
+-- - Kolom scope tombstones (dinas_id, user_id) ditambahkan oleh
+--   `python -m database.migrations upgrade` (versi 2); tombstone juga dicatat saat
+--   row pindah dinas atau kendaraan di-unassign
+-- - Tombstone lama boleh dihapus berkala; client dengan watermark lebih tua dari
+--   tombstone tertua sebaiknya melakukan full sync ulang
@@ -0,0 +1,19 @@
+-- Migration: Add thumbnail columns for processed photos
+-- Date: 2026-10-19
+-- Description: Menambahkan kolom path thumbnail untuk foto report dan foto fisik
+--              kendaraan. Kolom diisi oleh worker image processing setelah upload.
+
+-- 1. Thumbnail foto bukti report
+ALTER TABLE reports
+    ADD COLUMN vehicle_physical_photo_thumb_path TEXT NULL,
+    ADD COLUMN odometer_photo_thumb_path TEXT NULL,
+    ADD COLUMN invoice_photo_thumb_path TEXT NULL,
+    ADD COLUMN my_pertamina_photo_thumb_path TEXT NULL;
+
+-- 2. Thumbnail foto fisik kendaraan
+ALTER TABLE vehicles
+    ADD COLUMN foto_fisik_thumb TEXT NULL;
+
+-- Notes:
+-- - Foto lama bisa diproses ulang dengan: python -m utils.image_processing
+-- - Foto hasil proses (WebP/JPEG, EXIF dibuang) menggantikan file asli
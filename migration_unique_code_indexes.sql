@@ -0,0 +1,17 @@
+-- Migration: Indexes for expired code cleanup
+-- Date: 2026-10-19
+-- Description: Index pada expired_at untuk janitor yang menghapus kode OTP/QR
+--              expired secara batch, dan index (user_id, purpose) untuk lookup
+--              kode aktif per user.
+
+CREATE INDEX ix_unique_code_generators_expired_at
+    ON unique_code_generators (expired_at);
+
+CREATE INDEX ix_unique_code_generators_user_purpose
+    ON unique_code_generators (user_id, purpose);
+
+-- Notes:
+-- - Janitor berjalan otomatis dari lifespan aplikasi setiap
+--   CODE_PURGE_INTERVAL_SECONDS (default 300 detik, dengan jitter)
+-- - Backlog row lama ikut terhapus bertahap (CODE_PURGE_BATCH_SIZE per batch)
+-- - Metrics: GET /system/jobs
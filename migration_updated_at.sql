@@ -0,0 +1,24 @@
+-- Migration: updated_at columns for conditional GET
+-- Date: 2026-10-19
+-- Description: Kolom updated_at (presisi mikrodetik) pada reports, submissions
+--              dan vehicles. Dipakai sebagai fingerprint ETag sehingga endpoint
+--              detail/list bisa menjawab If-None-Match dengan 304 tanpa memuat data.
+
+ALTER TABLE reports
+    ADD COLUMN updated_at DATETIME(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+ALTER TABLE submissions
+    ADD COLUMN updated_at DATETIME(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+ALTER TABLE vehicles
+    ADD COLUMN updated_at DATETIME(6) NOT NULL
+        DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+-- Notes:
+-- - Row lama terisi waktu migration dijalankan; ETag lama di client otomatis tidak cocok
+-- - Aplikasi juga mengisi updated_at dari ORM (default/onupdate), ON UPDATE di atas
+--   menjaga kolom tetap benar untuk UPDATE manual lewat SQL
+-- - Endpoint: GET /report, /report/{id}, /report/my/reports, /submission,
+--   /submission/{id}, /submission/my/submissions, /vehicle, /vehicle/my/vehicles
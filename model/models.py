@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import enum
-from datetime import datetime
+from datetime import datetime, timezone
 
 from sqlalchemy import (
     BigInteger,
@@ -10,6 +10,7 @@ from sqlalchemy import (
     DateTime,
     Enum as SAEnum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -18,10 +19,21 @@ from sqlalchemy import (
     UniqueConstraint,
     func,
 )
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import Mapped, relationship
 
 from database.database import Base
 
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# Kolom updated_at dipakai sebagai fingerprint conditional GET (ETag) dan watermark
+# delta sync, jadi di MySQL disimpan dengan presisi mikrodetik agar dua perubahan
+# dalam detik yang sama tetap berbeda.
+UpdatedAtType = DateTime(timezone=True).with_variant(mysql.DATETIME(fsp=6), "mysql")
+
 # --- Enums ---
 # Menggunakan (str, enum.Enum) agar otomatis serialize sebagai string di API
 
@@ -117,6 +129,7 @@ class User(Base):
     password = Column(String(255), nullable=False)
     is_verified = Column(Boolean, default=False, server_default="0", nullable=False)
     dinas_id = Column(Integer, ForeignKey("dinas.id", ondelete="SET NULL"), nullable=True)
+    updated_at = Column(UpdatedAtType, default=_utc_now, onupdate=_utc_now, nullable=False, index=True)
 
     # Relationships
     dinas = relationship("Dinas", back_populates="users")
@@ -157,11 +170,12 @@ class Wallet(Base):
 class UniqueCodeGenerator(Base):
     """Model untuk Kode OTP/QR/Reset Password."""
     __tablename__ = "unique_code_generators"
+    __table_args__ = (Index("ix_unique_code_generators_user_purpose", "user_id", "purpose"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     kode_unik = Column(String(100), nullable=False)
-    expired_at = Column(DateTime(timezone=True), nullable=False)
+    expired_at = Column(DateTime(timezone=True), nullable=False, index=True)
     purpose = Column(SAEnum(PurposeEnum), nullable=False)
 
     # Relationships
@@ -170,6 +184,15 @@ class UniqueCodeGenerator(Base):
 
 # --- Asset Models ---
 
+class AssetBlob(Base):
+    """Model reference count untuk file di assets/ (content-addressed blob store)."""
+    __tablename__ = "asset_blobs"
+
+    path = Column(String(255), primary_key=True)
+    ref_count = Column(Integer, nullable=False, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
 class Vehicle(Base):
     """Model untuk Kendaraan Dinas."""
     __tablename__ = "vehicles"
@@ -196,11 +219,13 @@ class Vehicle(Base):
     
     # Assets & UI Config
     foto_fisik = Column(Text)
+    foto_fisik_thumb = Column(Text, nullable=True)
     asset_icon_name = Column(String(50), nullable=True)
     asset_icon_color = Column(String(50), nullable=True)
     
     # Ownership
     dinas_id = Column(Integer, ForeignKey("dinas.id"), nullable=True)
+    updated_at = Column(UpdatedAtType, default=_utc_now, onupdate=_utc_now, nullable=False, index=True)
    
     # Relationships
     dinas = relationship("Dinas", back_populates="vehicles")
@@ -234,6 +259,7 @@ class Submission(Base):
     description = Column(Text, nullable=True)
     date = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(UpdatedAtType, default=_utc_now, onupdate=_utc_now, nullable=False, index=True)
 
     # Relationships
     dinas = relationship("Dinas", foreign_keys=[dinas_id])
@@ -283,6 +309,14 @@ class Report(Base):
     invoice_photo_path = Column(Text)
     my_pertamina_photo_path = Column(Text)
 
+    # Thumbnail hasil image processing (diisi worker setelah upload)
+    vehicle_physical_photo_thumb_path = Column(Text, nullable=True)
+    odometer_photo_thumb_path = Column(Text, nullable=True)
+    invoice_photo_thumb_path = Column(Text, nullable=True)
+    my_pertamina_photo_thumb_path = Column(Text, nullable=True)
+
+    updated_at = Column(UpdatedAtType, default=_utc_now, onupdate=_utc_now, nullable=False, index=True)
+
     # Relationships
     dinas = relationship("Dinas", foreign_keys=[dinas_id])
     user = relationship("User", back_populates="reports")
@@ -326,4 +360,30 @@ class ReportLog(Base):
 
     # Relationships
     report = relationship("Report", back_populates="logs")
-    updater = relationship("User", foreign_keys=[updated_by_user_id])
\ No newline at end of file
+    updater = relationship("User", foreign_keys=[updated_by_user_id])
+
+
+# --- Sync Models ---
+
+class Tombstone(Base):
+    """
+    Jejak row yang dihapus atau keluar dari scope seorang user (pindah dinas, kendaraan
+    di-unassign), agar client delta sync tahu ID mana yang harus dibuang.
+
+    dinas_id/user_id = scope lama row tersebut, sama dengan aturan SyncService._scope:
+    tombstone hanya dikirim ke user dinas itu atau ke pemilik row. Row dengan banyak
+    pemilik (kendaraan) punya satu tombstone per pemilik.
+    """
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_entity_deleted_at", "entity", "deleted_at", "id"),
+        Index("ix_tombstones_entity_dinas", "entity", "dinas_id", "deleted_at", "id"),
+        Index("ix_tombstones_entity_user", "entity", "user_id", "deleted_at", "id"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    entity = Column(String(32), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    dinas_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, nullable=True)
+    deleted_at = Column(UpdatedAtType, default=_utc_now, nullable=False)
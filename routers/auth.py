@@ -19,7 +19,6 @@ from utils.otp import (
     consume_password_reset_code,
     create_account_verification_code,
     create_password_reset_code,
-    verify_account_verification_code,
     verify_password_reset_code,
 )
 from utils.responses import detect_lang
@@ -288,7 +287,8 @@ def reset_password(
             message=get_message("otp_invalid", lang),
         )
         
-    ok, reason = verify_password_reset_code(db, user, payload.otp)
+    # Verifikasi + hapus kode secara atomik agar kode tidak bisa dipakai dua kali
+    ok, reason = consume_password_reset_code(db, user, payload.otp)
     if not ok:
         key = "otp_invalid" if reason == "invalid" else "otp_expired"
         return schemas.SuccessResponse[schemas.Message](
@@ -299,7 +299,6 @@ def reset_password(
     # Update: user.password
     setattr(user, "password", auth.get_password_hash(payload.new_password))
     db.add(user)
-    consume_password_reset_code(db, user, payload.otp)
     db.commit()
     
     return schemas.SuccessResponse[schemas.Message](
@@ -333,7 +332,7 @@ def verify_register(
             message=get_message("otp_invalid", lang),
         )
         
-    ok, reason = verify_account_verification_code(db, user, payload.otp)
+    ok, reason = consume_account_verification_code(db, user, payload.otp)
     if not ok:
         key = "otp_invalid" if reason == "invalid" else "otp_expired"
         return schemas.SuccessResponse[schemas.OTPVerifyResponse](
@@ -344,7 +343,6 @@ def verify_register(
     # Update: is_verified
     setattr(user, "is_verified", True)
     db.add(user)
-    consume_account_verification_code(db, user, payload.otp)
     db.commit()
     
     return schemas.SuccessResponse[schemas.OTPVerifyResponse](
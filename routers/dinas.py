@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 
 import controller.auth as auth
@@ -8,6 +8,8 @@ import schemas.schemas as schemas
 from database.database import get_db
 from model.models import User as UserModel
 from services.dinas_service import DinasService
+from utils.http_cache import conditional_response
+from utils.reference_cache import dinas_cache
 
 router = APIRouter(prefix="/dinas", tags=["Dinas"])
 
@@ -19,10 +21,15 @@ router = APIRouter(prefix="/dinas", tags=["Dinas"])
     description="Mendapatkan daftar seluruh Dinas/Instansi.",
 )
 def read_dinas(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-) -> schemas.SuccessListResponse[schemas.DinasResponse]:
-    data = DinasService.list(db)
-    return schemas.SuccessListResponse[schemas.DinasResponse](data=data)
+):
+    cached = dinas_cache.get(db)
+    not_modified = conditional_response(request, response, cached.etag)
+    if not_modified is not None:
+        return not_modified
+    return schemas.SuccessListResponse[schemas.DinasResponse](data=list(cached.items))
 
 
 @router.post(
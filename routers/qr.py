@@ -1,6 +1,8 @@
 from __future__ import annotations
+import time
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 import controller.auth as auth
@@ -8,17 +10,28 @@ import model.models as models
 import schemas.schemas as schemas
 from database.database import get_db
 from i18n.messages import get_message
+from config import get_settings
 from utils.otp import (
     consume_qr_code,
+    consume_stateless_qr_token,
     decode_qr_token,
+    decode_stateless_qr_token,
     encode_qr_token,
+    encode_stateless_qr_token,
     extract_kode_unik_from_qr,
+    find_qr_code_owner,
     get_or_create_qr_code,
-    verify_qr_code,
+    is_stateless_qr_token,
+    _store_ttl,
 )
+from utils import metrics
+from utils.http_cache import etag_matches
+from utils.qr_image import MEDIA_TYPES, QRImageCache, render
 from utils.responses import detect_lang
 
 router = APIRouter(prefix="/qr", tags=["QR"])
+_SETTINGS = get_settings()
+_image_cache = QRImageCache(max_entries=_SETTINGS.qr_image_cache_size)
 
 
 @router.get(
@@ -38,6 +51,14 @@ def get_my_qr(
             message=get_message("user_already_has_dinas", lang),
         )
     
+    if _SETTINGS.qr_stateless_tokens:
+        # Token bertanda tangan berisi uid + exp; tidak ada write ke storage
+        token, exp = encode_stateless_qr_token(int(current_user.id))
+        return schemas.SuccessResponse[schemas.QRGetResponse](
+            data=schemas.QRGetResponse(code=token, expiresAt=exp.isoformat()),
+            message=get_message("qr_ready", lang),
+        )
+
     rec = get_or_create_qr_code(db, current_user)
     code_val = getattr(rec, "kode_unik", None)
     detail = str(code_val) if code_val is not None else ""
@@ -53,6 +74,54 @@ def get_my_qr(
     )
 
 
+@router.get(
+    "/my/image",
+    summary="Get My QR Code Image",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}, "image/svg+xml": {}}}},
+)
+def get_my_qr_image(
+    request: Request,
+    format: Literal["png", "svg"] = Query("png"),
+    scale: int = Query(8, ge=1, le=32, description="Ukuran piksel per modul (PNG)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    """Gambar QR untuk token /qr/my saat ini, dirender di server dan di-cache sampai token berganti."""
+    lang = detect_lang(request)
+    if getattr(current_user, "dinas_id", None):
+        raise HTTPException(status_code=400, detail=get_message("user_already_has_dinas", lang))
+
+    user_id = int(current_user.id)
+    token: str | None = None
+    if _SETTINGS.qr_stateless_tokens:
+        token, exp = encode_stateless_qr_token(user_id)
+        cache_code = token
+        # Token baru terbit satu TTL sebelum token ini expired
+        refresh_at = exp.timestamp() - _store_ttl()
+    else:
+        rec = get_or_create_qr_code(db, current_user)
+        cache_code = rec.kode_unik
+        refresh_at = rec.expired_at.timestamp()
+
+    key = (user_id, cache_code, format, scale)
+    item = _image_cache.get(key)
+    metrics.observe_cache("qr_image", hit=item is not None)
+    if item is None:
+        payload = token or encode_qr_token(current_user, cache_code)
+        item = _image_cache.put(key, render(payload, format, scale=scale), refresh_at)
+    body, etag, expires_at = item
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max(0, int(expires_at - time.time()))}",
+        "Vary": "Authorization",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=MEDIA_TYPES[format], headers=headers)
+
+
 @router.post(
     "/assign",
     response_model=schemas.SuccessResponse[schemas.Message],
@@ -79,6 +148,18 @@ def assign_dinas_with_qr(
         )
 
     raw_code = payload.unique_code
+    if is_stateless_qr_token(raw_code):
+        ok, reason = consume_stateless_qr_token(raw_code, int(getattr(user, "id", 0)))
+        if not ok:
+            raise HTTPException(status_code=400, detail=get_message(f"qr_{reason}", lang))
+        setattr(user, "dinas_id", int(payload.dinas_id))
+        db.add(user)
+        db.commit()
+        return schemas.SuccessResponse[schemas.Message](
+            data=schemas.Message(detail="assigned"),
+            message=get_message("dinas_assigned", lang),
+        )
+
     if "." in raw_code:
         ok_tok, _reason_tok, uid_tok, code_tok = decode_qr_token(raw_code)
         uid_user = int(getattr(user, "id", 0))
@@ -88,7 +169,8 @@ def assign_dinas_with_qr(
             )
         raw_code = code_tok
 
-    ok, reason = verify_qr_code(db, user, raw_code)
+    # Verifikasi + hapus kode secara atomik (scan ganda tidak bisa assign dua kali)
+    ok, reason = consume_qr_code(db, user, raw_code)
     if not ok:
         key = "invalid_or_expired"
         if reason == "invalid":
@@ -99,7 +181,6 @@ def assign_dinas_with_qr(
 
     setattr(user, "dinas_id", int(payload.dinas_id))
     db.add(user)
-    consume_qr_code(db, user, raw_code)
     db.commit()
     
     return schemas.SuccessResponse[schemas.Message](
@@ -117,21 +198,21 @@ def scan_qr_code(
     payload: schemas.QRScanRequest, request: Request, db: Session = Depends(get_db)
 ):
     lang = detect_lang(request)
-    try:
-        raw_code = extract_kode_unik_from_qr(payload.kode_unik)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    qr_record = (
-        db.query(models.UniqueCodeGenerator)
-        .filter(models.UniqueCodeGenerator.kode_unik == raw_code)
-        .first()
-    )
-
-    if not qr_record:
+    if is_stateless_qr_token(payload.kode_unik):
+        ok, reason, owner_id = decode_stateless_qr_token(payload.kode_unik)
+        if not ok:
+            raise HTTPException(status_code=400, detail=get_message(f"qr_{reason}", lang))
+    else:
+        try:
+            raw_code = extract_kode_unik_from_qr(payload.kode_unik)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        owner_id = find_qr_code_owner(db, raw_code)
+
+    if owner_id is None:
         raise HTTPException(status_code=404, detail=get_message("not_found", lang))
 
-    user = db.query(models.User).filter(models.User.id == qr_record.user_id).first()
+    user = db.query(models.User).filter(models.User.id == owner_id).first()
     if not user:
         raise HTTPException(
             status_code=404, detail=get_message("user_not_found", lang)
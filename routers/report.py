@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Optional
+from datetime import date
+from typing import Literal, Optional
 
 from fastapi import (
     APIRouter,
@@ -9,8 +10,11 @@ from fastapi import (
     Form,
     HTTPException,
     Query,
+    Request,
+    Response,
     UploadFile,
 )
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 import controller.auth as auth
@@ -18,7 +22,10 @@ import schemas.schemas as schemas
 from database.database import get_db
 from i18n.messages import get_message
 from model.models import User as UserModel
-from services.report_service import ReportService
+from services.report_service import EXPORT_COLUMNS, ReportService
+from utils.export import MEDIA_TYPES, parse_columns
+from utils.fingerprint import fingerprint_etag
+from utils.http_cache import conditional_response
 
 router = APIRouter(prefix="/report", tags=["Report"])
 
@@ -29,6 +36,8 @@ router = APIRouter(prefix="/report", tags=["Report"])
     summary="List Reports (Paged)",
 )
 def list_reports(
+    request: Request,
+    response: Response,
     user_id: int | None = None,
     vehicle_id: int | None = None,
     status: str | None = Query(None),
@@ -40,7 +49,16 @@ def list_reports(
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ) -> schemas.SuccessResponse[schemas.PagedListData[schemas.ReportResponse]]:
-    
+    fingerprint = ReportService.list_fingerprint(db, user_id, vehicle_id, month, year, dinas_id, status)
+    etag = fingerprint_etag(
+        "report:list", fingerprint,
+        user_id=user_id, vehicle_id=vehicle_id, status=status, dinas_id=dinas_id, month=month,
+        year=year, limit=limit, offset=offset, scope=current_user.dinas_id,
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
     result = ReportService.list(
         db, user_id, vehicle_id, month, year, dinas_id, limit, offset, current_user, status
     )
@@ -49,12 +67,46 @@ def list_reports(
     )
 
 
+@router.get(
+    "/export",
+    summary="Export Reports (NDJSON/CSV)",
+    description=(
+        "Streaming seluruh report sesuai filter (sama seperti List Reports) tanpa paging. "
+        f"Kolom tersedia: {', '.join(EXPORT_COLUMNS)}."
+    ),
+    response_class=StreamingResponse,
+)
+def export_reports(
+    format: Literal["ndjson", "csv"] = Query("csv"),
+    columns: str | None = Query(None, description="Daftar kolom dipisah koma; kosong = semua"),
+    user_id: int | None = None,
+    vehicle_id: int | None = None,
+    status: str | None = Query(None),
+    dinas_id: int | None = Query(None, description="Filter by Dinas ID"),
+    month: int | None = Query(None, ge=1, le=12),
+    year: int | None = Query(None, ge=2000, le=2100),
+    current_user: UserModel = Depends(auth.get_current_user),
+) -> StreamingResponse:
+    names = parse_columns(columns, EXPORT_COLUMNS)
+    body = ReportService.export(
+        names, format, current_user, user_id, vehicle_id, month, year, dinas_id, status
+    )
+    filename = f"reports-{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get(
     "/my/reports",
     response_model=schemas.SuccessResponse[schemas.PagedListData[schemas.MyReportResponse]],
     summary="Get My Reports (Paged)",
 )
 def get_my_reports(
+    request: Request,
+    response: Response,
     vehicle_id: int | None = None,
     month: int | None = Query(None, ge=1, le=12),
     year: int | None = Query(None, ge=2000, le=2100),
@@ -63,7 +115,15 @@ def get_my_reports(
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ) -> schemas.SuccessResponse[schemas.PagedListData[schemas.MyReportResponse]]:
-    
+    fingerprint = ReportService.my_reports_fingerprint(db, current_user.id, vehicle_id, month, year)
+    etag = fingerprint_etag(
+        "report:my", fingerprint,
+        user=current_user.id, vehicle_id=vehicle_id, month=month, year=year, limit=limit, offset=offset,
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
     result = ReportService.get_my_reports(
         db, current_user.id, vehicle_id, month, year, limit, offset
     )
@@ -80,9 +140,17 @@ def get_my_reports(
 )
 def get_report(
     report_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ) -> schemas.SuccessResponse[schemas.ReportResponse]:
+    fingerprint = ReportService.fingerprint(db, report_id)
+    if fingerprint is not None:
+        not_modified = conditional_response(request, response, fingerprint_etag("report", fingerprint, id=report_id))
+        if not_modified is not None:
+            return not_modified
+
     r = ReportService.get(db, report_id)
     if not r:
         raise HTTPException(status_code=404, detail="Report tidak ditemukan")
@@ -4,7 +4,7 @@ import logging
 import os
 import sys
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 
 router = APIRouter(prefix="/seeder", tags=["System Utility"])
 logger = logging.getLogger(__name__)
@@ -12,13 +12,16 @@ logger = logging.getLogger(__name__)
 
 @router.post(
     "/run",
+    status_code=202,
     summary="Run Database Seeder",
-    description="Menjalankan script seeding database untuk mengisi data dummy.",
+    description="Menjalankan seeding database (akun demo + data dummy) di background.",
 )
-def run_database_seeder():
+def run_database_seeder(background_tasks: BackgroundTasks):
     """
     Endpoint untuk memicu proses seeding database.
-    Berguna untuk development/testing via Postman.
+    Berguna untuk development/testing via Postman. Seeding berjalan setelah
+    response dikirim, jadi request tidak menunggu insert selesai; pantau log server.
+    Untuk volume besar gunakan `python -m utils.synthetic_data`.
     """
     try:
         # 1. Pastikan root directory ada di sys.path
@@ -28,33 +31,30 @@ def run_database_seeder():
         if root_dir not in sys.path:
             sys.path.append(root_dir)
 
-        # 2. Import module seeder yang BARU (db_seeder.py)
-        # Pastikan Anda sudah merename 'seeder.py' di root menjadi 'db_seeder.py'
-        import db_seeder 
-
-        # 3. Jalankan fungsi seeding
-        logger.info("Memicu seeding dari API...")
-        db_seeder.seed_database() # Panggil fungsi dari file baru
-
-        return {
-            "success": True,
-            "message": "Database berhasil di-seed dengan data dummy!",
-            "credentials_info": {
-                "password_all_users": "11111111",
-                "accounts": [
-                    {"role": "Admin", "email": "admin@sibeda.local", "NIP": "100000000000000001"},
-                    {"role": "Kadis", "email": "budi@sibeda.local", "NIP": "100000000000000002"},
-                    {"role": "PIC", "email": "andi@sibeda.local", "NIP": "100000000000000003"},
-                ],
-            },
-        }
-
+        import db_seeder
     except ImportError as e:
         logger.error(f"Import Error: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail="File 'db_seeder.py' tidak ditemukan. Pastikan Anda sudah me-rename 'seeder.py' menjadi 'db_seeder.py'.",
-        )
-    except Exception as e:
-        logger.error(f"Seeding failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Gagal melakukan seeding: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="File 'db_seeder.py' tidak ditemukan.")
+
+    logger.info("Memicu seeding dari API (background)...")
+    background_tasks.add_task(_run_seeder, db_seeder)
+
+    return {
+        "success": True,
+        "message": "Seeding database dijalankan di background.",
+        "credentials_info": {
+            "password_all_users": db_seeder.DEFAULT_PASSWORD,
+            "accounts": [
+                {"role": "Admin", "email": "admin@sibeda.local", "NIP": "100000000000000001"},
+                {"role": "Kadis", "email": "budi@sibeda.local", "NIP": "100000000000000002"},
+                {"role": "PIC", "email": "andi@sibeda.local", "NIP": "100000000000000004"},
+            ],
+        },
+    }
+
+
+def _run_seeder(db_seeder) -> None:
+    try:
+        db_seeder.seed_database()
+    except Exception:
+        logger.exception("Seeding failed")
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from typing import Optional
+from datetime import date
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 import controller.auth as auth
 import schemas.schemas as schemas
 from database.database import get_db
 from model.models import User as UserModel
-from services.submission_service import SubmissionService
+from services.submission_service import EXPORT_COLUMNS, SubmissionService
+from utils.export import MEDIA_TYPES, parse_columns
+from utils.fingerprint import fingerprint_etag
+from utils.http_cache import conditional_response
 
 router = APIRouter(prefix="/submission", tags=["Submission"])
 
@@ -20,6 +25,8 @@ router = APIRouter(prefix="/submission", tags=["Submission"])
     summary="List Submissions (Paged)",
 )
 def list_submissions(
+    request: Request,
+    response: Response,
     creator_id: int | None = None,
     receiver_id: int | None = None,
     status: str | None = Query(None),
@@ -31,7 +38,16 @@ def list_submissions(
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ) -> schemas.SuccessResponse[schemas.PagedListData[schemas.SubmissionResponse]]:
-    
+    fingerprint = SubmissionService.list_fingerprint(db, creator_id, receiver_id, status, month, year, dinas_id)
+    etag = fingerprint_etag(
+        "submission:list", fingerprint,
+        creator_id=creator_id, receiver_id=receiver_id, status=status, dinas_id=dinas_id, month=month,
+        year=year, limit=limit, offset=offset, scope=current_user.dinas_id,
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
     result = SubmissionService.list(
         db, creator_id, receiver_id, status, month, year, dinas_id, limit, offset, current_user
     )
@@ -40,12 +56,46 @@ def list_submissions(
     )
 
 
+@router.get(
+    "/export",
+    summary="Export Submissions (NDJSON/CSV)",
+    description=(
+        "Streaming seluruh pengajuan sesuai filter (sama seperti List Submissions) tanpa paging. "
+        f"Kolom tersedia: {', '.join(EXPORT_COLUMNS)}."
+    ),
+    response_class=StreamingResponse,
+)
+def export_submissions(
+    format: Literal["ndjson", "csv"] = Query("csv"),
+    columns: str | None = Query(None, description="Daftar kolom dipisah koma; kosong = semua"),
+    creator_id: int | None = None,
+    receiver_id: int | None = None,
+    status: str | None = Query(None),
+    dinas_id: int | None = Query(None, description="Filter by Dinas ID"),
+    month: int | None = Query(None, ge=1, le=12),
+    year: int | None = Query(None, ge=2000, le=2100),
+    current_user: UserModel = Depends(auth.get_current_user),
+) -> StreamingResponse:
+    names = parse_columns(columns, EXPORT_COLUMNS)
+    body = SubmissionService.export(
+        names, format, current_user, creator_id, receiver_id, status, month, year, dinas_id
+    )
+    filename = f"submissions-{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get(
     "/my/submissions",
     response_model=schemas.SuccessResponse[schemas.PagedListData[schemas.SubmissionResponse]],
     summary="Get My Submissions (Paged)",
 )
 def get_my_submissions(
+    request: Request,
+    response: Response,
     month: int | None = Query(None, ge=1, le=12),
     year: int | None = Query(None, ge=2000, le=2100),
     limit: int = Query(10, ge=1, le=1000),
@@ -53,6 +103,14 @@ def get_my_submissions(
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ) -> schemas.SuccessResponse[schemas.PagedListData[schemas.SubmissionResponse]]:
+    fingerprint = SubmissionService.my_submissions_fingerprint(db, current_user.id, month, year)
+    etag = fingerprint_etag(
+        "submission:my", fingerprint, user=current_user.id, month=month, year=year, limit=limit, offset=offset
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
     result = SubmissionService.get_my_submissions(
         db, current_user.id, month, year, limit, offset
     )
@@ -68,9 +126,18 @@ def get_my_submissions(
 )
 def get_submission(
     submission_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ) -> schemas.SuccessResponse[schemas.SubmissionResponse]:
+    fingerprint = SubmissionService.fingerprint(db, submission_id)
+    if fingerprint is not None:
+        etag = fingerprint_etag("submission", fingerprint, id=submission_id)
+        not_modified = conditional_response(request, response, etag)
+        if not_modified is not None:
+            return not_modified
+
     s = SubmissionService.get(db, submission_id)
     if not s:
         raise HTTPException(status_code=404, detail="Submission tidak ditemukan")
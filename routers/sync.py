@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+import controller.auth as auth
+import schemas.schemas as schemas
+from database.database import get_db
+from model.models import User as UserModel
+from services.sync_service import SyncService
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.get(
+    "/{entity}",
+    response_model=schemas.SuccessResponse[schemas.SyncChangesResponse],
+    summary="Delta Sync",
+    description=(
+        "ID yang berubah dan yang dihapus sejak watermark `since`. Tanpa `since` dimulai dari awal. "
+        "Ulangi dengan watermark baru selama `has_more` bernilai true. Bila `reset` bernilai true "
+        "(dinas user berubah), buang seluruh cache lokal entity ini sebelum menerapkan `changed`."
+    ),
+)
+def get_changes(
+    entity: Literal["reports", "submissions", "vehicles", "users"],
+    since: str | None = Query(None, description="Watermark dari response sync sebelumnya"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(auth.get_current_user),
+) -> schemas.SuccessResponse[schemas.SyncChangesResponse]:
+    result = SyncService.changes(db, entity, current_user, since, limit)
+    return schemas.SuccessResponse[schemas.SyncChangesResponse](
+        data=result, message="Perubahan data berhasil diambil"
+    )
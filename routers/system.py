@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import hmac
+from typing import Dict, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse
+
+import controller.auth as auth
+import model.models as models
+import schemas.schemas as schemas
+from config import get_settings
+from utils import metrics, profiler
+from utils.scheduler import scheduler
+
+router = APIRouter(prefix="/system", tags=["System Utility"])
+# Tanpa prefix: scraper Prometheus umumnya mengharapkan path /metrics
+metrics_router = APIRouter(tags=["System Utility"])
+
+
+@router.get(
+    "/jobs",
+    response_model=schemas.SuccessResponse[Dict[str, schemas.JobMetricsResponse]],
+    summary="Maintenance Job Metrics",
+    description="Status job periodik (misal purge kode OTP/QR expired) di worker ini.",
+)
+def get_job_metrics(
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    data = {name: schemas.JobMetricsResponse(**m) for name, m in scheduler.metrics().items()}
+    return schemas.SuccessResponse[Dict[str, schemas.JobMetricsResponse]](
+        data=data, message="Metrics job berhasil diambil"
+    )
+
+
+@router.get(
+    "/profiles/{request_id}",
+    response_model=schemas.SuccessResponse[schemas.ProfileSummaryResponse],
+    summary="Request Profile Artifact",
+    description=(
+        "Hasil profiling request yang dikirim dengan header X-Profile: 1 (khusus admin). "
+        "format=collapsed mengembalikan collapsed stack mentah untuk speedscope/flamegraph.pl."
+    ),
+    responses={200: {"content": {"text/plain": {}}}},
+)
+def get_request_profile(
+    request_id: str,
+    format: Literal["summary", "collapsed"] = Query("summary"),
+    top: int = Query(20, ge=1, le=200),
+    current_user: models.User = Depends(auth.get_current_user),
+):
+    if current_user.role != models.RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Hanya admin yang dapat melihat profil request")
+    collapsed = profiler.load_artifact(get_settings().profiling_artifact_dir, request_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profil request tidak ditemukan")
+    if format == "collapsed":
+        return PlainTextResponse(collapsed)
+    data = schemas.ProfileSummaryResponse(request_id=request_id, **profiler.summarize(collapsed, top))
+    return schemas.SuccessResponse[schemas.ProfileSummaryResponse](
+        data=data, message="Profil request berhasil diambil"
+    )
+
+
+@metrics_router.get(
+    "/metrics",
+    include_in_schema=False,
+    summary="Prometheus Metrics",
+)
+def get_prometheus_metrics(request: Request):
+    token = get_settings().metrics_token
+    if token:
+        supplied = request.headers.get("authorization", "")
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            raise HTTPException(status_code=401, detail="Not authenticated")
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
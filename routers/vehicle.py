@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, Form, File, UploadFile
+from fastapi import APIRouter, Depends, Query, Form, File, Request, Response, UploadFile
 from sqlalchemy.orm import Session
 
 import controller.auth as auth
@@ -11,6 +11,8 @@ from database.database import get_db
 from i18n.messages import get_message
 from model.models import User as UserModel
 from services.vehicle_service import VehicleService
+from utils.fingerprint import fingerprint_etag
+from utils.http_cache import conditional_response
 
 router = APIRouter(prefix="/vehicle", tags=["Vehicle"])
 
@@ -21,13 +23,21 @@ router = APIRouter(prefix="/vehicle", tags=["Vehicle"])
     summary="List Vehicles (Paged)",
 )
 def list_vehicles(
+    request: Request,
+    response: Response,
     limit: int = Query(10, ge=1, le=1000),
     offset: int = Query(0, ge=0),
     dinas_id: Optional[int] = Query(None),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ) -> schemas.SuccessResponse[schemas.PagedListData[schemas.VehicleResponse]]:
-    
+    etag = fingerprint_etag(
+        "vehicle:list", VehicleService.list_fingerprint(db), dinas_id=dinas_id, limit=limit, offset=offset
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
     result = VehicleService.list(db, limit, offset, dinas_id)
     return schemas.SuccessResponse[schemas.PagedListData[schemas.VehicleResponse]](
         data=result, message="Success"
@@ -205,11 +215,21 @@ def delete_vehicle(
     response_model=schemas.SuccessResponse[schemas.PagedListData[schemas.MyVehicleResponse]],
 )
 def get_my_vehicles(
+    request: Request,
+    response: Response,
     limit: int = Query(10, ge=1, le=1000),
     offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ):
+    etag = fingerprint_etag(
+        "vehicle:my", VehicleService.my_vehicles_fingerprint(db, current_user.id),
+        user=current_user.id, limit=limit, offset=offset,
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
     vehicles = VehicleService.get_my_vehicles(db, current_user.id, limit, offset)
     return schemas.SuccessResponse[schemas.PagedListData[schemas.MyVehicleResponse]](
         data=vehicles, message=f"Ditemukan {vehicles['stat']['total_data']} kendaraan milik anda"
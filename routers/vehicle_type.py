@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 import controller.auth as auth
@@ -9,6 +9,8 @@ from database.database import get_db
 from i18n.messages import get_message
 from model.models import User as UserModel
 from services.vehicle_type_service import VehicleTypeService
+from utils.http_cache import conditional_response, make_etag
+from utils.reference_cache import vehicle_type_cache
 from utils.responses import detect_lang
 
 router = APIRouter(prefix="/vehicle-type", tags=["VehicleType"])
@@ -21,13 +23,18 @@ router = APIRouter(prefix="/vehicle-type", tags=["VehicleType"])
 )
 def list_vehicle_types(
     request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ):
-    data = VehicleTypeService.list(db)
+    cached = vehicle_type_cache.get(db)
     lang = detect_lang(request)
+    # message ikut bahasa, jadi ETag dibedakan per bahasa
+    not_modified = conditional_response(request, response, make_etag(cached.etag, lang))
+    if not_modified is not None:
+        return not_modified
     return schemas.SuccessListResponse[schemas.VehicleTypeResponse](
-        data=data, message=get_message("create_success", lang)
+        data=list(cached.items), message=get_message("create_success", lang)
     )
 
 
@@ -42,7 +49,7 @@ def get_vehicle_type(
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
 ):
-    vt = VehicleTypeService.get(db, vt_id)
+    vt = vehicle_type_cache.get_by_id(db, vt_id)
     if not vt:
         raise HTTPException(status_code=404, detail="VehicleType tidak ditemukan")
     lang = detect_lang(request)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 import controller.auth as auth
@@ -10,6 +10,8 @@ from i18n.messages import get_message
 from model.models import User as UserModel
 from services.wallet_service import WalletService
 from services.wallet_type_service import WalletTypeService
+from utils.http_cache import conditional_response
+from utils.reference_cache import wallet_type_cache
 
 router = APIRouter(prefix="/wallet", tags=["Wallet"])
 
@@ -20,12 +22,17 @@ router = APIRouter(prefix="/wallet", tags=["Wallet"])
     summary="List Wallet Types",
 )
 def list_wallet_types(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(auth.get_current_user),
-) -> schemas.SuccessListResponse[schemas.WalletTypeResponse]:
-    data = WalletTypeService.list(db)
+):
+    cached = wallet_type_cache.get(db)
+    not_modified = conditional_response(request, response, cached.etag)
+    if not_modified is not None:
+        return not_modified
     return schemas.SuccessListResponse[schemas.WalletTypeResponse](
-        data=data, message=get_message("create_success", None)
+        data=list(cached.items), message=get_message("create_success", None)
     )
 
 
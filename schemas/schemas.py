@@ -21,6 +21,15 @@ def serialize_datetime_utc(dt: datetime | None) -> str | None:
 # Custom datetime type that serializes to UTC with 'Z' suffix
 DateTimeUTC = Annotated[datetime, PlainSerializer(serialize_datetime_utc, return_type=str)]
 
+def serialize_asset_url(key: str) -> str:
+    """Serialize key file assets menjadi URL dari storage backend aktif."""
+    from utils.storage import public_url
+    return public_url(key)  # type: ignore[return-value]
+
+
+# Path file assets di database -> URL untuk client (presigned/CDN untuk object store)
+AssetURL = Annotated[str, PlainSerializer(serialize_asset_url, return_type=str)]
+
 T = TypeVar("T")
 
 # --- Enums ---
@@ -328,7 +337,8 @@ class VehicleResponse(BaseModel):
     merek: str | None = None
     
     # Visuals
-    foto_fisik: str | None = None
+    foto_fisik: AssetURL | None = None
+    foto_fisik_thumb: AssetURL | None = None
     asset_icon_name: str | None = None
     asset_icon_color: str | None = None
     
@@ -477,10 +487,14 @@ class ReportResponse(BaseModel):
     longitude: float | None = None
     
     # Photos
-    vehicle_physical_photo_path: str | None = None
-    odometer_photo_path: str | None = None
-    invoice_photo_path: str | None = None
-    my_pertamina_photo_path: str | None = None
+    vehicle_physical_photo_path: AssetURL | None = None
+    odometer_photo_path: AssetURL | None = None
+    invoice_photo_path: AssetURL | None = None
+    my_pertamina_photo_path: AssetURL | None = None
+    vehicle_physical_photo_thumb_path: AssetURL | None = None
+    odometer_photo_thumb_path: AssetURL | None = None
+    invoice_photo_thumb_path: AssetURL | None = None
+    my_pertamina_photo_thumb_path: AssetURL | None = None
     odometer: int | None = None
     
     logs: List[ReportLogResponse] = Field(default_factory=list)
@@ -546,4 +560,41 @@ class QRGetResponse(BaseModel):
     expires_at: str | None = Field(default=None, serialization_alias="expiresAt") # camelCase untuk frontend
 
 class QRScanRequest(BaseModel):
-    kode_unik: str
\ No newline at end of file
+    kode_unik: str
+
+
+# --- Sync ---
+
+class SyncChangesResponse(BaseModel):
+    entity: str
+    changed: List[int] = Field(default_factory=list)
+    deleted: List[int] = Field(default_factory=list)
+    # Token opaque; kirim balik sebagai ?since= pada sync berikutnya
+    watermark: str
+    has_more: bool
+    # True: scope user berubah (pindah dinas); buang cache lokal entity ini, data dikirim ulang dari awal
+    reset: bool = False
+
+
+# --- System ---
+
+class JobMetricsResponse(BaseModel):
+    interval_seconds: float
+    runs: int
+    failures: int
+    total_processed: int
+    last_processed: int
+    last_started_at: str | None = None
+    last_duration_ms: float
+    last_error: str | None = None
+
+
+class ProfileFrameSample(BaseModel):
+    frame: str
+    samples: int
+
+
+class ProfileSummaryResponse(BaseModel):
+    request_id: str
+    samples: int
+    top_self: List[ProfileFrameSample]
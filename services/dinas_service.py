@@ -1,15 +1,10 @@
 from __future__ import annotations
-from typing import List
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 import model.models as models
 import schemas.schemas as schemas
 
 class DinasService:
-    @staticmethod
-    def list(db: Session) -> List[models.Dinas]:
-        return db.query(models.Dinas).all()
-
     @staticmethod
     def create(db: Session, payload: schemas.DinasBase) -> models.Dinas:
         # PEP8: Keyword arguments lowercase
@@ -2,11 +2,40 @@ from __future__ import annotations
 from typing import List, Optional, Dict, Any
 from services.wallet_service import WalletService
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import extract, func
+from sqlalchemy import extract, func, select
 from fastapi import HTTPException, UploadFile
 import model.models as models
 from schemas.schemas import ReportCreate
-from utils.file_upload import save_report_photo
+from utils.file_upload import save_report_photos
+from utils.image_processing import schedule_report_images
+from utils.export import stream_rows
+from utils.fingerprint import aggregate_fingerprint, row_fingerprint
+import utils.asset_store  # noqa: F401  (registrasi reference count assets)
+import utils.change_tracking  # noqa: F401  (tombstone untuk delta sync)
+
+_REPORT_LOG = (models.ReportLog, models.ReportLog.report_id)
+
+# Kolom yang bisa dipilih untuk export (?columns=...)
+EXPORT_COLUMNS = {
+    "id": models.Report.id,
+    "kode_unik": models.Report.kode_unik,
+    "timestamp": models.Report.timestamp,
+    "status": models.Report.status,
+    "user_id": models.Report.user_id,
+    "user_nip": models.User.nip,
+    "user_nama": models.User.nama_lengkap,
+    "vehicle_id": models.Report.vehicle_id,
+    "vehicle_plat": models.Vehicle.plat,
+    "vehicle_nama": models.Vehicle.nama,
+    "dinas_id": models.Report.dinas_id,
+    "amount_rupiah": models.Report.amount_rupiah,
+    "amount_liter": models.Report.amount_liter,
+    "odometer": models.Report.odometer,
+    "description": models.Report.description,
+    "latitude": models.Report.latitude,
+    "longitude": models.Report.longitude,
+    "updated_at": models.Report.updated_at,
+}
 
 class ReportService:
     @staticmethod
@@ -153,6 +182,10 @@ class ReportService:
                 "odometer_photo_path": report.odometer_photo_path,
                 "invoice_photo_path": report.invoice_photo_path,
                 "my_pertamina_photo_path": report.my_pertamina_photo_path,
+                "vehicle_physical_photo_thumb_path": report.vehicle_physical_photo_thumb_path,
+                "odometer_photo_thumb_path": report.odometer_photo_thumb_path,
+                "invoice_photo_thumb_path": report.invoice_photo_thumb_path,
+                "my_pertamina_photo_thumb_path": report.my_pertamina_photo_thumb_path,
                 "logs": report.logs,
                 "submission_status": sub_status.value if sub_status else None,
                 "submission_total": float(sub_total) if sub_total else None
@@ -175,6 +208,95 @@ class ReportService:
     def get(db: Session, report_id: int) -> Optional[models.Report]:
         return ReportService._get_base_query(db).filter(models.Report.id == report_id).first()
 
+    # --- Fingerprint untuk conditional GET (lihat utils/fingerprint.py) ---
+
+    @staticmethod
+    def fingerprint(db: Session, report_id: int):
+        return row_fingerprint(db, models.Report, report_id, log=_REPORT_LOG)
+
+    @staticmethod
+    def list_fingerprint(
+        db: Session,
+        user_id: int | None = None,
+        vehicle_id: int | None = None,
+        month: int | None = None,
+        year: int | None = None,
+        dinas_id: int | None = None,
+        status: str | None = None,
+    ):
+        # Tanpa scope dinas user: set ini mencakup data list maupun total count di list()
+        conds = ReportService._list_conditions(user_id, vehicle_id, month, year, dinas_id, status)
+        return aggregate_fingerprint(db, models.Report, *conds, log=_REPORT_LOG)
+
+    @staticmethod
+    def _list_conditions(
+        user_id: int | None = None,
+        vehicle_id: int | None = None,
+        month: int | None = None,
+        year: int | None = None,
+        dinas_id: int | None = None,
+        status: str | None = None,
+    ) -> List[Any]:
+        """Filter yang sama dengan list()."""
+        conds = []
+        if user_id: conds.append(models.Report.user_id == user_id)
+        if vehicle_id: conds.append(models.Report.vehicle_id == vehicle_id)
+        if month: conds.append(extract('month', models.Report.timestamp) == month)
+        if year: conds.append(extract('year', models.Report.timestamp) == year)
+        if dinas_id: conds.append(models.Report.dinas_id == dinas_id)
+        if status: conds.append(models.Report.status == status)
+        return conds
+
+    @staticmethod
+    def export(
+        columns: List[str],
+        fmt: str,
+        current_user: models.User,
+        user_id: int | None = None,
+        vehicle_id: int | None = None,
+        month: int | None = None,
+        year: int | None = None,
+        dinas_id: int | None = None,
+        status: str | None = None,
+        session_factory=None,
+    ):
+        """Generator export (NDJSON/CSV) dengan filter dan scope dinas yang sama seperti list()."""
+        conds = ReportService._list_conditions(user_id, vehicle_id, month, year, dinas_id, status)
+        conds.append(models.Report.dinas_id == current_user.dinas_id)
+
+        def build_statement():
+            stmt = select(*(EXPORT_COLUMNS[name] for name in columns)).select_from(models.Report)
+            # Join hanya bila kolom relasi diminta
+            if any(name.startswith("user_") and name != "user_id" for name in columns):
+                stmt = stmt.outerjoin(models.User, models.User.id == models.Report.user_id)
+            if any(name.startswith("vehicle_") and name != "vehicle_id" for name in columns):
+                stmt = stmt.outerjoin(models.Vehicle, models.Vehicle.id == models.Report.vehicle_id)
+            # Urut PK: row bisa mulai dikirim tanpa menunggu sort seluruh hasil
+            return stmt.where(*conds).order_by(models.Report.id)
+
+        kwargs = {"session_factory": session_factory} if session_factory else {}
+        return stream_rows(build_statement, columns, fmt, **kwargs)
+
+    @staticmethod
+    def my_reports_fingerprint(
+        db: Session,
+        user_id: int,
+        vehicle_id: int | None = None,
+        month: int | None = None,
+        year: int | None = None,
+    ):
+        conds = [models.Report.user_id == user_id]
+        if vehicle_id: conds.append(models.Report.vehicle_id == vehicle_id)
+        if month: conds.append(extract('month', models.Report.timestamp) == month)
+        if year: conds.append(extract('year', models.Report.timestamp) == year)
+        reports = aggregate_fingerprint(db, models.Report, *conds, log=_REPORT_LOG)
+        # submission_status/submission_total ikut di response (join via kode_unik)
+        submissions = aggregate_fingerprint(
+            db, models.Submission, *conds,
+            joins=[(models.Report, models.Report.kode_unik == models.Submission.kode_unik)],
+        )
+        return reports + submissions
+
     @staticmethod
     def _create_report_log(db, report_id, status, user_id, notes):
         log = models.ReportLog(report_id=report_id, status=status, updated_by_user_id=user_id, notes=notes)
@@ -228,28 +350,33 @@ class ReportService:
         if not db.query(models.Vehicle).filter(models.Vehicle.id == vehicle_id).first():
             raise HTTPException(400, "VehicleID tidak ditemukan")
         
-        v_path = await save_report_photo(vehicle_photo, "vehicle")
-        o_path = await save_report_photo(odometer_photo, "odometer")
-        i_path = await save_report_photo(invoice_photo, "invoice")
-        m_path = await save_report_photo(mypertamina_photo, "mypertamina")
+        # Semua foto ditulis paralel; row DB baru di-commit setelah semua file tersimpan
+        paths = await save_report_photos({
+            "vehicle": vehicle_photo,
+            "odometer": odometer_photo,
+            "invoice": invoice_photo,
+            "mypertamina": mypertamina_photo,
+        })
         
         try:
             report = models.Report(
                 kode_unik=kode_unik, user_id=user_id, vehicle_id=vehicle_id, amount_rupiah=amount_rupiah,
                 amount_liter=amount_liter, description=description, status=models.ReportStatusEnum.pending,
                 latitude=latitude, longitude=longitude, odometer=odometer,
-                vehicle_physical_photo_path=v_path, odometer_photo_path=o_path,
-                invoice_photo_path=i_path, my_pertamina_photo_path=m_path,
+                vehicle_physical_photo_path=paths["vehicle"], odometer_photo_path=paths["odometer"],
+                invoice_photo_path=paths["invoice"], my_pertamina_photo_path=paths["mypertamina"],
                 dinas_id=user.dinas_id
             )
             db.add(report)
             db.flush()
             ReportService._create_report_log(db, report.id, models.ReportStatusEnum.pending, user_id, "Report dengan foto")
             db.commit()
-            return ReportService.get(db, report.id) # type: ignore
         except Exception as e:
             db.rollback()
             raise HTTPException(500, f"Failed: {str(e)}")
+        if any(paths.values()):
+            schedule_report_images(report.id)
+        return ReportService.get(db, report.id) # type: ignore
 
     @staticmethod
     async def update_with_upload(
@@ -274,15 +401,25 @@ class ReportService:
         if not report:
             raise HTTPException(404, "Report tidak ditemukan")
         
-        # Upload foto baru jika ada
-        if vehicle_photo and vehicle_photo.filename:
-            report.vehicle_physical_photo_path = await save_report_photo(vehicle_photo, "vehicle")
-        if odometer_photo and odometer_photo.filename:
-            report.odometer_photo_path = await save_report_photo(odometer_photo, "odometer")
-        if invoice_photo and invoice_photo.filename:
-            report.invoice_photo_path = await save_report_photo(invoice_photo, "invoice")
-        if mypertamina_photo and mypertamina_photo.filename:
-            report.my_pertamina_photo_path = await save_report_photo(mypertamina_photo, "mypertamina")
+        # Upload foto baru jika ada (paralel)
+        paths = await save_report_photos({
+            "vehicle": vehicle_photo,
+            "odometer": odometer_photo,
+            "invoice": invoice_photo,
+            "mypertamina": mypertamina_photo,
+        })
+        if paths["vehicle"]:
+            report.vehicle_physical_photo_path = paths["vehicle"]
+            report.vehicle_physical_photo_thumb_path = None
+        if paths["odometer"]:
+            report.odometer_photo_path = paths["odometer"]
+            report.odometer_photo_thumb_path = None
+        if paths["invoice"]:
+            report.invoice_photo_path = paths["invoice"]
+            report.invoice_photo_thumb_path = None
+        if paths["mypertamina"]:
+            report.my_pertamina_photo_path = paths["mypertamina"]
+            report.my_pertamina_photo_thumb_path = None
         
         # Update field lainnya jika ada nilai
         if kode_unik is not None:
@@ -305,6 +442,8 @@ class ReportService:
             report.odometer = odometer
         
         db.commit()
+        if any(paths.values()):
+            schedule_report_images(report.id)
         return ReportService.get(db, report.id)  # type: ignore
 
     @staticmethod
@@ -1,12 +1,37 @@
 from __future__ import annotations
 from typing import List, Optional, Dict, Any
 from services.wallet_service import WalletService
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import extract, func
+from sqlalchemy.orm import Session, aliased, joinedload
+from sqlalchemy import extract, func, select
 from fastapi import HTTPException
 import model.models as models
 import schemas.schemas as schemas
 from pydantic import BaseModel
+from utils.export import stream_rows
+from utils.fingerprint import aggregate_fingerprint, row_fingerprint
+import utils.change_tracking  # noqa: F401  (tombstone untuk delta sync)
+
+_SUBMISSION_LOG = (models.SubmissionLog, models.SubmissionLog.submission_id)
+
+_Creator = aliased(models.User)
+_Receiver = aliased(models.User)
+
+# Kolom yang bisa dipilih untuk export (?columns=...)
+EXPORT_COLUMNS = {
+    "id": models.Submission.id,
+    "kode_unik": models.Submission.kode_unik,
+    "date": models.Submission.date,
+    "created_at": models.Submission.created_at,
+    "status": models.Submission.status,
+    "creator_id": models.Submission.creator_id,
+    "creator_nama": _Creator.nama_lengkap,
+    "receiver_id": models.Submission.receiver_id,
+    "receiver_nama": _Receiver.nama_lengkap,
+    "dinas_id": models.Submission.dinas_id,
+    "total_cash_advance": models.Submission.total_cash_advance,
+    "description": models.Submission.description,
+    "updated_at": models.Submission.updated_at,
+}
 
 class SubmissionService:
     @staticmethod
@@ -88,6 +113,78 @@ class SubmissionService:
             "stat": stat_dict
         }
 
+    @staticmethod
+    def fingerprint(db: Session, submission_id: int):
+        return row_fingerprint(db, models.Submission, submission_id, log=_SUBMISSION_LOG)
+
+    @staticmethod
+    def list_fingerprint(
+        db: Session,
+        creator_id: int | None = None,
+        receiver_id: int | None = None,
+        status: str | None = None,
+        month: int | None = None,
+        year: int | None = None,
+        dinas_id: int | None = None,
+    ):
+        conds = SubmissionService._list_conditions(creator_id, receiver_id, status, month, year, dinas_id)
+        return aggregate_fingerprint(db, models.Submission, *conds, log=_SUBMISSION_LOG)
+
+    @staticmethod
+    def _list_conditions(
+        creator_id: int | None = None,
+        receiver_id: int | None = None,
+        status: str | None = None,
+        month: int | None = None,
+        year: int | None = None,
+        dinas_id: int | None = None,
+    ) -> List[Any]:
+        """Filter yang sama dengan list()."""
+        conds = []
+        if creator_id: conds.append(models.Submission.creator_id == creator_id)
+        if receiver_id: conds.append(models.Submission.receiver_id == receiver_id)
+        if status: conds.append(models.Submission.status == status)
+        if month: conds.append(extract('month', models.Submission.created_at) == month)
+        if year: conds.append(extract('year', models.Submission.created_at) == year)
+        if dinas_id: conds.append(models.Submission.dinas_id == dinas_id)
+        return conds
+
+    @staticmethod
+    def export(
+        columns: List[str],
+        fmt: str,
+        current_user: models.User,
+        creator_id: int | None = None,
+        receiver_id: int | None = None,
+        status: str | None = None,
+        month: int | None = None,
+        year: int | None = None,
+        dinas_id: int | None = None,
+        session_factory=None,
+    ):
+        """Generator export (NDJSON/CSV) dengan filter dan scope dinas yang sama seperti list()."""
+        conds = SubmissionService._list_conditions(creator_id, receiver_id, status, month, year, dinas_id)
+        conds.append(models.Submission.dinas_id == current_user.dinas_id)
+
+        def build_statement():
+            stmt = select(*(EXPORT_COLUMNS[name] for name in columns)).select_from(models.Submission)
+            if "creator_nama" in columns:
+                stmt = stmt.outerjoin(_Creator, _Creator.id == models.Submission.creator_id)
+            if "receiver_nama" in columns:
+                stmt = stmt.outerjoin(_Receiver, _Receiver.id == models.Submission.receiver_id)
+            # Urut PK: row bisa mulai dikirim tanpa menunggu sort seluruh hasil
+            return stmt.where(*conds).order_by(models.Submission.id)
+
+        kwargs = {"session_factory": session_factory} if session_factory else {}
+        return stream_rows(build_statement, columns, fmt, **kwargs)
+
+    @staticmethod
+    def my_submissions_fingerprint(db: Session, user_id: int, month: int | None = None, year: int | None = None):
+        conds = [models.Submission.receiver_id == user_id]
+        if month: conds.append(extract('month', models.Submission.created_at) == month)
+        if year: conds.append(extract('year', models.Submission.created_at) == year)
+        return aggregate_fingerprint(db, models.Submission, *conds, log=_SUBMISSION_LOG)
+
     @staticmethod
     def get(db: Session, submission_id: int) -> Optional[models.Submission]:
         submission = SubmissionService._get_base_query(db).filter(models.Submission.id == submission_id).first()
@@ -0,0 +1,154 @@
+from __future__ import annotations
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, false, or_, select
+from sqlalchemy.orm import Session
+
+import model.models as models
+from config import get_settings
+from utils.change_tracking import TRACKED_MODELS
+
+ENTITY_MODELS = {name: model for model, name in TRACKED_MODELS.items()}
+
+# Row dengan updated_at sangat baru bisa milik transaksi yang belum commit; tahan
+# sebentar agar tidak terlewat oleh watermark yang sudah maju melewatinya.
+# Batasan: updated_at/deleted_at diisi saat flush (onupdate Python), bukan saat commit.
+# Transaksi yang commit lebih lama dari lag ini setelah flush-nya akan terlewat
+# permanen oleh client yang sudah sync di antaranya, jadi SYNC_SAFETY_LAG_SECONDS
+# harus lebih besar dari transaksi tulis terlama (termasuk job batch/import).
+SAFETY_LAG = timedelta(seconds=get_settings().sync_safety_lag_seconds)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+Cursor = Tuple[datetime, int]
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def encode_watermark(changed: Cursor, deleted: Cursor, dinas_id: Optional[int] = None) -> str:
+    raw = json.dumps({
+        "u": [changed[0].isoformat(), changed[1]],
+        "d": [deleted[0].isoformat(), deleted[1]],
+        "s": dinas_id,
+    })
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_watermark(token: str | None) -> Tuple[Cursor, Cursor, Optional[int]]:
+    """Cursor changed, cursor deleted, dan dinas user saat watermark diterbitkan."""
+    if not token:
+        return (_EPOCH, 0), (_EPOCH, 0), None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        scope = data.get("s")
+        return (
+            (_as_utc(datetime.fromisoformat(data["u"][0])), int(data["u"][1])),
+            (_as_utc(datetime.fromisoformat(data["d"][0])), int(data["d"][1])),
+            int(scope) if scope is not None else None,
+        )
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Watermark tidak valid")
+
+
+def _after(ts_col: Any, id_col: Any, cursor: Cursor):
+    ts, last_id = cursor
+    return or_(ts_col > ts, and_(ts_col == ts, id_col > last_id))
+
+
+class SyncService:
+    @staticmethod
+    def _scope(model: Any, user: models.User):
+        """Batasi row yang boleh dilihat user: miliknya sendiri atau satu dinas."""
+        dinas_id = user.dinas_id
+        if model is models.Report:
+            conds = [models.Report.user_id == user.id]
+            if dinas_id: conds.append(models.Report.dinas_id == dinas_id)
+        elif model is models.Submission:
+            conds = [models.Submission.creator_id == user.id, models.Submission.receiver_id == user.id]
+            if dinas_id: conds.append(models.Submission.dinas_id == dinas_id)
+        elif model is models.Vehicle:
+            assoc = models.user_vehicle_association
+            conds = [models.Vehicle.id.in_(select(assoc.c.vehicle_id).where(assoc.c.user_id == user.id))]
+            if dinas_id: conds.append(models.Vehicle.dinas_id == dinas_id)
+        elif model is models.User:
+            conds = [models.User.id == user.id]
+            if dinas_id: conds.append(models.User.dinas_id == dinas_id)
+        else:
+            return false()
+        return or_(*conds)
+
+    @staticmethod
+    def changes(
+        db: Session,
+        entity: str,
+        user: models.User,
+        since: str | None = None,
+        limit: int = 500,
+    ) -> Dict[str, Any]:
+        model = ENTITY_MODELS.get(entity)
+        if model is None:
+            raise HTTPException(status_code=404, detail="Entity sync tidak dikenal")
+        changed_cursor, deleted_cursor, since_dinas = decode_watermark(since)
+        # User pindah dinas: seluruh row dinas lama keluar dari scope tanpa tombstone
+        # per row, jadi client wajib membuang cache entity ini dan sync ulang dari awal.
+        reset = since is not None and since_dinas != user.dinas_id
+        if reset:
+            changed_cursor, deleted_cursor = (_EPOCH, 0), (_EPOCH, 0)
+        upper = datetime.now(timezone.utc) - SAFETY_LAG
+
+        rows = db.execute(
+            select(model.id, model.updated_at)
+            .where(
+                _after(model.updated_at, model.id, changed_cursor),
+                model.updated_at <= upper,
+                SyncService._scope(model, user),
+            )
+            .order_by(model.updated_at, model.id)
+            .limit(limit + 1)
+        ).all()
+
+        tomb = models.Tombstone
+        tomb_scope = [tomb.user_id == user.id]
+        if user.dinas_id:
+            tomb_scope.append(tomb.dinas_id == user.dinas_id)
+        tombstones = [] if reset else db.execute(
+            select(tomb.id, tomb.entity_id, tomb.deleted_at)
+            .where(
+                tomb.entity == entity,
+                or_(*tomb_scope),
+                _after(tomb.deleted_at, tomb.id, deleted_cursor),
+                tomb.deleted_at <= upper,
+            )
+            .order_by(tomb.deleted_at, tomb.id)
+            .limit(limit + 1)
+        ).all()
+
+        has_more = len(rows) > limit or len(tombstones) > limit
+        rows, tombstones = rows[:limit], tombstones[:limit]
+        if rows:
+            changed_cursor = (_as_utc(rows[-1].updated_at), rows[-1].id)
+        if tombstones:
+            deleted_cursor = (_as_utc(tombstones[-1].deleted_at), tombstones[-1].id)
+
+        changed: List[int] = [r.id for r in rows]
+        deleted: List[int] = list(dict.fromkeys(t.entity_id for t in tombstones))
+        if deleted:
+            # Keluar dari satu scope belum tentu keluar dari scope user (misal pemilik
+            # kendaraan yang dinasnya berganti); row yang masih terlihat tidak dihapus.
+            visible = set(db.scalars(
+                select(model.id).where(model.id.in_(deleted), SyncService._scope(model, user))
+            ))
+            deleted = [i for i in deleted if i not in visible]
+        return {
+            "entity": entity,
+            "changed": changed,
+            "deleted": deleted,
+            "watermark": encode_watermark(changed_cursor, deleted_cursor, user.dinas_id),
+            "has_more": has_more,
+            "reset": reset,
+        }
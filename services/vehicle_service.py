@@ -2,10 +2,14 @@ from __future__ import annotations
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, UploadFile
-from sqlalchemy import func
+from sqlalchemy import func, or_
 import model.models as models
 from schemas.schemas import VehicleCreate, VehicleUpdate, VehicleStatusEnum
-from utils.file_upload import save_vehicle_photo, delete_file
+from utils.file_upload import save_vehicle_photo
+from utils.image_processing import schedule_vehicle_image
+from utils.fingerprint import aggregate_fingerprint
+import utils.asset_store  # noqa: F401  (registrasi reference count assets)
+import utils.change_tracking  # noqa: F401  (tombstone untuk delta sync)
 
 class VehicleService:
     @staticmethod
@@ -161,6 +165,8 @@ class VehicleService:
         
         db.add(v)
         db.commit()
+        if foto_path:
+            schedule_vehicle_image(v.id)
         return VehicleService._get_base_query(db).filter(models.Vehicle.id == v.id).first()  # type: ignore
 
     @staticmethod
@@ -188,12 +194,12 @@ class VehicleService:
             raise HTTPException(404, "Vehicle not found")
 
         # Update foto jika ada upload baru
+        new_photo = False
         if foto_fisik and foto_fisik.filename:
-            # Hapus foto lama
-            if v.foto_fisik:
-                delete_file(v.foto_fisik)
-            # Upload foto baru
+            # Upload foto baru; foto lama dibersihkan GC setelah tidak direferensikan
             v.foto_fisik = await save_vehicle_photo(foto_fisik)
+            v.foto_fisik_thumb = None
+            new_photo = True
 
         # Update field lainnya jika ada nilai
         if nama is not None:
@@ -230,6 +236,8 @@ class VehicleService:
             v.current_fuel_bar = current_fuel_bar
 
         db.commit()
+        if new_photo:
+            schedule_vehicle_image(v.id)
         return VehicleService._get_base_query(db).filter(models.Vehicle.id == v.id).first()  # type: ignore
 
     @staticmethod
@@ -239,6 +247,26 @@ class VehicleService:
         db.delete(v)
         db.commit()
     
+    @staticmethod
+    def list_fingerprint(db: Session):
+        # Statistik di list() dihitung dari seluruh tabel, jadi fingerprint juga seluruh tabel
+        return aggregate_fingerprint(db, models.Vehicle)
+
+    @staticmethod
+    def my_vehicles_fingerprint(db: Session, user_id: int):
+        assoc = models.user_vehicle_association
+        vehicles = aggregate_fingerprint(
+            db, models.Vehicle, assoc.c.user_id == user_id,
+            joins=[(assoc, assoc.c.vehicle_id == models.Vehicle.id)],
+        )
+        # Total report/BBM dan jumlah submission per kendaraan ikut di response
+        reports = aggregate_fingerprint(db, models.Report, models.Report.user_id == user_id)
+        submissions = aggregate_fingerprint(
+            db, models.Submission,
+            or_(models.Submission.creator_id == user_id, models.Submission.receiver_id == user_id),
+        )
+        return vehicles + reports + submissions
+
     @staticmethod
     def get_my_vehicles(db: Session, user_id: int, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
         # Get total count first
@@ -260,27 +288,34 @@ class VehicleService:
             joinedload(models.Vehicle.dinas)
         ).offset(offset).limit(limit).all()
 
-        result = []
-        for v in vehicles:
-            submission_count = db.query(func.count(models.Submission.id)).filter(
-                (models.Submission.creator_id == user_id) | (models.Submission.receiver_id == user_id)
-            ).scalar() or 0
-
-            report_count = db.query(func.count(models.Report.id)).filter(
-                models.Report.vehicle_id == v.id, models.Report.user_id == user_id
-            ).scalar() or 0
-
-            latest_report = db.query(models.Report).filter(
-                models.Report.vehicle_id == v.id, models.Report.user_id == user_id
-            ).order_by(models.Report.timestamp.desc()).first()
+        # Satu query agregat untuk semua kendaraan di halaman ini (bukan 4 query per kendaraan)
+        submission_count = db.query(func.count(models.Submission.id)).filter(
+            (models.Submission.creator_id == user_id) | (models.Submission.receiver_id == user_id)
+        ).scalar() or 0
 
-            total_fuel = db.query(func.sum(models.Report.amount_liter)).filter(
-                models.Report.vehicle_id == v.id, models.Report.user_id == user_id
-            ).scalar() or 0
+        report_stats: Dict[int, Any] = {}
+        if vehicles:
+            report_stats = {
+                row.vehicle_id: row
+                for row in db.query(
+                    models.Report.vehicle_id,
+                    func.count(models.Report.id).label("report_count"),
+                    func.sum(models.Report.amount_liter).label("total_fuel"),
+                    func.sum(models.Report.amount_rupiah).label("total_rupiah"),
+                    func.max(models.Report.timestamp).label("last_refuel"),
+                ).filter(
+                    models.Report.user_id == user_id,
+                    models.Report.vehicle_id.in_([v.id for v in vehicles]),
+                ).group_by(models.Report.vehicle_id)
+            }
 
-            total_rupiah = db.query(func.sum(models.Report.amount_rupiah)).filter(
-                models.Report.vehicle_id == v.id, models.Report.user_id == user_id
-            ).scalar() or 0
+        result = []
+        for v in vehicles:
+            stats = report_stats.get(v.id)
+            report_count = stats.report_count if stats else 0
+            total_fuel = (stats.total_fuel if stats else None) or 0
+            total_rupiah = (stats.total_rupiah if stats else None) or 0
+            last_refuel = stats.last_refuel if stats else None
 
             vehicle_detail = {
                 "id": v.id,
@@ -292,6 +327,7 @@ class VehicleService:
                 "odometer": v.odometer,
                 "status": v.status,
                 "foto_fisik": v.foto_fisik,
+                "foto_fisik_thumb": v.foto_fisik_thumb,
                 "asset_icon_name": v.asset_icon_name,
                 "asset_icon_color": v.asset_icon_color,
                 "tipe_transmisi": v.tipe_transmisi,
@@ -304,7 +340,7 @@ class VehicleService:
                 "total_reports": report_count,
                 "total_fuel_liters": float(total_fuel),
                 "total_rupiah_spent": float(total_rupiah),
-                "last_refuel_date": latest_report.timestamp if latest_report else None,
+                "last_refuel_date": last_refuel,
             }
             result.append(vehicle_detail)
 
@@ -365,6 +401,7 @@ class VehicleService:
             "odometer": vehicle.odometer, 
             "status": vehicle.status, 
             "foto_fisik": vehicle.foto_fisik, 
+            "foto_fisik_thumb": vehicle.foto_fisik_thumb,
             "asset_icon_name": vehicle.asset_icon_name, 
             "asset_icon_color": vehicle.asset_icon_color,
             "tipe_transmisi": vehicle.tipe_transmisi, 
@@ -1,15 +1,11 @@
 from __future__ import annotations
-from typing import List, Optional
+from typing import Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
 from model.models import VehicleType
 
 class VehicleTypeService:
-    @staticmethod
-    def list(db: Session) -> List[VehicleType]:
-        return db.query(VehicleType).order_by(VehicleType.id.asc()).all()
-
     @staticmethod
     def get(db: Session, vt_id: int) -> Optional[VehicleType]:
         return db.query(VehicleType).filter(VehicleType.id == vt_id).first()
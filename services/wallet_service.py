@@ -8,7 +8,9 @@ from schemas.schemas import WalletCreate, WalletUpdate
 class WalletService:
     @staticmethod
     def list(db: Session) -> List[models.Wallet]:
-        return db.query(models.Wallet).all()
+        return db.query(models.Wallet).options(
+            joinedload(models.Wallet.user), joinedload(models.Wallet.wallet_type)
+        ).all()
 
     @staticmethod
     def get(db: Session, wallet_id: int) -> Optional[models.Wallet]:
@@ -79,8 +81,8 @@ class WalletService:
         if not wallet:
             raise HTTPException(status_code=404, detail=f"Wallet untuk User ID {user_id} tidak ditemukan")
 
-        current_balance = float(wallet.balance) if wallet.balance else 0.0
-        wallet.balance = current_balance + float(amount)
+        current_balance = float(wallet.saldo) if wallet.saldo else 0.0
+        wallet.saldo = current_balance + float(amount)
         
         db.add(wallet)
         db.flush()
@@ -92,8 +94,8 @@ class WalletService:
         if not wallet:
             raise HTTPException(status_code=404, detail=f"Wallet untuk User ID {user_id} tidak ditemukan")
 
-        current_balance = float(wallet.balance) if wallet.balance else 0.0
-        wallet.balance = current_balance - float(amount)
+        current_balance = float(wallet.saldo) if wallet.saldo else 0.0
+        wallet.saldo = current_balance - float(amount)
         
         db.add(wallet)
         db.flush()
\ No newline at end of file
@@ -30,7 +30,6 @@ def db_session():
         session.close()
 
 # Override FastAPI dependency
-@app.dependency_overrides[real_get_db]  # type: ignore[index]
 def override_get_db():  # pragma: no cover
     session = TestingSessionLocal()
     try:
@@ -38,6 +37,8 @@ def override_get_db():  # pragma: no cover
     finally:
         session.close()
 
+app.dependency_overrides[real_get_db] = override_get_db
+
 @pytest.fixture()
 def client():
     with TestClient(app) as c:
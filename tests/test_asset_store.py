@@ -0,0 +1,109 @@
+from __future__ import annotations
+import os
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import model.models as models
+import utils.asset_store as asset_store
+import utils.file_upload as file_upload
+
+
+@pytest.fixture
+def db() -> Session:
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def ref_count(db: Session, path: str) -> int | None:
+    blob = db.get(models.AssetBlob, path)
+    return blob.ref_count if blob else None
+
+
+def make_vehicle(db: Session, plat: str, foto: str | None) -> models.Vehicle:
+    v = models.Vehicle(
+        nama="Avanza", plat=plat, vehicle_type_id=1,
+        status=models.VehicleStatusEnum.active, foto_fisik=foto,
+    )
+    db.add(v)
+    db.commit()
+    return v
+
+
+def test_ref_count_follows_inserts_updates_and_deletes(db: Session):
+    a = make_vehicle(db, "B 1", "assets/blobs/aa.jpg")
+    make_vehicle(db, "B 2", "assets/blobs/aa.jpg")
+    assert ref_count(db, "assets/blobs/aa.jpg") == 2
+
+    a.foto_fisik = "assets/blobs/bb.jpg"
+    db.commit()
+    assert ref_count(db, "assets/blobs/aa.jpg") == 1
+    assert ref_count(db, "assets/blobs/bb.jpg") == 1
+
+    db.delete(a)
+    db.commit()
+    assert ref_count(db, "assets/blobs/bb.jpg") == 0
+
+
+def test_gc_removes_only_old_unreferenced_blobs(db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    blobs = tmp_path / "assets" / "blobs"
+    monkeypatch.setattr(file_upload, "BLOBS_DIR", blobs)
+    monkeypatch.setattr(asset_store, "BLOBS_DIR", blobs)
+    monkeypatch.chdir(tmp_path)
+
+    kept = Path(file_upload.store_bytes(b"kept", ".jpg"))
+    orphan = Path(file_upload.store_bytes(b"orphan", ".jpg"))
+    fresh = Path(file_upload.store_bytes(b"fresh", ".jpg"))
+    old = time.time() - 2 * asset_store.DEFAULT_GRACE_SECONDS
+    for p in (kept, orphan):
+        os.utime(p, (old, old))
+    make_vehicle(db, "B 1", str(kept))
+
+    stats = asset_store.collect_garbage(db, dry_run=True)
+    assert stats["deleted"] == 1 and orphan.exists()
+
+    asset_store.collect_garbage(db)
+    assert kept.exists()
+    assert fresh.exists()  # masih dalam grace period
+    assert not orphan.exists()
+
+
+def test_gc_keeps_blob_reuploaded_during_scan(db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    blobs = tmp_path / "assets" / "blobs"
+    monkeypatch.setattr(file_upload, "BLOBS_DIR", blobs)
+    monkeypatch.setattr(asset_store, "BLOBS_DIR", blobs)
+    monkeypatch.chdir(tmp_path)
+
+    relinked, touched, orphan = (Path(file_upload.store_bytes(c, ".jpg")) for c in (b"a", b"b", b"c"))
+    vehicle = make_vehicle(db, "B 1", str(relinked))
+    vehicle.foto_fisik = str(orphan)
+    db.commit()
+    vehicle.foto_fisik = None
+    db.commit()
+    old = time.time() - 2 * asset_store.DEFAULT_GRACE_SECONDS
+    for p in (relinked, touched, orphan):
+        os.utime(p, (old, old))
+
+    storage = asset_store.get_storage()
+    listing = list(storage.iter_files(str(blobs)))
+
+    class RacingStorage(type(storage)):
+        def iter_files(self, prefix):
+            # Listing sudah diambil; upload ulang konten yang sama terjadi sebelum delete
+            make_vehicle(db, "B 2", str(relinked))
+            file_upload.store_bytes(b"b", ".jpg")
+            yield from listing
+
+    monkeypatch.setattr(asset_store, "get_storage", RacingStorage)
+    stats = asset_store.collect_garbage(db)
+
+    assert stats["deleted"] == 1
+    assert relinked.exists() and ref_count(db, str(relinked)) == 1
+    assert touched.exists()
+    assert not orphan.exists() and ref_count(db, str(orphan)) is None
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from benchmarks import run as bench
+from benchmarks.dataset import Scale, build, describe
+from sqlalchemy import create_engine
+
+TINY = Scale(dinas=2, users=8, vehicles=10, reports=60, submissions=20)
+
+
+def test_dataset_is_deterministic(tmp_path):
+    infos = []
+    for name in ("a", "b"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+        infos.append(build(engine, TINY, seed=7).to_dict())
+        engine.dispose()
+    assert infos[0] == infos[1]
+
+
+def test_benchmark_run_covers_services_and_routes(tmp_path):
+    report = bench.run(f"sqlite:///{tmp_path / 'bench.db'}", TINY, iterations=2, warmup=0)
+    results = report["results"]
+    assert {r["kind"] for r in results.values()} == {"service", "route"}
+    routes = {name: r for name, r in results.items() if r["kind"] == "route"}
+    assert all(r["status"] == 200 for r in routes.values()), routes
+    assert results["ReportService.get"]["queries"] == 1
+    assert results["dinas_cache.get[miss]"]["queries"] == 1
+    assert all(r["p95_ms"] >= r["p50_ms"] for r in results.values())
+
+    slower = {"results": {name: dict(r, p95_ms=r["p95_ms"] * 10) for name, r in results.items()}}
+    assert bench.compare(report, report, 1.25) == []
+    assert bench.compare(slower, report, 1.25)
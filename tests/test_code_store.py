@@ -0,0 +1,66 @@
+from __future__ import annotations
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import model.models as models
+import utils.code_store as code_store
+from utils.code_store import MemoryCodeStore, SqlCodeStore
+
+
+@pytest.fixture
+def db() -> Session:
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture(params=["memory", "sql"])
+def store(request, db: Session):
+    return (MemoryCodeStore() if request.param == "memory" else SqlCodeStore()), db
+
+
+def test_verify_and_consume_is_single_use(store):
+    s, db = store
+    rec = s.put("register", 1, "1234", 60, db=db)
+    assert rec.kode_unik == "1234"
+    assert s.verify("register", 1, "0000", db=db) == (False, "invalid")
+    assert s.verify("register", 1, "1234", db=db) == (True, None)
+    assert s.verify("register", 1, "1234", consume=True, db=db) == (True, None)
+    assert s.verify("register", 1, "1234", consume=True, db=db) == (False, "invalid")
+
+
+def test_put_replaces_previous_code_and_reverse_lookup(store):
+    s, db = store
+    s.put("otp", 7, "1111", 60, db=db)
+    s.put("otp", 7, "2222", 60, db=db)
+    assert s.verify("otp", 7, "1111", db=db) == (False, "invalid")
+    assert s.find_user("otp", "2222", db=db) == 7
+    assert s.find_user("otp", "1111", db=db) is None
+    assert s.get_or_create("otp", 7, lambda: "9999", 60, db=db).kode_unik == "2222"
+
+
+def test_expired_code_is_reported_then_purged(store, monkeypatch: pytest.MonkeyPatch):
+    s, db = store
+    s.put("password_reset", 3, "4321", -1, db=db)
+    assert s.verify("password_reset", 3, "4321", consume=True, db=db) == (False, "expired")
+    assert s.find_user("password_reset", "4321", db=db) is None
+
+    later = code_store._utc_now() + timedelta(seconds=code_store.EXPIRED_GRACE_SECONDS + 5)
+    monkeypatch.setattr(code_store, "_utc_now", lambda: later)
+    monkeypatch.setattr(code_store.time, "time", lambda: later.timestamp())
+    assert s.purge_expired(db=db) == 1
+    assert s.verify("password_reset", 3, "4321", db=db) == (False, "invalid")
+
+
+def test_sql_purge_deletes_in_batches(db: Session):
+    s = SqlCodeStore()
+    for user_id in range(1, 8):
+        s.put("otp", user_id, f"{user_id:04d}", -(code_store.EXPIRED_GRACE_SECONDS + 60), db=db)
+    s.put("otp", 99, "9999", 60, db=db)
+    assert s.purge_expired(db=db, batch_size=3, pause_seconds=0) == 7
+    assert db.query(models.UniqueCodeGenerator).count() == 1
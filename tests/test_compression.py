@@ -0,0 +1,78 @@
+from __future__ import annotations
+import gzip
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from middleware import CompressionMiddleware
+
+PAYLOAD = [{"id": i, "nama": f"Laporan {i}", "status": "pending"} for i in range(200)]
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return PAYLOAD
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" + b"0" * 4096, media_type="image/png")
+
+    @app.get("/svg")
+    def svg():
+        return Response(b"<svg>" + b"<path/>" * 600 + b"</svg>", media_type="image/svg+xml", headers={"ETag": '"qr"'})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"baris {i}\n" for i in range(100)), media_type="text/plain")
+
+    @app.get("/etag")
+    def etag():
+        return PlainTextResponse("x" * 2000, headers={"ETag": '"abc"'})
+
+    return TestClient(app)
+
+
+def test_negotiates_brotli_then_gzip():
+    client = _client()
+    res = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert res.headers["content-encoding"] == "br"
+    assert "Accept-Encoding" in res.headers["vary"]
+
+    with client.stream("GET", "/big", headers={"Accept-Encoding": "gzip, br;q=0"}) as res:
+        raw = b"".join(res.iter_raw())
+    assert res.headers["content-encoding"] == "gzip"
+    assert int(res.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw).startswith(b'[{"id":0,')
+
+
+def test_skips_small_images_and_identity():
+    client = _client()
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/image", headers={"Accept-Encoding": "gzip"}).headers
+    svg = client.get("/svg", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in svg.headers and svg.headers["etag"] == '"qr"'
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_streaming_response_is_compressed_incrementally():
+    client = _client()
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "br"}) as res:
+        raw = b"".join(res.iter_raw())
+    assert res.headers["content-encoding"] == "br"
+    assert "content-length" not in res.headers
+    assert brotli.decompress(raw).decode().startswith("baris 0\nbaris 1\n")
+
+
+def test_strong_etag_becomes_weak_when_compressed():
+    res = _client().get("/etag", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["etag"] == 'W/"abc"'
@@ -0,0 +1,131 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import controller.auth as auth
+import model.models as models
+from database.database import get_db
+from routers import report as report_router
+from services.report_service import ReportService
+from utils import fingerprint
+from utils.storage import LocalStorage
+
+
+@pytest.fixture
+def factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _seed(db: Session) -> models.Report:
+    user = models.User(
+        nip="1", role=models.RoleEnum.pic, nama_lengkap="User", email="u@example.com", password="x"
+    )
+    vt = models.VehicleType(nama="Mobil")
+    db.add_all([user, vt])
+    db.flush()
+    vehicle = models.Vehicle(
+        nama="Avanza", plat="B 1 A", vehicle_type_id=vt.id, status=models.VehicleStatusEnum.active
+    )
+    db.add(vehicle)
+    db.flush()
+    report = models.Report(
+        kode_unik="R1", user_id=user.id, vehicle_id=vehicle.id, amount_rupiah=10000,
+        amount_liter=1, status=models.ReportStatusEnum.pending, timestamp=datetime.now(timezone.utc),
+    )
+    db.add(report)
+    db.commit()
+    return report
+
+
+def test_fingerprints_change_on_edit_and_log(factory):
+    with factory() as db:
+        report = _seed(db)
+        detail = ReportService.fingerprint(db, report.id)
+        listing = ReportService.list_fingerprint(db)
+
+        report.description = "diubah"
+        db.commit()
+        assert ReportService.fingerprint(db, report.id) != detail
+        assert ReportService.list_fingerprint(db) != listing
+
+        detail = ReportService.fingerprint(db, report.id)
+        db.add(models.ReportLog(report_id=report.id, status=models.ReportStatusEnum.accepted))
+        db.commit()
+        assert ReportService.fingerprint(db, report.id) != detail
+        assert ReportService.fingerprint(db, 999) is None
+
+
+def test_report_detail_answers_304(factory):
+    with factory() as db:
+        report_id = _seed(db).id
+
+    def override_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(report_router.router)
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[auth.get_current_user] = lambda: models.User(id=1, dinas_id=None)
+    client = TestClient(app)
+
+    res = client.get(f"/report/{report_id}")
+    assert res.status_code == 200
+    etag = res.headers["etag"]
+    assert etag.startswith('W/"')
+
+    assert client.get(f"/report/{report_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    with factory() as db:
+        db.get(models.Report, report_id).amount_liter = 2
+        db.commit()
+    assert client.get(f"/report/{report_id}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_presigned_urls_rotate_etag(factory, monkeypatch):
+    with factory() as db:
+        report_id = _seed(db).id
+
+    class PresigningStorage(LocalStorage):
+        window = 1
+
+        def url_window(self):
+            return self.window
+
+    storage = PresigningStorage()
+    monkeypatch.setattr(fingerprint, "get_storage", lambda: storage)
+
+    def override_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(report_router.router)
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[auth.get_current_user] = lambda: models.User(id=1, dinas_id=None)
+    client = TestClient(app)
+
+    etag = client.get(f"/report/{report_id}").headers["etag"]
+    assert client.get(f"/report/{report_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    # Jendela presign berganti: body lama berisi URL yang akan kedaluwarsa, kirim ulang
+    storage.window = 2
+    res = client.get(f"/report/{report_id}", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["etag"] != etag
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import model.models as models
+from services.report_service import EXPORT_COLUMNS, ReportService
+from utils.export import parse_columns
+
+
+@pytest.fixture
+def factory():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        dinas = models.Dinas(nama="Dinas A")
+        vt = models.VehicleType(nama="Mobil")
+        db.add_all([dinas, vt])
+        db.flush()
+        user = models.User(
+            nip="1", role=models.RoleEnum.pic, nama_lengkap="Budi", email="b@x", password="x", dinas_id=dinas.id
+        )
+        vehicle = models.Vehicle(nama="Avanza", plat="B 1", vehicle_type_id=vt.id, status=models.VehicleStatusEnum.active)
+        db.add_all([user, vehicle])
+        db.flush()
+        for i in range(5):
+            db.add(models.Report(
+                kode_unik=f"R{i}", user_id=user.id, vehicle_id=vehicle.id, dinas_id=dinas.id if i < 4 else None,
+                amount_rupiah=10000 * (i + 1), amount_liter=1.5, status=models.ReportStatusEnum.pending,
+                timestamp=datetime(2026, 10, 1, tzinfo=timezone.utc),
+            ))
+        db.commit()
+    return factory
+
+
+def _user(factory) -> models.User:
+    with factory() as db:
+        return db.query(models.User).first()
+
+
+def test_csv_export_streams_selected_columns_in_dinas_scope(factory):
+    names = parse_columns("id,user_nama,vehicle_plat,amount_rupiah", EXPORT_COLUMNS)
+    chunks = list(ReportService.export(names, "csv", _user(factory), session_factory=factory))
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == names
+    assert len(rows) == 5  # header + 4 report dalam dinas user
+    assert rows[1] == ["1", "Budi", "B 1", "10000.0"]
+
+
+def test_ndjson_export_and_column_validation(factory):
+    body = b"".join(ReportService.export(["kode_unik", "status"], "ndjson", _user(factory), session_factory=factory))
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert lines[0] == {"kode_unik": "R0", "status": models.ReportStatusEnum.pending.value}
+    assert len(lines) == 4
+
+    with pytest.raises(HTTPException):
+        parse_columns("id,password", EXPORT_COLUMNS)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+import utils.file_upload as file_upload
+
+
+def make_upload(data: bytes, filename: str = "photo.jpg") -> UploadFile:
+    return UploadFile(
+        io.BytesIO(data),
+        filename=filename,
+        headers=Headers({"content-type": "image/jpeg"}),
+    )
+
+
+@pytest.fixture
+def blobs_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(file_upload, "BLOBS_DIR", tmp_path)
+    return tmp_path
+
+
+def stored_files(root: Path) -> list[Path]:
+    return [p for p in root.rglob("*") if p.is_file()]
+
+
+def test_write_stream_atomic_hashes_and_renames(blobs_dir: Path):
+    data = b"x" * (file_upload.CHUNK_SIZE + 123)
+    key, size, digest = file_upload._write_stream_atomic(io.BytesIO(data), ".jpg", len(data))
+    assert digest == hashlib.sha256(data).hexdigest()
+    path = Path(key)
+    assert path == blobs_dir / digest[:2] / digest[2:4] / f"{digest}.jpg"
+    assert path.read_bytes() == data
+    assert size == len(data)
+    # Tidak ada file sementara yang tertinggal
+    assert stored_files(blobs_dir) == [path]
+
+
+def test_write_stream_atomic_too_large_leaves_nothing(blobs_dir: Path):
+    with pytest.raises(HTTPException) as exc:
+        file_upload._write_stream_atomic(io.BytesIO(b"x" * 100), ".jpg", 10)
+    assert exc.value.status_code == 400
+    assert stored_files(blobs_dir) == []
+
+
+def test_same_content_is_stored_once(blobs_dir: Path):
+    first = file_upload.store_bytes(b"same photo", ".jpg")
+    second = file_upload.store_bytes(b"same photo", ".jpg")
+    assert first == second
+    assert len(stored_files(blobs_dir)) == 1
+
+
+def test_save_report_photos_parallel(blobs_dir: Path):
+    photos = {
+        "vehicle": make_upload(b"vehicle"),
+        "odometer": make_upload(b"odometer"),
+        "invoice": None,
+        "mypertamina": make_upload(b"mypertamina"),
+    }
+    paths = asyncio.run(file_upload.save_report_photos(photos))
+    assert paths["invoice"] is None
+    assert Path(paths["vehicle"]).read_bytes() == b"vehicle"  # type: ignore[arg-type]
+    assert Path(paths["mypertamina"]).read_bytes() == b"mypertamina"  # type: ignore[arg-type]
+
+
+def test_save_report_photos_raises_first_error(blobs_dir: Path):
+    photos = {
+        "vehicle": make_upload(b"vehicle"),
+        "invoice": make_upload(b"not-an-image", filename="invoice.exe"),
+    }
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(file_upload.save_report_photos(photos))
+    assert exc.value.status_code == 400
+    # Hanya blob lengkap yang tersisa (tanpa file .part); sisanya urusan GC
+    assert all(not p.name.startswith(file_upload.TMP_PREFIX) for p in stored_files(blobs_dir))
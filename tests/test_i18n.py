@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from i18n import messages
+from i18n.messages import get_message, get_message_by_id, message_id
+from middleware import LanguagePrefixMiddleware
+from utils.responses import detect_lang
+
+
+def test_catalog_fallback_and_ids():
+    assert get_message("login_success", "en") == "Login successful"
+    assert get_message("login_success", "EN") == "Login successful"
+    assert get_message("login_success", "xx") == get_message("login_success", messages.DEFAULT_LANG)
+    assert get_message("unknown_key", "en") == "unknown_key"
+    kid = message_id("qr_invalid")
+    assert get_message_by_id(kid, "en") == get_message("qr_invalid", "en")
+    # Semua bahasa punya entri untuk setiap key
+    assert all(len(table) == len(messages.MESSAGE_KEYS) for table in messages._CATALOG.values())
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(LanguagePrefixMiddleware)
+
+    @app.get("/echo")
+    def echo(request: Request):
+        return {"lang": detect_lang(request), "path": request.url.path}
+
+    return TestClient(app)
+
+
+def test_language_prefix_and_detection_priority():
+    client = _client()
+    assert client.get("/en/echo").json() == {"lang": "en", "path": "/echo"}
+    assert client.get("/JA/echo/").json()["lang"] == "ja"
+    assert client.get("/echo").json()["lang"] == messages.DEFAULT_LANG
+    # Accept-Language sengaja diabaikan: browser (en-US) tetap mendapat DEFAULT_LANG
+    assert client.get("/echo", headers={"Accept-Language": "zh-CN,zh;q=0.9"}).json()["lang"] == messages.DEFAULT_LANG
+    assert client.get("/en/echo", headers={"X-Lang": "ko"}).json()["lang"] == "ko"
+    assert client.get("/en/echo?lang=fr").json()["lang"] == "fr"
@@ -0,0 +1,41 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image  # noqa: E402
+
+import utils.file_upload as file_upload  # noqa: E402
+import utils.image_processing as image_processing  # noqa: E402
+
+
+def test_process_image_downscales_strips_exif_and_thumbnails(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(file_upload, "BLOBS_DIR", tmp_path / "blobs")
+    source = tmp_path / "photo.jpg"
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    Image.new("RGB", (4000, 3000), "red").save(source, "JPEG", exif=exif)
+
+    result = image_processing.process_image(str(source))
+    assert result is not None
+    display_path, thumb_path = result
+
+    # Foto asli tetap ada (bisa dipakai row lain), hasil masuk blob store
+    assert source.exists()
+    assert Path(display_path).is_relative_to(tmp_path / "blobs")
+    max_dim = image_processing.settings.image_max_dimension
+    thumb_dim = image_processing.settings.image_thumb_dimension
+    with Image.open(display_path) as img:
+        assert max(img.size) == max_dim
+        assert not img.getexif()
+    with Image.open(thumb_path) as thumb:
+        assert max(thumb.size) == thumb_dim
+
+
+def test_process_image_missing_or_invalid_file(tmp_path: Path):
+    assert image_processing.process_image(str(tmp_path / "missing.jpg")) is None
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    assert image_processing.process_image(str(broken)) is None
+    assert broken.exists()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import middleware
+from benchmarks import load
+from benchmarks.dataset import Scale, build
+from database.database import get_db
+from main import app
+from utils import file_upload
+from utils.synthetic_data import DEFAULT_PASSWORD
+
+
+@pytest.fixture
+def loaded_app(tmp_path, monkeypatch):
+    # File, bukan StaticPool: request konkuren butuh koneksi (dan transaksi) sendiri-sendiri
+    engine = create_engine(f"sqlite:///{tmp_path / 'load.db'}", connect_args={"check_same_thread": False})
+    build(engine, Scale(dinas=2, users=12, vehicles=10, reports=80, submissions=30), seed=3)
+    SessionLoad = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        db = SessionLoad()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(file_upload, "BLOBS_DIR", tmp_path / "blobs")
+    previous_override = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    middleware.console.quiet = True
+    try:
+        yield engine
+    finally:
+        if previous_override is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous_override
+        middleware.console.quiet = False
+        engine.dispose()
+
+
+def test_run_level_covers_all_roles(loaded_app):
+    accounts, dinas_ids = load.load_accounts(loaded_app, per_role=3)
+    assert all(accounts[role] for role in load.USER_CLASSES)
+    ctx = load.LoadContext(
+        accounts=accounts, dinas_ids=dinas_ids, password=DEFAULT_PASSWORD, think_ms=0,
+        photos=load.make_photos(size=(64, 48)),
+    )
+    transport = httpx.ASGITransport(app=app)
+    report = load.run(
+        "http://load.test", ctx, levels=[3], duration=1.5,
+        mix={"pic": 1, "kadis": 1, "admin": 1}, transport=transport,
+    )
+
+    level = report["levels"][0]
+    assert level["requests"] > 0 and level["errors"] == 0, level["endpoints"]
+    assert set(level["roles"]) == {"pic", "kadis", "admin"}
+    endpoints = set(level["endpoints"])
+    assert {"POST /login", "GET /stat/pic", "GET /stat/kadis", "GET /users/detailed/search"} <= endpoints
+    assert "svg" in load.render_svg(report)
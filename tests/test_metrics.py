@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from config import get_settings
+from routers import system as system_router
+from utils import metrics
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_http_metrics_use_route_template():
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id}
+
+    before = _sample("sibeda_http_requests_total", method="GET", route="/items/{item_id}", status="200")
+    before_404 = _sample("sibeda_http_requests_total", method="GET", route=metrics.UNMATCHED_ROUTE, status="404")
+    client = TestClient(app)
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+    assert client.get("/nope/3").status_code == 404
+
+    assert _sample("sibeda_http_requests_total", method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert _sample("sibeda_http_requests_total", method="GET", route=metrics.UNMATCHED_ROUTE, status="404") == before_404 + 1
+    assert _sample("sibeda_http_request_duration_seconds_count", method="GET", route="/items/{item_id}") >= 2
+    assert _sample("sibeda_http_requests_in_progress", method="GET") == 0
+
+
+def test_pool_metrics_track_checkouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    metrics.install_pool_metrics(engine)
+    metrics.install_pool_metrics(engine)  # idempotent
+
+    checkouts = _sample("sibeda_db_pool_checkouts_total")
+    checked_out = _sample("sibeda_db_pool_checked_out")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert _sample("sibeda_db_pool_checked_out") == checked_out + 1
+    assert _sample("sibeda_db_pool_checkouts_total") == checkouts + 1
+    assert _sample("sibeda_db_pool_checked_out") == checked_out
+
+
+def test_service_label_and_db_observation():
+    assert metrics.service_label("/report/{id}") == "report"
+    assert metrics.service_label("/") == "root"
+    metrics.observe_db("/report/{id}", 3, 12.5)
+    assert _sample("sibeda_db_request_queries_count", service="report") >= 1
+
+
+def test_metrics_endpoint_requires_token_when_configured(monkeypatch: pytest.MonkeyPatch):
+    app = FastAPI()
+    app.include_router(system_router.metrics_router)
+    client = TestClient(app)
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert "sibeda_http_requests_total" in resp.text
+
+    monkeypatch.setattr(get_settings(), "metrics_token", "rahasia")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer rahasia"}).status_code == 200
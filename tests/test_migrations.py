@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, inspect
+
+import main
+import model.models as models
+from database import migrations
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _add_audit_table(conn):
+    Table("audit_entries", MetaData(), Column("id", Integer, primary_key=True)).create(conn)
+
+
+def test_fresh_database_is_created_and_stamped_at_head(engine):
+    with pytest.raises(migrations.SchemaVersionError, match="belum ada versi"):
+        migrations.check(engine)
+
+    applied = migrations.upgrade(engine)
+
+    assert [m.version for m in applied] == [m.version for m in migrations.MIGRATIONS]
+    assert set(models.Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    assert migrations.check(engine) == migrations.head()
+    assert migrations.upgrade(engine) == []
+
+
+def test_pending_migration_blocks_check_until_upgrade(engine, monkeypatch):
+    migrations.upgrade(engine)
+    extra = migrations.Migration(migrations.head() + 1, "audit entries", _add_audit_table)
+    monkeypatch.setattr(migrations, "MIGRATIONS", [*migrations.MIGRATIONS, extra])
+
+    with pytest.raises(migrations.SchemaVersionError, match="aplikasi butuh"):
+        migrations.check(engine)
+    assert migrations.upgrade(engine) == [extra]
+    assert "audit_entries" in inspect(engine).get_table_names()
+    assert migrations.check(engine) == extra.version
+    assert all(m["applied_at"] for m in migrations.history(engine))
+
+
+def test_database_ahead_of_code_is_rejected(engine, monkeypatch):
+    extra = migrations.Migration(migrations.head() + 1, "audit entries", _add_audit_table)
+    monkeypatch.setattr(migrations, "MIGRATIONS", [*migrations.MIGRATIONS, extra])
+    migrations.upgrade(engine)
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:-1])
+
+    with pytest.raises(migrations.SchemaVersionError, match="lebih baru"):
+        migrations.check(engine)
+
+
+def test_unversioned_existing_schema_requires_stamp(engine):
+    models.Base.metadata.create_all(bind=engine)
+
+    with pytest.raises(migrations.SchemaVersionError, match="stamp"):
+        migrations.upgrade(engine)
+    migrations.stamp(engine, migrations.head())
+    assert migrations.check(engine) == migrations.head()
+
+
+def test_startup_refuses_to_serve_on_mismatch(engine, monkeypatch):
+    monkeypatch.setattr(main, "engine", engine)
+
+    with pytest.raises(migrations.SchemaVersionError):
+        with TestClient(main.app):
+            pass
+
+
+def test_tombstone_scope_migration_upgrades_version_1_schema(engine):
+    tables = [t for name, t in models.Base.metadata.tables.items() if name != "tombstones"]
+    models.Base.metadata.create_all(bind=engine, tables=tables)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE tombstones (id INTEGER PRIMARY KEY, entity VARCHAR(32) NOT NULL, "
+            "entity_id INTEGER NOT NULL, deleted_at DATETIME NOT NULL)"
+        )
+    migrations.stamp(engine, 1)
+
+    assert [m.version for m in migrations.upgrade(engine)] == [2]
+    assert {"dinas_id", "user_id"} <= {c["name"] for c in inspect(engine).get_columns("tombstones")}
+    assert "ix_tombstones_entity_user" in {i["name"] for i in inspect(engine).get_indexes("tombstones")}
+    assert migrations.check(engine) == migrations.head()
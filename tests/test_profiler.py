@@ -0,0 +1,81 @@
+from __future__ import annotations
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import controller.auth as auth
+import model.models as models
+from config import get_settings
+from routers import system as system_router
+from utils import profiler
+from utils.profiler import ProfilingMiddleware
+
+
+def hot_loop(seconds: float) -> int:
+    n = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+def _token(role: str) -> str:
+    return auth.create_access_token({"sub": "100000000000000001", "role": role})
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, artifact_dir=str(tmp_path), interval_ms=1)
+
+    @app.get("/slow")
+    def slow():
+        return {"n": hot_loop(0.1)}
+
+    return TestClient(app), tmp_path
+
+
+def test_admin_request_is_profiled_including_threadpool_frames(client):
+    c, artifact_dir = client
+    resp = c.get("/slow", headers={"X-Profile": "1", "Authorization": f"Bearer {_token('admin')}"})
+    assert resp.status_code == 200
+    request_id = resp.headers["X-Profile-Id"]
+
+    collapsed = profiler.load_artifact(str(artifact_dir), request_id)
+    assert collapsed and "test_profiler:hot_loop" in collapsed
+    summary = profiler.summarize(collapsed)
+    assert summary["samples"] > 10
+
+
+def test_header_is_ignored_without_admin_token(client):
+    c, artifact_dir = client
+    for headers in (
+        {"X-Profile": "1"},
+        {"X-Profile": "1", "Authorization": f"Bearer {_token('pic')}"},
+        {"X-Profile": "1", "Authorization": "Bearer not-a-jwt"},
+    ):
+        resp = c.get("/slow", headers=headers)
+        assert resp.status_code == 200
+        assert "X-Profile-Id" not in resp.headers
+    assert not list(artifact_dir.iterdir())
+
+
+def test_profile_endpoint_is_admin_only(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(get_settings(), "profiling_artifact_dir", str(tmp_path))
+    profiler.artifact_path(str(tmp_path), "req-1").write_text("main:a;main:b 3\nmain:a 1\n")
+
+    app = FastAPI()
+    app.include_router(system_router.router)
+    user = models.User(id=1, role=models.RoleEnum.pic)
+    app.dependency_overrides[auth.get_current_user] = lambda: user
+    c = TestClient(app)
+
+    assert c.get("/system/profiles/req-1").status_code == 403
+    user.role = models.RoleEnum.admin
+    body = c.get("/system/profiles/req-1").json()
+    assert body["data"]["samples"] == 4
+    assert body["data"]["top_self"][0] == {"frame": "main:b", "samples": 3}
+    assert c.get("/system/profiles/req-1?format=collapsed").text.startswith("main:a;main:b 3")
+    assert c.get("/system/profiles/missing").status_code == 404
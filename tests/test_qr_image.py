@@ -0,0 +1,66 @@
+from __future__ import annotations
+import struct
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import controller.auth as auth
+import model.models as models
+from database.database import get_db
+from routers import qr as qr_router
+from utils import qr_image
+from utils.qr_image import QRImageCache
+
+
+def test_encode_picks_smallest_version():
+    assert len(qr_image.encode("hello")) == 21
+    # Token QR stateless (39 karakter) muat di versi 3 dengan level M
+    assert len(qr_image.encode("x" * 39)) == 29
+
+
+def test_render_png_header_and_size():
+    png = qr_image.render("hello", "png", scale=4)
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    width, height = struct.unpack(">II", png[16:24])
+    # 21 modul + 2 * 4 border, dikali scale
+    assert width == height == (21 + 8) * 4
+
+
+def test_render_svg_contains_modules():
+    svg = qr_image.render("hello", "svg")
+    assert svg.startswith(b"<svg")
+    assert b'viewBox="0 0 29 29"' in svg
+    assert b"<path" in svg
+
+
+def test_cache_evicts_lru_and_expired_entries():
+    cache = QRImageCache(max_entries=2)
+    future = time.time() + 60
+    first = cache.put("a", b"A", future)
+    cache.put("b", b"B", future)
+    assert cache.get("a") == first
+    cache.put("c", b"C", future)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    assert first[1].startswith('"') and first[1] != cache.get("c")[1]
+
+    cache.put("old", b"X", time.time() - 1)
+    assert cache.get("old") is None
+
+
+def test_my_image_revalidates_with_weak_and_wildcard_etags():
+    app = FastAPI()
+    app.include_router(qr_router.router)
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[auth.get_current_user] = lambda: models.User(id=1, dinas_id=None)
+    client = TestClient(app)
+
+    res = client.get("/qr/my/image", params={"format": "svg"})
+    assert res.status_code == 200
+    etag = res.headers["etag"]
+    for header in (etag, f"W/{etag}", f'"other", W/{etag}', "*"):
+        res = client.get("/qr/my/image", params={"format": "svg"}, headers={"If-None-Match": header})
+        assert res.status_code == 304, header
+    assert client.get("/qr/my/image", headers={"If-None-Match": '"other"'}).status_code == 200
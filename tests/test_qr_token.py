@@ -0,0 +1,35 @@
+from __future__ import annotations
+import time
+
+import utils.otp as otp
+
+
+def test_stateless_token_roundtrip_and_replay():
+    token, exp = otp.encode_stateless_qr_token(42)
+    assert otp.is_stateless_qr_token(token)
+    assert exp.timestamp() > time.time()
+    assert otp.decode_stateless_qr_token(token) == (True, None, 42)
+
+    assert otp.consume_stateless_qr_token(token, 7) == (False, "invalid")
+    assert otp.consume_stateless_qr_token(token, 42) == (True, None)
+    assert otp.consume_stateless_qr_token(token, 42) == (False, "invalid")
+
+
+def test_stateless_token_is_stable_within_window():
+    now = int(time.time())
+    window_start = now - now % otp._store_ttl()
+    first, _ = otp.encode_stateless_qr_token(5, now=window_start)
+    second, _ = otp.encode_stateless_qr_token(5, now=window_start + 1)
+    assert first == second
+
+
+def test_stateless_token_rejects_tampering_and_expiry():
+    token, _ = otp.encode_stateless_qr_token(1)
+    # Ubah uid (karakter awal payload), signature tidak lagi cocok
+    tampered = token[:4] + ("A" if token[4] != "A" else "B") + token[5:]
+    assert otp.decode_stateless_qr_token(tampered)[:2] == (False, "invalid")
+
+    old, _ = otp.encode_stateless_qr_token(1, now=int(time.time()) - 3 * otp._store_ttl())
+    assert otp.decode_stateless_qr_token(old) == (False, "expired", 1)
+    # Token lama (format JSON.signature) tidak dianggap token stateless
+    assert not otp.is_stateless_qr_token("abc.def")
@@ -0,0 +1,311 @@
+"""
+Budget jumlah query SQL per endpoint.
+
+Setiap route di `routers/` wajib terdaftar di BUDGETS (atau EXEMPT dengan alasan),
+jadi endpoint baru tanpa budget langsung gagal. Semua statement yang dieksekusi
+selama satu request (termasuk dependency auth) dihitung lewat event engine.
+Endpoint berhalaman dijalankan dengan dua ukuran halaman dan jumlah query-nya
+harus sama: query per row (N+1) akan muncul sebagai selisih bentuk statement.
+
+Bentuk statement per endpoint disimpan di query_budgets.snapshot.json; saat budget
+terlampaui, pesan gagal berisi diff terhadap snapshot itu. Perbarui snapshot setelah
+perubahan yang disengaja dengan QUERY_BUDGET_UPDATE=1.
+
+Default memakai SQLite in-memory; set QUERY_BUDGET_DATABASE_URL untuk menjalankan
+di MySQL (database kosong khusus test; diff snapshot hanya bermakna di SQLite).
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import controller.auth as auth
+import middleware
+import model.models as models
+from benchmarks.dataset import DatasetInfo, Scale, build
+from database.database import get_db
+from main import app
+from utils import reference_cache
+from utils.slow_query import fingerprint
+from utils.sql_stats import statement_shape
+from utils.synthetic_data import DEFAULT_PASSWORD
+
+SCALE = Scale(dinas=3, users=30, vehicles=40, reports=400, submissions=120)
+SMALL_PAGE, LARGE_PAGE = 1, 50
+SNAPSHOT_PATH = Path(__file__).with_name("query_budgets.snapshot.json")
+_observed: Dict[str, Counter] = {}
+
+
+@dataclass(frozen=True)
+class Budget:
+    max_queries: int
+    path: str  # boleh memakai field DatasetInfo, misal {report_id}
+    role: Optional[str] = "admin"  # None = tanpa token
+    paged: bool = False  # bandingkan limit kecil vs besar
+    json: Optional[Dict[str, Any]] = None
+    data: Optional[Dict[str, Any]] = None
+    status: int = 200
+
+
+# Key = "<METHOD> <template route>". Angka di sini adalah batas atas yang disepakati;
+# menaikkannya harus disengaja dan terlihat di review.
+BUDGETS: Dict[str, Budget] = {
+    # auth
+    "POST /login": Budget(2, "/login", role=None, data={"username": "{pic_nip}", "password": DEFAULT_PASSWORD}),
+    "POST /token": Budget(2, "/token", role=None, data={"username": "{pic_nip}", "password": DEFAULT_PASSWORD}),
+    "GET /auth/verify": Budget(0, "/auth/verify", role="pic"),
+    # users
+    "GET /users": Budget(4, "/users", paged=True),
+    "GET /users/{user_id}": Budget(2, "/users/{pic_id}"),
+    "GET /users/stats/count-by-dinas": Budget(2, "/users/stats/count-by-dinas"),
+    "GET /users/balance/{user_id}": Budget(5, "/users/balance/{pic_id}"),
+    "GET /users/detailed/search": Budget(3, "/users/detailed/search", paged=True),
+    "GET /users/vehicle/{vehicle_id}": Budget(3, "/users/vehicle/{vehicle_id}"),
+    "POST /users/{user_id}/assign-vehicle": Budget(7, "/users/{kadis_id}/assign-vehicle", json={"vehicle_id": "{vehicle_id}"}),
+    # dinas & referensi
+    "GET /dinas": Budget(1, "/dinas"),
+    "POST /dinas": Budget(3, "/dinas", json={"nama": "Dinas Budget"}),
+    "GET /vehicle-type": Budget(2, "/vehicle-type"),
+    "GET /vehicle-type/{vt_id}": Budget(2, "/vehicle-type/1"),
+    "POST /vehicle-type": Budget(4, "/vehicle-type", json={"nama": "Tipe Budget", "plat": "-", "vehicle_type_id": 1}),
+    "GET /wallet/type": Budget(2, "/wallet/type"),
+    "POST /wallet/types": Budget(3, "/wallet/types", json={"nama": "Wallet Budget"}),
+    # vehicle
+    "GET /vehicle": Budget(7, "/vehicle", paged=True),
+    "GET /vehicle/my/vehicles": Budget(8, "/vehicle/my/vehicles", role="pic", paged=True),
+    "GET /vehicle/user/{user_id}": Budget(3, "/vehicle/user/{pic_id}", paged=True),
+    "GET /vehicle/my/vehicles/{vehicle_id}": Budget(7, "/vehicle/my/vehicles/{vehicle_id}", role="pic"),
+    "GET /vehicle/dinas/{dinas_id}": Budget(3, "/vehicle/dinas/{dinas_id}", paged=True),
+    # wallet
+    "GET /wallet": Budget(2, "/wallet"),
+    "GET /wallet/my": Budget(3, "/wallet/my", role="pic"),
+    "GET /wallet/{wallet_id}": Budget(3, "/wallet/{pic_id}"),
+    "GET /wallet/user/{user_id}": Budget(4, "/wallet/user/{pic_id}"),
+    # report
+    "GET /report": Budget(6, "/report", role="kadis", paged=True),
+    "GET /report/my/reports": Budget(9, "/report/my/reports", role="pic", paged=True),
+    "GET /report/{report_id}": Budget(3, "/report/{report_id}"),
+    "GET /report/my/reports/{report_id}": Budget(2, "/report/my/reports/{report_id}", role="pic"),
+    "GET /report/{report_id}/logs": Budget(2, "/report/{report_id}/logs"),
+    "PATCH /report/{report_id}/status": Budget(6, "/report/{report_id}/status", role="kadis",
+                                               json={"status": "Reviewed", "notes": "cek"}),
+    # submission
+    "GET /submission": Budget(5, "/submission", role="kadis", paged=True),
+    "GET /submission/my/submissions": Budget(8, "/submission/my/submissions", role="pic", paged=True),
+    "GET /submission/{submission_id}": Budget(3, "/submission/{submission_id}"),
+    "GET /submission/monthly/summary": Budget(2, "/submission/monthly/summary?month={month}&year={year}"),
+    "GET /submission/monthly/details": Budget(2, "/submission/monthly/details?month={month}&year={year}"),
+    # stat, qr, sync, system
+    "GET /stat/pic": Budget(5, "/stat/pic", role="pic"),
+    "GET /stat/kadis": Budget(6, "/stat/kadis", role="kadis"),
+    "GET /stat/admin": Budget(7, "/stat/admin?dinas_id={dinas_id}"),
+    "GET /qr/my": Budget(1, "/qr/my"),
+    "GET /qr/my/image": Budget(1, "/qr/my/image"),
+    "GET /sync/{entity}": Budget(3, "/sync/reports", role="pic", paged=True),
+    "GET /system/jobs": Budget(1, "/system/jobs"),
+    "GET /metrics": Budget(0, "/metrics", role=None),
+}
+
+# Route yang sengaja tidak diukur di sini beserta alasannya
+EXEMPT: Dict[str, str] = {
+    "POST /auth/forgot-password": "alur OTP + email",
+    "POST /auth/verify-otp": "alur OTP",
+    "POST /auth/reset-password": "alur OTP",
+    "POST /auth/verify-register": "alur OTP",
+    "POST /auth/resend-register-otp": "alur OTP + email",
+    "POST /auth/refresh-token": "butuh refresh token dari login",
+    "POST /auth/change-password": "mengubah password user dataset",
+    "POST /users": "registrasi + email OTP",
+    "POST /users/register": "registrasi + email OTP",
+    "PUT /users/{user_id}": "write per entitas, dicakup PATCH sejenis",
+    "PATCH /users": "write per entitas",
+    "PATCH /users/{user_id}": "write per entitas",
+    "POST /users/{user_id}/unassign-vehicle": "pasangan assign-vehicle",
+    "DELETE /dinas/{dinas_id}": "destruktif untuk dataset",
+    "POST /vehicle": "upload multipart",
+    "PUT /vehicle/{vehicle_id}": "upload multipart",
+    "PATCH /vehicle/{vehicle_id}": "upload multipart",
+    "DELETE /vehicle/{vehicle_id}": "destruktif untuk dataset",
+    "POST /vehicle/{vehicle_id}/assign": "pasangan /users/{user_id}/assign-vehicle",
+    "POST /vehicle/{vehicle_id}/unassign": "pasangan assign-vehicle",
+    "POST /wallet": "satu wallet per user, sudah ada di dataset",
+    "PUT /wallet/{wallet_id}": "write per entitas",
+    "PATCH /wallet/{wallet_id}": "write per entitas",
+    "DELETE /wallet/{wallet_id}": "destruktif untuk dataset",
+    "POST /report": "upload multipart",
+    "PATCH /report/{report_id}": "upload multipart",
+    "DELETE /report/{report_id}": "destruktif untuk dataset",
+    "PUT /report/{report_id}/status": "handler sama dengan PATCH",
+    "PUT /vehicle-type/{vt_id}": "write per entitas",
+    "PATCH /vehicle-type/{vt_id}": "write per entitas",
+    "DELETE /vehicle-type/{vt_id}": "destruktif untuk dataset",
+    "POST /qr/assign": "butuh token QR dari /qr/my",
+    "POST /qr/scan": "butuh token QR dari /qr/my",
+    "POST /submission": "write per entitas",
+    "PUT /submission/{submission_id}": "write per entitas",
+    "PATCH /submission/{submission_id}": "write per entitas",
+    "DELETE /submission/{submission_id}": "destruktif untuk dataset",
+    "POST /seeder/run": "utility development",
+    "GET /report/export": "stream memakai SessionLocal sendiri di luar get_db; lihat test_export.py",
+    "GET /submission/export": "stream memakai SessionLocal sendiri di luar get_db; lihat test_export.py",
+    "GET /system/profiles/{request_id}": "baca file artefak, tanpa database",
+}
+
+
+class StatementRecorder:
+    """Catat statement per request; request dari TestClient berjalan berurutan."""
+
+    def __init__(self, engine):
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        with self._lock:
+            self.statements.append(statement)
+
+    def take(self) -> List[str]:
+        with self._lock:
+            taken, self.statements = self.statements, []
+        return taken
+
+
+@pytest.fixture(scope="module")
+def harness():
+    url = os.getenv("QUERY_BUDGET_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+        models.Base.metadata.drop_all(bind=engine)
+    else:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    info = build(engine, SCALE, seed=11)
+    SessionBudget = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        db = SessionBudget()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous_override = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    middleware.console.quiet = True
+    tokens = {
+        role: auth.create_access_token({"sub": nip, "role": role})
+        for role, nip in (("admin", info.admin_nip), ("kadis", info.kadis_nip), ("pic", info.pic_nip))
+    }
+    try:
+        yield TestClient(app), StatementRecorder(engine), info, tokens
+    finally:
+        if previous_override is None:
+            app.dependency_overrides.pop(get_db, None)
+        else:
+            app.dependency_overrides[get_db] = previous_override
+        middleware.console.quiet = False
+        engine.dispose()
+        if os.getenv("QUERY_BUDGET_UPDATE") and _observed:
+            _write_snapshot()
+
+
+def _fill(value: Any, info: DatasetInfo) -> Any:
+    if isinstance(value, str):
+        filled = value.format(**info.to_dict())
+        return int(filled) if value.startswith("{") and filled.isdigit() else filled
+    if isinstance(value, dict):
+        return {k: _fill(v, info) for k, v in value.items()}
+    return value
+
+
+def _call(harness, name: str, limit: Optional[int] = None) -> Counter:
+    client, recorder, info, tokens = harness
+    budget = BUDGETS[name]
+    method = name.split()[0]
+    path = _fill(budget.path, info)
+    if limit is not None:
+        path += f"{'&' if '?' in path else '?'}limit={limit}"
+    headers = {"Authorization": f"Bearer {tokens[budget.role]}"} if budget.role else {}
+
+    # Cache referensi dikosongkan supaya hitungan tidak tergantung urutan test
+    for cache in (reference_cache.dinas_cache, reference_cache.vehicle_type_cache, reference_cache.wallet_type_cache):
+        cache.invalidate()
+    recorder.take()
+    resp = client.request(method, path, headers=headers, json=_fill(budget.json, info), data=_fill(budget.data, info))
+    statements = recorder.take()
+    assert resp.status_code == budget.status, f"{method} {path}: {resp.status_code} {resp.text[:300]}"
+    return Counter(statement_shape(s) for s in statements)
+
+
+def _format(shapes: Counter, sign: str = "") -> str:
+    return "\n".join(f"  {sign}{n}x {shape[:200]}" for shape, n in shapes.most_common())
+
+
+def _load_snapshot() -> Dict[str, Dict[str, list]]:
+    if not SNAPSHOT_PATH.exists():
+        return {}
+    return json.loads(SNAPSHOT_PATH.read_text())
+
+
+def _write_snapshot() -> None:
+    snapshot = _load_snapshot()
+    for name, shapes in _observed.items():
+        snapshot[name] = {fingerprint(shape): [n, shape[:200]] for shape, n in sorted(shapes.items())}
+    SNAPSHOT_PATH.write_text(json.dumps(dict(sorted(snapshot.items())), indent=1) + "\n")
+
+
+def _snapshot_diff(name: str, shapes: Counter) -> str:
+    baseline = _load_snapshot().get(name)
+    if baseline is None:
+        return "  (belum ada snapshot; jalankan dengan QUERY_BUDGET_UPDATE=1)"
+    current = {fingerprint(shape): (n, shape) for shape, n in shapes.items()}
+    added = Counter({shape: n - baseline.get(fp, [0])[0] for fp, (n, shape) in current.items()})
+    removed = Counter({prefix: n - current.get(fp, (0,))[0] for fp, (n, prefix) in baseline.items()})
+    added, removed = +added, +removed  # buang hitungan <= 0
+    return "\n".join(filter(None, [_format(added, "+"), _format(removed, "-")])) or "  (sama dengan snapshot)"
+
+
+def test_every_route_has_a_budget():
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.endpoint.__module__.startswith("routers.")
+        for method in route.methods
+    }
+    missing = sorted(routes - BUDGETS.keys() - EXEMPT.keys())
+    stale = sorted((BUDGETS.keys() | EXEMPT.keys()) - routes)
+    assert not missing, f"Route tanpa query budget (tambahkan ke BUDGETS atau EXEMPT): {missing}"
+    assert not stale, f"Budget untuk route yang sudah tidak ada: {stale}"
+
+
+@pytest.mark.parametrize("name", sorted(BUDGETS))
+def test_query_budget(harness, name):
+    budget = BUDGETS[name]
+    if budget.paged:
+        small = _call(harness, name, SMALL_PAGE)
+        shapes = _call(harness, name, LARGE_PAGE)
+        per_row = shapes - small
+        assert not per_row and sum(shapes.values()) == sum(small.values()), (
+            f"{name}: query bertambah mengikuti ukuran halaman "
+            f"(limit={SMALL_PAGE}: {sum(small.values())}, limit={LARGE_PAGE}: {sum(shapes.values())})\n"
+            f"Statement tambahan:\n{_format(per_row, '+')}"
+        )
+    else:
+        shapes = _call(harness, name)
+    _observed[name] = shapes
+
+    count = sum(shapes.values())
+    assert count <= budget.max_queries, (
+        f"{name}: {count} query > budget {budget.max_queries}\n"
+        f"Diff terhadap snapshot:\n{_snapshot_diff(name, shapes)}"
+    )
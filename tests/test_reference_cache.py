@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import model.models as models
+from database.database import get_db
+from routers import dinas as dinas_router
+from utils.reference_cache import REFERENCE_CACHES, dinas_cache
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    models.Base.metadata.create_all(bind=engine)
+    for cache in REFERENCE_CACHES.values():
+        cache.invalidate()
+    yield engine, sessionmaker(bind=engine)
+    for cache in REFERENCE_CACHES.values():
+        cache.invalidate()
+
+
+def test_cached_reads_skip_db_until_write(session_factory):
+    engine, factory = session_factory
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    with factory() as db:
+        db.add(models.Dinas(nama="Dinas A"))
+        db.commit()
+        first = dinas_cache.get(db)
+        statements.clear()
+        assert dinas_cache.get(db) is first
+        assert statements == []
+
+        db.add(models.Dinas(nama="Dinas B"))
+        db.commit()
+        second = dinas_cache.get(db)
+        assert [d.nama for d in second.items] == ["Dinas A", "Dinas B"]
+        assert second.etag != first.etag
+
+
+def test_dinas_list_returns_304_for_matching_etag(session_factory):
+    _, factory = session_factory
+    with factory() as db:
+        db.add(models.Dinas(nama="Dinas A"))
+        db.commit()
+
+    def override_db():
+        db: Session = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(dinas_router.router)
+    app.dependency_overrides[get_db] = override_db
+    client = TestClient(app)
+
+    res = client.get("/dinas")
+    assert res.status_code == 200
+    etag = res.headers["etag"]
+    assert res.json()["data"][0]["nama"] == "Dinas A"
+
+    res = client.get("/dinas", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
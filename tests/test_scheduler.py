@@ -0,0 +1,32 @@
+from __future__ import annotations
+import asyncio
+
+from utils.scheduler import PeriodicJob, Scheduler
+
+
+def test_run_once_records_processed_rows_and_failures():
+    sched = Scheduler()
+    ok = sched.register(PeriodicJob("purge", lambda: 3, interval_seconds=60))
+
+    def broken() -> int:
+        raise RuntimeError("db down")
+
+    bad = sched.register(PeriodicJob("broken", broken, interval_seconds=60))
+
+    async def run() -> None:
+        await sched.run_once(ok)
+        await sched.run_once(ok)
+        await sched.run_once(bad)
+
+    asyncio.run(run())
+    metrics = sched.metrics()
+    assert metrics["purge"]["runs"] == 2
+    assert metrics["purge"]["total_processed"] == 6
+    assert metrics["broken"]["failures"] == 1
+    assert metrics["broken"]["last_error"] == "db down"
+
+
+def test_next_delay_stays_within_jitter():
+    job = PeriodicJob("j", lambda: None, interval_seconds=100, jitter=0.2)
+    delays = [job.next_delay() for _ in range(200)]
+    assert all(80 <= d <= 120 for d in delays)
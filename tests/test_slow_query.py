@@ -0,0 +1,69 @@
+from __future__ import annotations
+import json
+
+from sqlalchemy import create_engine, text
+
+from utils import slow_query
+from utils.slow_query import SlowQueryRecorder
+
+
+def test_redact_parameters_hides_values():
+    assert slow_query.redact_parameters(("198001012000", 5, None)) == ["<str:12>", "<int>", None]
+    assert slow_query.redact_parameters({"email": "a@b.c"}) == {"email": "<str:5>"}
+    assert slow_query.redact_parameters([(1,), (2,)]) == {"first": ["<int>"], "rows": 2}
+
+
+def test_slow_select_is_logged_with_explain_and_caller(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE reports (id INTEGER PRIMARY KEY, dinas_id INTEGER)"))
+
+    log_path = tmp_path / "slow.jsonl"
+    recorder = SlowQueryRecorder(str(log_path), threshold_ms=0)
+    recorder.install(engine)
+
+    # Simulasikan pemanggilan dari modul service
+    scope = {"__name__": "services.fake_service", "text": text, "engine": engine}
+    exec(
+        "class FakeService:\n"
+        "    @staticmethod\n"
+        "    def list(dinas_id):\n"
+        "        with engine.connect() as conn:\n"
+        "            return conn.execute(text('SELECT * FROM reports WHERE dinas_id = :d'), {'d': dinas_id}).all()\n",
+        scope,
+    )
+    for dinas_id in (1, 2):
+        scope["FakeService"].list(dinas_id)
+    recorder.close()
+
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    selects = [r for r in records if r["statement"].startswith("SELECT")]
+    assert len(selects) == 2
+    assert selects[0]["caller"] == "services.fake_service:FakeService.list"
+    assert selects[0]["parameters"] == ["<int>"]
+    assert selects[0]["fingerprint"] == selects[1]["fingerprint"]
+    # EXPLAIN dibatasi sekali per fingerprint per interval
+    assert isinstance(selects[0]["explain"], list) and selects[0]["explain"]
+    assert "explain" not in selects[1]
+    assert not any("explain" in r for r in records if not r["statement"].startswith("SELECT"))
+
+
+def test_rank_orders_fingerprints_by_total_time(tmp_path, capsys):
+    log_path = tmp_path / "slow.jsonl"
+    rows = [
+        {"ts": "2026-10-01T00:00:00", "fingerprint": "a", "duration_ms": 300, "statement": "SELECT a"},
+        {"ts": "2026-10-02T00:00:00", "fingerprint": "b", "duration_ms": 250, "statement": "SELECT b"},
+        {"ts": "2026-10-03T00:00:00", "fingerprint": "b", "duration_ms": 250, "statement": "SELECT b",
+         "caller": "services.x:X.y"},
+    ]
+    log_path.write_text("\n".join(json.dumps(r) for r in rows[:2]) + "\n")
+    (tmp_path / "slow.jsonl.1").write_text(json.dumps(rows[2]) + "\n")
+
+    ranked = slow_query.rank(slow_query.iter_records(slow_query.log_files(str(log_path))))
+    assert [g["fingerprint"] for g in ranked] == ["b", "a"]
+    assert ranked[0]["count"] == 2 and ranked[0]["callers"] == ["services.x:X.y"]
+    assert [g["fingerprint"] for g in slow_query.rank(slow_query.iter_records([str(log_path)]), since="2026-10-02")] == ["b"]
+
+    slow_query.main(["--file", str(log_path), "--top", "1"])
+    out = capsys.readouterr().out
+    assert "SELECT b" in out and "SELECT a" not in out
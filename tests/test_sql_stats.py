@@ -0,0 +1,34 @@
+from __future__ import annotations
+import contextvars
+
+from sqlalchemy import create_engine, text
+
+from utils import sql_stats
+
+
+def test_statement_shape_collapses_parameters():
+    a = sql_stats.statement_shape("SELECT * FROM reports WHERE id IN (?, ?, ?)  AND x = 5")
+    b = sql_stats.statement_shape("SELECT * FROM reports\n WHERE id IN (?) AND x = 7")
+    assert a == b == "SELECT * FROM reports WHERE id IN (?) AND x = ?"
+
+
+def test_queries_are_counted_per_request_context():
+    engine = create_engine("sqlite://")
+    sql_stats.install(engine)
+
+    def handle_request():
+        stats = sql_stats.begin_request("req-1")
+        with engine.connect() as conn:
+            for i in range(12):
+                conn.execute(text("SELECT :x"), {"x": i})
+        return stats
+
+    stats = contextvars.copy_context().run(handle_request)
+    assert stats.count == 12
+    assert stats.repeated(10) == [("SELECT ?", 12)]
+    assert stats.server_timing().startswith("db;dur=")
+
+    # Di luar request tidak ada yang dicatat
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert sql_stats.current_stats() is None
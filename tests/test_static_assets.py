@@ -0,0 +1,50 @@
+from __future__ import annotations
+import hashlib
+from pathlib import Path
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+import utils.static_assets as static_assets
+from utils.storage import IMMUTABLE_CACHE_CONTROL
+
+
+@pytest.fixture
+def assets(tmp_path: Path) -> tuple[TestClient, str, bytes]:
+    data = b"0123456789" * 100
+    digest = hashlib.sha256(data).hexdigest()
+    blob = tmp_path / "blobs" / digest[:2] / digest[2:4] / f"{digest}.jpg"
+    blob.parent.mkdir(parents=True)
+    blob.write_bytes(data)
+    app = Starlette(routes=[Mount("/assets", static_assets.AssetStaticFiles(directory=tmp_path))])
+    return TestClient(app), f"/assets/blobs/{digest[:2]}/{digest[2:4]}/{digest}.jpg", data
+
+
+def test_blob_is_immutable_with_strong_etag(assets):
+    client, url, data = assets
+    res = client.get(url)
+    assert res.status_code == 200
+    assert res.content == data
+    assert res.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    etag = res.headers["etag"]
+    assert etag == f'"{hashlib.sha256(data).hexdigest()}"'
+
+    res = client.get(url, headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+
+    res = client.get(url, headers={"Range": "bytes=10-19"})
+    assert res.status_code == 206
+    assert res.content == data[10:20]
+
+
+def test_accel_redirect_mode(assets, monkeypatch: pytest.MonkeyPatch):
+    client, url, _data = assets
+    monkeypatch.setattr(static_assets.settings, "assets_accel_redirect_prefix", "/protected-assets/")
+    res = client.get(url)
+    assert res.status_code == 200
+    assert res.content == b""
+    assert res.headers["x-accel-redirect"] == "/protected-assets/" + url.removeprefix("/assets/")
+    assert res.headers["content-type"] == "image/jpeg"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+import io
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("botocore")
+from botocore.exceptions import ClientError  # noqa: E402
+
+from utils.storage import IMMUTABLE_CACHE_CONTROL, S3Storage  # noqa: E402
+
+
+class FakeS3Client:
+    """Stand-in object store in-memory (subset API S3 yang dipakai S3Storage)."""
+
+    def __init__(self):
+        self.objects: dict[str, dict] = {}
+
+    def head_object(self, Bucket, Key):  # type: ignore[no-untyped-def]
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {"LastModified": self.objects[Key]["LastModified"]}
+
+    def upload_fileobj(self, f, bucket, key, ExtraArgs=None, Config=None):  # type: ignore[no-untyped-def]
+        self.objects[key] = {"Body": f.read(), "LastModified": datetime.now(timezone.utc), **(ExtraArgs or {})}
+
+    def copy_object(self, Bucket, Key, CopySource, **kwargs):  # type: ignore[no-untyped-def]
+        self.objects[Key].update(kwargs, LastModified=datetime.now(timezone.utc))
+
+    def get_object(self, Bucket, Key):  # type: ignore[no-untyped-def]
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[Key]["Body"])}
+
+    def delete_object(self, Bucket, Key):  # type: ignore[no-untyped-def]
+        self.objects.pop(Key, None)
+
+    def get_paginator(self, name):  # type: ignore[no-untyped-def]
+        client = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):  # type: ignore[no-untyped-def]
+                yield {"Contents": [
+                    {"Key": k, "LastModified": v["LastModified"], "Size": len(v["Body"])}
+                    for k, v in client.objects.items() if k.startswith(Prefix)
+                ]}
+
+        return Paginator()
+
+
+def test_s3_storage_roundtrip(tmp_path: Path):
+    client = FakeS3Client()
+    storage = S3Storage(bucket="b", client=client, public_base_url="https://cdn.example.com/")
+    key = "assets/blobs/ab/cd/abcd.jpg"
+
+    local = tmp_path / "upload.part"
+    local.write_bytes(b"photo")
+    storage.put_file(local, key)
+
+    assert not local.exists()
+    assert storage.exists(key)
+    assert storage.mtime(key) is not None and storage.mtime("assets/blobs/missing.jpg") is None
+    assert client.objects[key]["ContentType"] == "image/jpeg"
+    assert client.objects[key]["CacheControl"] == IMMUTABLE_CACHE_CONTROL
+    with storage.open(key) as f:
+        assert f.read() == b"photo"
+    assert [k for k, _mtime, _size in storage.iter_files("assets/blobs")] == [key]
+    assert storage.url(key) == f"https://cdn.example.com/{key}"
+    assert storage.url_window() is None
+    assert S3Storage(bucket="b", client=client, presign_expires=3600).url_window() is not None
+
+    storage.delete(key)
+    assert not storage.exists(key)
+    with pytest.raises(FileNotFoundError):
+        storage.open(key)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+import model.models as models
+import services.sync_service as sync_service
+from services.sync_service import SyncService
+
+
+@pytest.fixture
+def db(monkeypatch: pytest.MonkeyPatch) -> Session:
+    monkeypatch.setattr(sync_service, "SAFETY_LAG", timedelta(0))
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _vehicle(db: Session, owner: models.User, plat: str) -> models.Vehicle:
+    vt = db.query(models.VehicleType).first() or models.VehicleType(nama="Mobil")
+    db.add(vt)
+    db.flush()
+    v = models.Vehicle(nama="V", plat=plat, vehicle_type_id=vt.id, status=models.VehicleStatusEnum.active)
+    owner.vehicles.append(v)
+    db.commit()
+    return v
+
+
+def test_delta_sync_returns_changed_and_deleted_ids(db: Session):
+    user = models.User(nip="1", role=models.RoleEnum.pic, nama_lengkap="U", email="u@x", password="x")
+    db.add(user)
+    db.commit()
+    a = _vehicle(db, user, "B 1")
+    b = _vehicle(db, user, "B 2")
+
+    first = SyncService.changes(db, "vehicles", user, limit=1)
+    assert first["changed"] == [a.id] and first["has_more"]
+    second = SyncService.changes(db, "vehicles", user, since=first["watermark"])
+    assert second["changed"] == [b.id] and not second["has_more"]
+
+    b.nama = "Diubah"
+    db.delete(a)
+    db.commit()
+    third = SyncService.changes(db, "vehicles", user, since=second["watermark"])
+    assert third["changed"] == [b.id]
+    assert third["deleted"] == [a.id]
+
+    empty = SyncService.changes(db, "vehicles", user, since=third["watermark"])
+    assert empty["changed"] == [] and empty["deleted"] == []
+
+
+def test_delta_sync_scopes_rows_and_rejects_bad_watermark(db: Session):
+    owner = models.User(nip="1", role=models.RoleEnum.pic, nama_lengkap="A", email="a@x", password="x")
+    other = models.User(nip="2", role=models.RoleEnum.pic, nama_lengkap="B", email="b@x", password="x")
+    db.add_all([owner, other])
+    db.commit()
+    _vehicle(db, owner, "B 1")
+    assert SyncService.changes(db, "vehicles", other)["changed"] == []
+
+    with pytest.raises(HTTPException):
+        SyncService.changes(db, "vehicles", owner, since="bukan-watermark")
+
+
+def _user(db: Session, nip: str, dinas: models.Dinas | None = None) -> models.User:
+    user = models.User(nip=nip, role=models.RoleEnum.pic, nama_lengkap=nip, email=f"{nip}@x", password="x", dinas=dinas)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_deleted_ids_are_scoped_to_owner_and_dinas(db: Session):
+    d1, d2 = models.Dinas(nama="D1"), models.Dinas(nama="D2")
+    db.add_all([d1, d2])
+    owner, same_dinas, other_dinas = _user(db, "1", d1), _user(db, "2", d1), _user(db, "3", d2)
+    vehicle = _vehicle(db, owner, "B 1")
+    vehicle.dinas_id = d1.id
+    db.commit()
+
+    db.delete(vehicle)
+    db.commit()
+    assert SyncService.changes(db, "vehicles", owner)["deleted"] == [vehicle.id]
+    assert SyncService.changes(db, "vehicles", same_dinas)["deleted"] == [vehicle.id]
+    assert SyncService.changes(db, "vehicles", other_dinas)["deleted"] == []
+
+
+def test_rows_leaving_scope_are_reported_as_deleted(db: Session):
+    d1, d2 = models.Dinas(nama="D1"), models.Dinas(nama="D2")
+    db.add_all([d1, d2])
+    owner, kadis = _user(db, "1", d1), _user(db, "2", d1)
+    vehicle = _vehicle(db, owner, "B 1")
+    vehicle.dinas_id = d1.id
+    db.commit()
+    kadis_mark = SyncService.changes(db, "vehicles", kadis)["watermark"]
+    owner_mark = SyncService.changes(db, "vehicles", owner)["watermark"]
+
+    # Pindah dinas: kadis lama kehilangan akses, pemilik masih melihatnya
+    vehicle.dinas_id = d2.id
+    db.commit()
+    kadis_sync = SyncService.changes(db, "vehicles", kadis, since=kadis_mark)
+    assert kadis_sync["changed"] == [] and kadis_sync["deleted"] == [vehicle.id]
+    owner_sync = SyncService.changes(db, "vehicles", owner, since=owner_mark)
+    assert owner_sync["changed"] == [vehicle.id] and owner_sync["deleted"] == []
+
+    # Unassign: pemilik kehilangan akses
+    owner.vehicles.remove(vehicle)
+    db.commit()
+    owner_sync = SyncService.changes(db, "vehicles", owner, since=owner_sync["watermark"])
+    assert owner_sync["deleted"] == [vehicle.id]
+
+
+def test_user_changing_dinas_gets_reset(db: Session):
+    d1, d2 = models.Dinas(nama="D1"), models.Dinas(nama="D2")
+    db.add_all([d1, d2])
+    user = _user(db, "1", d1)
+    mark = SyncService.changes(db, "users", user)["watermark"]
+    assert SyncService.changes(db, "users", user, since=mark)["reset"] is False
+
+    user.dinas_id = d2.id
+    db.commit()
+    result = SyncService.changes(db, "users", user, since=mark)
+    assert result["reset"] is True and result["changed"] == [user.id]
+    assert SyncService.changes(db, "users", user, since=result["watermark"])["reset"] is False
@@ -0,0 +1,80 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+import model.models as models
+from controller.auth import verify_password
+from utils import synthetic_data
+
+END = datetime(2026, 10, 1, tzinfo=timezone.utc)
+CARD = synthetic_data.Cardinality(dinas=3, users=40, vehicles=25, reports=600, submissions=120, years=2)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _count(session: Session, model) -> int:
+    return session.scalar(select(func.count()).select_from(model))
+
+
+def test_generate_counts_and_relations(engine):
+    counts = synthetic_data.generate(engine, CARD, seed=7, batch_size=64, end=END)
+
+    assert counts["users"] == 40 and counts["vehicles"] == 25 and counts["reports"] == 600
+    with Session(engine) as session:
+        assert _count(session, models.Submission) == 120
+        non_pending = session.scalar(
+            select(func.count()).select_from(models.Report).where(models.Report.status != models.ReportStatusEnum.pending)
+        )
+        assert _count(session, models.ReportLog) == 600 + non_pending
+
+        # Report selalu milik pemilik kendaraan dan dinasnya
+        for report in session.scalars(select(models.Report).limit(100)):
+            assert report.user in report.vehicle.owners
+            assert report.dinas_id == report.user.dinas_id
+            ts = report.timestamp.replace(tzinfo=timezone.utc)
+            assert END - timedelta(days=2 * 365 + 3) <= ts <= END
+
+        # Odometer naik monoton mengikuti waktu per kendaraan
+        vehicle_id = session.scalar(
+            select(models.Report.vehicle_id).group_by(models.Report.vehicle_id).order_by(func.count().desc()).limit(1)
+        )
+        odometers = session.scalars(
+            select(models.Report.odometer).where(models.Report.vehicle_id == vehicle_id).order_by(models.Report.timestamp)
+        ).all()
+        assert len(odometers) > 5 and odometers == sorted(odometers)
+
+        # Receiver submission = kadis dinas pembuat
+        sub = session.scalars(select(models.Submission)).first()
+        assert sub.receiver.role == models.RoleEnum.kepala_dinas and sub.receiver.dinas_id == sub.dinas_id
+
+        user = session.scalars(select(models.User).where(models.User.role == models.RoleEnum.pic)).first()
+        assert verify_password(synthetic_data.DEFAULT_PASSWORD, user.password)
+
+
+def test_generate_appends_after_existing_ids(engine):
+    synthetic_data.generate(engine, CARD, seed=1, end=END)
+    extra = synthetic_data.Cardinality(dinas=0, users=0, vehicles=5, reports=50, submissions=10, logs=False)
+    counts = synthetic_data.generate(engine, extra, seed=2, end=END)
+
+    assert counts == {"vehicles": 5, "user_vehicles": 5, "reports": 50, "submissions": 10}
+    with Session(engine) as session:
+        assert _count(session, models.Report) == 650
+        assert _count(session, models.User) == 40
+
+
+def test_generate_rejects_invalid_cardinality(engine):
+    with pytest.raises(ValueError):
+        synthetic_data.generate(engine, synthetic_data.Cardinality(dinas=5, users=3, vehicles=0, reports=0, submissions=0))
+    with pytest.raises(ValueError, match="PIC"):
+        synthetic_data.generate(engine, synthetic_data.PROFILES["demo"])
+    with pytest.raises(ValueError, match="MySQL"):
+        synthetic_data.generate(engine, CARD, method="load-data")
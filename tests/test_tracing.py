@@ -0,0 +1,102 @@
+from __future__ import annotations
+import json
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import controller.auth as auth
+import model.models as models
+from services.vehicle_type_service import VehicleTypeService
+from utils import tracing
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def traced_app():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    SessionTest = sessionmaker(bind=engine)
+
+    def get_db():
+        with SessionTest() as db:
+            yield db
+
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware)
+
+    @app.get("/types/{type_id}")
+    def read_type(type_id: int, db: Session = Depends(get_db)):
+        auth.verify_password("x", "bukan-hash")
+        return {"id": type_id, "found": VehicleTypeService.get(db, type_id) is not None}
+
+    exporter = ListExporter()
+    tracing.install(exporter)
+    tracing.instrument_engine(engine)
+    tracing.instrument_services()
+    tracing.instrument_routes(app)
+    yield TestClient(app), exporter
+    tracing.shutdown()
+
+
+def test_request_produces_span_tree(traced_app):
+    client, exporter = traced_app
+    resp = client.get("/types/3", headers={"X-Request-ID": "req-42"})
+    assert resp.status_code == 200
+    tracing.shutdown()
+
+    spans = {s.name: s for s in exporter.spans}
+    root = spans["GET /types/{type_id}"]
+    assert root.kind == tracing.KIND_SERVER and root.parent_span_id is None
+    assert root.attributes["request.id"] == "req-42"
+    assert root.attributes["http.response.status_code"] == 200
+    assert resp.headers["X-Trace-Id"] == root.trace_id
+
+    handler = spans["handler read_type"]
+    service = spans["VehicleTypeService.get"]
+    sql = spans["SQL SELECT"]
+    assert handler.parent_span_id == root.span_id
+    assert service.parent_span_id == handler.span_id
+    assert sql.parent_span_id == service.span_id and "vehicle_type" in sql.attributes["db.statement"]
+    assert spans["auth.verify_password"].parent_span_id == handler.span_id
+    assert {s.trace_id for s in exporter.spans} == {root.trace_id}
+
+
+def test_traceparent_is_continued_and_unsampled_is_skipped(traced_app):
+    client, exporter = traced_app
+    trace_id, parent_id = "ab" * 16, "cd" * 8
+    client.get("/types/1", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+    client.get("/types/2", headers={"traceparent": f"00-{'ef' * 16}-{parent_id}-00"})
+    tracing.shutdown()
+
+    assert {s.trace_id for s in exporter.spans} == {trace_id}
+    root = next(s for s in exporter.spans if s.kind == tracing.KIND_SERVER)
+    assert root.parent_span_id == parent_id
+
+
+def test_file_exporter_writes_otlp_json(tmp_path):
+    span = tracing.Span(name="x", trace_id="a" * 32, span_id="b" * 16, attributes={"n": 3, "ok": True})
+    span.end_ns = span.start_ns + 1000
+    exporter = tracing.FileSpanExporter(str(tmp_path / "traces.jsonl"), "sibeda-test")
+    exporter.export([span])
+    exporter.shutdown()
+
+    payload = json.loads((tmp_path / "traces.jsonl").read_text().splitlines()[0])
+    resource = payload["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "sibeda-test"}
+    otlp_span = resource["scopeSpans"][0]["spans"][0]
+    assert otlp_span["traceId"] == "a" * 32
+    assert {"key": "n", "value": {"intValue": "3"}} in otlp_span["attributes"]
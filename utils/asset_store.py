@@ -0,0 +1,259 @@
+from __future__ import annotations
+import argparse
+import logging
+import time
+from collections import Counter
+from typing import Dict, Tuple, Type
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, attributes
+
+import model.models as models
+from utils.file_upload import ASSETS_DIR, BLOBS_DIR, TMP_PREFIX
+from utils.storage import StorageBackend, get_storage
+
+logger = logging.getLogger(__name__)
+
+# Kolom yang menyimpan path file di assets/ per model
+ASSET_COLUMNS: Dict[Type[models.Base], Tuple[str, ...]] = {  # type: ignore[valid-type]
+    models.Report: (
+        "vehicle_physical_photo_path",
+        "odometer_photo_path",
+        "invoice_photo_path",
+        "my_pertamina_photo_path",
+        "vehicle_physical_photo_thumb_path",
+        "odometer_photo_thumb_path",
+        "invoice_photo_thumb_path",
+        "my_pertamina_photo_thumb_path",
+    ),
+    models.Vehicle: ("foto_fisik", "foto_fisik_thumb"),
+}
+
+DEFAULT_GRACE_SECONDS = 60 * 60
+
+
+# ---------------- Reference counting ----------------
+
+def _upsert_increment(connection: Connection, path: str, delta: int) -> None:
+    table = models.AssetBlob.__table__
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table).values(path=path, ref_count=delta)
+        stmt = stmt.on_duplicate_key_update(ref_count=table.c.ref_count + delta, updated_at=func.now())
+        connection.execute(stmt)
+    elif dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table).values(path=path, ref_count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.path],
+            set_={"ref_count": table.c.ref_count + delta, "updated_at": func.now()},
+        )
+        connection.execute(stmt)
+    else:
+        result = connection.execute(
+            update(table).where(table.c.path == path).values(ref_count=table.c.ref_count + delta)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(path=path, ref_count=delta))
+
+
+def apply_ref_deltas(connection: Connection, deltas: Dict[str, int]) -> None:
+    """Terapkan perubahan reference count (dalam transaksi flush yang sama)."""
+    table = models.AssetBlob.__table__
+    for path, delta in deltas.items():
+        if not path or delta == 0:
+            continue
+        if delta > 0:
+            _upsert_increment(connection, path, delta)
+        else:
+            connection.execute(
+                update(table).where(table.c.path == path).values(ref_count=table.c.ref_count + delta)
+            )
+
+
+def _after_insert(mapper, connection: Connection, target) -> None:  # type: ignore[no-untyped-def]
+    deltas: Counter[str] = Counter()
+    for col in ASSET_COLUMNS[type(target)]:
+        value = getattr(target, col)
+        if value:
+            deltas[value] += 1
+    apply_ref_deltas(connection, deltas)
+
+
+def _after_update(mapper, connection: Connection, target) -> None:  # type: ignore[no-untyped-def]
+    deltas: Counter[str] = Counter()
+    for col in ASSET_COLUMNS[type(target)]:
+        hist = attributes.get_history(target, col, passive=attributes.PASSIVE_NO_INITIALIZE)
+        for value in hist.added or ():
+            if value:
+                deltas[value] += 1
+        for value in hist.deleted or ():
+            if value:
+                deltas[value] -= 1
+    apply_ref_deltas(connection, deltas)
+
+
+def _before_delete(mapper, connection: Connection, target) -> None:  # type: ignore[no-untyped-def]
+    deltas: Counter[str] = Counter()
+    for col in ASSET_COLUMNS[type(target)]:
+        # Nilai yang tersimpan di DB (di-load jika expired) sebelum row dihapus
+        hist = attributes.get_history(target, col)
+        for value in tuple(hist.unchanged or ()) + tuple(hist.deleted or ()):
+            if value:
+                deltas[value] -= 1
+    apply_ref_deltas(connection, deltas)
+
+
+def _track_old_value(target, value, oldvalue, initiator):  # type: ignore[no-untyped-def]
+    return value
+
+
+for _model, _columns in ASSET_COLUMNS.items():
+    event.listen(_model, "after_insert", _after_insert)
+    event.listen(_model, "after_update", _after_update)
+    event.listen(_model, "before_delete", _before_delete)
+    # active_history: nilai lama di-load saat kolom diganti (misal setelah commit
+    # atribut expired) sehingga decrement tidak terlewat
+    for _col in _columns:
+        event.listen(getattr(_model, _col), "set", _track_old_value, active_history=True, retval=True)
+
+
+def count_references_from_rows(db: Session) -> Counter[str]:
+    """Hitung ulang referensi langsung dari row Report/Vehicle (full scan)."""
+    counts: Counter[str] = Counter()
+    for model_cls, columns in ASSET_COLUMNS.items():
+        stmt = select(*(getattr(model_cls, c) for c in columns)).execution_options(yield_per=1000)
+        for row in db.execute(stmt):
+            for value in row:
+                if value:
+                    counts[value] += 1
+    return counts
+
+
+def rebuild_ref_counts(db: Session) -> int:
+    """Tulis ulang tabel asset_blobs dari referensi aktual. Return jumlah path."""
+    counts = count_references_from_rows(db)
+    table = models.AssetBlob.__table__
+    db.execute(delete(table))
+    rows = [{"path": path, "ref_count": count} for path, count in counts.items()]
+    for i in range(0, len(rows), 1000):
+        db.execute(insert(table), rows[i:i + 1000])
+    db.commit()
+    return len(rows)
+
+
+# ---------------- Garbage collection ----------------
+
+def _release_blob(db: Session, storage: StorageBackend, key: str, cutoff: float) -> bool:
+    """
+    Periksa ulang orphan tepat sebelum dihapus; True bila file boleh dihapus.
+
+    Daftar `referenced` dan mtime dibaca di awal scan, jadi upload ulang konten
+    yang sama di tengah GC (put_file memperbarui mtime, lalu flush menaikkan
+    ref_count) bisa membuat blob dipakai lagi. Row asset_blobs dihapus dulu dengan
+    syarat ref_count <= 0; path yang masih direferensikan tidak ikut terhapus.
+    """
+    current = storage.mtime(key)
+    if current is None or current > cutoff:
+        return False
+    table = models.AssetBlob.__table__
+    released = db.execute(delete(table).where(table.c.path == key, table.c.ref_count <= 0)).rowcount
+    if not released:
+        # Tanpa row sama sekali (upload gagal, atau mode --rebuild) file tetap orphan
+        tracked = db.execute(select(table.c.path).where(table.c.path == key)).first()
+        if tracked is not None:
+            db.rollback()
+            return False
+    db.commit()
+    return True
+
+
+def collect_garbage(
+    db: Session,
+    grace_seconds: int = DEFAULT_GRACE_SECONDS,
+    dry_run: bool = False,
+    rebuild: bool = False,
+) -> Dict[str, int]:
+    """
+    Hapus file di storage backend yang tidak direferensikan row manapun.
+
+    Tanpa rebuild hanya blob store (assets/blobs) yang diperiksa, karena file
+    lama di assets/reports dan assets/vehicles belum tercatat di asset_blobs.
+    File yang lebih baru dari grace period dilewati agar upload yang belum
+    di-commit tidak ikut terhapus; tiap orphan diperiksa ulang sebelum dihapus
+    (lihat `_release_blob`).
+    """
+    if rebuild:
+        tracked = rebuild_ref_counts(db)
+        logger.info(f"Reference count dibangun ulang: {tracked} path")
+
+    table = models.AssetBlob.__table__
+    referenced = {
+        path for (path,) in db.execute(select(table.c.path).where(table.c.ref_count > 0))
+    }
+
+    storage = get_storage()
+    root = ASSETS_DIR if rebuild else BLOBS_DIR
+    cutoff = time.time() - grace_seconds
+    stats = {"scanned": 0, "deleted": 0, "bytes_freed": 0, "temp_deleted": 0}
+
+    for key, mtime, size in storage.iter_files(str(root).replace("\\", "/")):
+        stats["scanned"] += 1
+        if mtime > cutoff:
+            continue
+        name = key.rsplit("/", 1)[-1]
+        temp = name.startswith(TMP_PREFIX) or name.startswith(".")
+        if not temp and key in referenced:
+            continue
+        if not dry_run and not (temp or _release_blob(db, storage, key, cutoff)):
+            continue
+        stats["temp_deleted" if temp else "deleted"] += 1
+        stats["bytes_freed"] += size
+        if not dry_run:
+            storage.delete(key)
+
+    return stats
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Utilitas blob store assets/")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gc = sub.add_parser("gc", help="Hapus file yang tidak direferensikan")
+    gc.add_argument("--dry-run", action="store_true", help="Hanya tampilkan statistik, tanpa menghapus")
+    gc.add_argument("--grace-minutes", type=int, default=DEFAULT_GRACE_SECONDS // 60)
+    gc.add_argument(
+        "--rebuild", action="store_true",
+        help="Hitung ulang reference count dari tabel reports/vehicles dan periksa seluruh assets/",
+    )
+    sub.add_parser("rebuild", help="Hitung ulang reference count dari tabel reports/vehicles")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    from database.database import SessionLocal
+    with SessionLocal() as db:
+        if args.command == "rebuild":
+            tracked = rebuild_ref_counts(db)
+            logger.info(f"Reference count dibangun ulang: {tracked} path")
+            return
+        stats = collect_garbage(
+            db,
+            grace_seconds=args.grace_minutes * 60,
+            dry_run=args.dry_run,
+            rebuild=args.rebuild,
+        )
+        mode = "DRY RUN" if args.dry_run else "GC"
+        logger.info(
+            f"{mode}: {stats['scanned']} file diperiksa, {stats['deleted']} orphan, "
+            f"{stats['temp_deleted']} file sementara, {stats['bytes_freed'] / (1024 * 1024):.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
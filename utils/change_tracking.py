@@ -0,0 +1,96 @@
+from __future__ import annotations
+from typing import Iterable, List, Optional
+
+from sqlalchemy import event, inspect, insert
+from sqlalchemy.engine import Connection
+
+import model.models as models
+
+# Model yang ikut delta sync -> nama entity di tombstone / endpoint /sync/{entity}
+TRACKED_MODELS = {
+    models.Report: "reports",
+    models.Submission: "submissions",
+    models.Vehicle: "vehicles",
+    models.User: "users",
+}
+
+# Kolom pemilik row, mengikuti SyncService._scope (kendaraan: lewat tabel user_vehicles)
+OWNER_COLUMNS = {
+    models.Report: ("user_id",),
+    models.Submission: ("creator_id", "receiver_id"),
+    models.Vehicle: (),
+    models.User: ("id",),
+}
+
+
+def _insert_tombstones(
+    connection: Connection,
+    target,
+    dinas_id: Optional[int] = None,
+    owner_ids: Iterable[Optional[int]] = (),
+) -> None:
+    # Ditulis di koneksi/transaksi yang sama dengan DELETE/UPDATE, jadi ikut rollback bila gagal
+    owners: List[Optional[int]] = sorted({o for o in owner_ids if o is not None}) or [None]
+    if dinas_id is None and owners == [None]:
+        return
+    now = models._utc_now()
+    connection.execute(insert(models.Tombstone.__table__), [
+        {
+            "entity": TRACKED_MODELS[type(target)], "entity_id": target.id,
+            "dinas_id": dinas_id, "user_id": owner, "deleted_at": now,
+        }
+        for owner in owners
+    ])
+
+
+def _owner_ids(target) -> List[Optional[int]]:
+    if isinstance(target, models.Vehicle):
+        # Koleksi sudah dimuat oleh flush untuk menghapus baris user_vehicles-nya
+        return [u.id for u in target.__dict__.get("owners", ())]
+    return [getattr(target, col) for col in OWNER_COLUMNS[type(target)]]
+
+
+def _record_tombstone(mapper, connection, target) -> None:
+    _insert_tombstones(connection, target, target.dinas_id, _owner_ids(target))
+
+
+def _record_scope_exit(mapper, connection, target) -> None:
+    """Row yang pindah dinas / ganti pemilik keluar dari scope lama: beri tombstone di scope itu."""
+    state = inspect(target)
+    old_dinas = state.attrs.dinas_id.history.deleted
+    if old_dinas and old_dinas[0] is not None:
+        _insert_tombstones(connection, target, dinas_id=old_dinas[0])
+    old_owners = [v for col in OWNER_COLUMNS[type(target)] for v in state.attrs[col].history.deleted]
+    if isinstance(target, models.Vehicle):
+        old_owners += [u.id for u in state.attrs.owners.history.deleted]
+    if old_owners:
+        _insert_tombstones(connection, target, owner_ids=old_owners)
+    if isinstance(target, models.User):
+        # Unassign dari sisi user: kendaraan keluar dari scope user ini
+        for vehicle in state.attrs.vehicles.history.deleted:
+            _insert_tombstones(connection, vehicle, owner_ids=[target.id])
+
+
+def _keep_old_value(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+for _model in TRACKED_MODELS:
+    event.listen(_model, "after_delete", _record_tombstone)
+    event.listen(_model, "after_update", _record_scope_exit)
+    # active_history: nilai lama ikut dimuat walau atribut sudah expired (setelah commit),
+    # supaya history.deleted di _record_scope_exit terisi
+    for _col in ("dinas_id", *OWNER_COLUMNS[_model]):
+        event.listen(getattr(_model, _col), "set", _keep_old_value, active_history=True)
+
+
+# Assign/unassign kendaraan hanya mengubah tabel asosiasi user_vehicles; sentuh
+# updated_at kedua sisi agar perubahan kepemilikan ikut terbawa delta sync.
+@event.listens_for(models.User.vehicles, "append")
+@event.listens_for(models.User.vehicles, "remove")
+@event.listens_for(models.Vehicle.owners, "append")
+@event.listens_for(models.Vehicle.owners, "remove")
+def _touch_vehicle_ownership(target, value, initiator) -> None:
+    now = models._utc_now()
+    target.updated_at = now
+    value.updated_at = now
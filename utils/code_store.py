@@ -0,0 +1,453 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import get_settings
+from model import models
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis opsional, hanya untuk backend redis
+    redis = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Kode yang sudah expired tetap disimpan sebentar agar verifikasi bisa
+# membedakan "expired" dan "invalid" (perilaku lama dari tabel SQL)
+EXPIRED_GRACE_SECONDS = 5 * 60
+
+VerifyResult = Tuple[bool, Optional[str]]
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _to_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+@dataclass
+class CodeRecord:
+    """Kode OTP/QR aktif untuk satu user dan purpose."""
+
+    user_id: int
+    purpose: str
+    kode_unik: str
+    expired_at: datetime
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return _to_utc(self.expired_at) < (now or _utc_now())
+
+
+class CodeStore(ABC):
+    """
+    Penyimpanan kode berumur pendek (OTP register, reset password, QR).
+
+    Setiap (purpose, user_id) hanya punya satu kode aktif. Parameter `db`
+    hanya dipakai backend SQL; backend lain mengabaikannya.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def put(self, purpose: str, user_id: int, code: str, ttl_seconds: int, db: Optional[Session] = None) -> CodeRecord:
+        """Simpan kode baru, menggantikan kode lama untuk user dan purpose yang sama."""
+
+    @abstractmethod
+    def get(self, purpose: str, user_id: int, db: Optional[Session] = None) -> Optional[CodeRecord]: ...
+
+    @abstractmethod
+    def verify(
+        self, purpose: str, user_id: int, code: str, consume: bool = False, db: Optional[Session] = None
+    ) -> VerifyResult:
+        """
+        Cek kode dan (jika consume=True) hapus secara atomik.
+
+        Returns:
+            (True, None) jika valid, atau (False, "invalid" | "expired")
+        """
+
+    @abstractmethod
+    def find_user(self, purpose: str, code: str, db: Optional[Session] = None) -> Optional[int]:
+        """Cari pemilik kode aktif (dipakai scan QR)."""
+
+    def purge_expired(self, db: Optional[Session] = None, batch_size: int = 500) -> int:
+        """Hapus kode yang sudah lewat grace period. Return jumlah yang dihapus."""
+        return 0
+
+    def get_or_create(
+        self,
+        purpose: str,
+        user_id: int,
+        factory: Callable[[], str],
+        ttl_seconds: int,
+        db: Optional[Session] = None,
+    ) -> CodeRecord:
+        """Kembalikan kode aktif yang belum expired, atau buat baru."""
+        rec = self.get(purpose, user_id, db=db)
+        if rec is not None and not rec.is_expired():
+            return rec
+        return self.put(purpose, user_id, factory(), ttl_seconds, db=db)
+
+
+# ---------------- In-process (timing wheel) ----------------
+
+class _TimingWheel:
+    """
+    Hashed timing wheel resolusi 1 detik.
+
+    Key dijadwalkan di slot `deadline % slots`; deadline lebih jauh dari satu
+    putaran tetap di slot yang sama dan dicek ulang di putaran berikutnya.
+    Biaya advance O(key di slot yang dilewati), bukan O(semua key).
+    """
+
+    def __init__(self, slots: int = 512):
+        self.slots: List[Set[Tuple[str, int]]] = [set() for _ in range(slots)]
+        self.current = int(time.time())
+
+    def schedule(self, key: Tuple[str, int], deadline: int) -> None:
+        self.slots[deadline % len(self.slots)].add(key)
+
+    def advance(self, now: int) -> List[Tuple[int, Tuple[str, int]]]:
+        """Return (index slot, key) kandidat expired dari slot yang dilewati sejak advance terakhir."""
+        due: List[Tuple[int, Tuple[str, int]]] = []
+        if now <= self.current:
+            return due
+        steps = min(now - self.current, len(self.slots))
+        for tick in range(now - steps + 1, now + 1):
+            idx = tick % len(self.slots)
+            due.extend((idx, key) for key in self.slots[idx])
+        self.current = now
+        return due
+
+
+class MemoryCodeStore(CodeStore):
+    """
+    Kode disimpan di dict dalam proses. Hanya valid untuk deployment satu
+    worker; untuk beberapa worker/instance gunakan backend redis.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, int], CodeRecord] = {}
+        self._by_code: Dict[Tuple[str, str], int] = {}
+        self._wheel = _TimingWheel()
+
+    @staticmethod
+    def _deadline(rec: CodeRecord) -> int:
+        return int(_to_utc(rec.expired_at).timestamp()) + EXPIRED_GRACE_SECONDS
+
+    def _remove(self, key: Tuple[str, int]) -> None:
+        rec = self._entries.pop(key, None)
+        if rec is not None and self._by_code.get((rec.purpose, rec.kode_unik)) == rec.user_id:
+            del self._by_code[(rec.purpose, rec.kode_unik)]
+
+    def _tick(self) -> int:
+        now = int(time.time())
+        removed = 0
+        for idx, key in self._wheel.advance(now):
+            rec = self._entries.get(key)
+            slot = self._wheel.slots[idx]
+            if rec is None:
+                slot.discard(key)
+                continue
+            deadline = self._deadline(rec)
+            if deadline <= now:
+                self._remove(key)
+                slot.discard(key)
+                removed += 1
+            elif deadline % len(self._wheel.slots) != idx:
+                # Kode sudah diganti dan dijadwalkan di slot lain
+                slot.discard(key)
+        return removed
+
+    def put(self, purpose: str, user_id: int, code: str, ttl_seconds: int, db: Optional[Session] = None) -> CodeRecord:
+        rec = CodeRecord(user_id, purpose, code, _utc_now() + timedelta(seconds=ttl_seconds))
+        with self._lock:
+            self._tick()
+            self._remove((purpose, user_id))
+            self._entries[(purpose, user_id)] = rec
+            self._by_code[(purpose, code)] = user_id
+            self._wheel.schedule((purpose, user_id), self._deadline(rec))
+        return rec
+
+    def get(self, purpose: str, user_id: int, db: Optional[Session] = None) -> Optional[CodeRecord]:
+        with self._lock:
+            self._tick()
+            return self._entries.get((purpose, user_id))
+
+    def verify(
+        self, purpose: str, user_id: int, code: str, consume: bool = False, db: Optional[Session] = None
+    ) -> VerifyResult:
+        with self._lock:
+            self._tick()
+            rec = self._entries.get((purpose, user_id))
+            if rec is None or rec.kode_unik != code:
+                return False, "invalid"
+            if rec.is_expired():
+                return False, "expired"
+            if consume:
+                self._remove((purpose, user_id))
+            return True, None
+
+    def find_user(self, purpose: str, code: str, db: Optional[Session] = None) -> Optional[int]:
+        with self._lock:
+            self._tick()
+            user_id = self._by_code.get((purpose, code))
+            if user_id is None:
+                return None
+            rec = self._entries.get((purpose, user_id))
+            return user_id if rec is not None and not rec.is_expired() else None
+
+    def get_or_create(
+        self,
+        purpose: str,
+        user_id: int,
+        factory: Callable[[], str],
+        ttl_seconds: int,
+        db: Optional[Session] = None,
+    ) -> CodeRecord:
+        with self._lock:
+            rec = self._entries.get((purpose, user_id))
+            if rec is not None and not rec.is_expired():
+                return rec
+        return self.put(purpose, user_id, factory(), ttl_seconds)
+
+    def purge_expired(self, db: Optional[Session] = None, batch_size: int = 500) -> int:
+        with self._lock:
+            return self._tick()
+
+
+# ---------------- Redis ----------------
+
+# GET + bandingkan + DEL dalam satu script agar verify-and-consume atomik
+_VERIFY_SCRIPT = """
+local v = redis.call('GET', KEYS[1])
+if not v then return 0 end
+local sep = string.find(v, '|', 1, true)
+local code = string.sub(v, 1, sep - 1)
+local exp = tonumber(string.sub(v, sep + 1))
+if code ~= ARGV[1] then return 0 end
+if exp < tonumber(ARGV[2]) then return -1 end
+if ARGV[3] == '1' then
+    redis.call('DEL', KEYS[1])
+    if redis.call('GET', KEYS[2]) == ARGV[4] then redis.call('DEL', KEYS[2]) end
+end
+return 1
+"""
+
+
+class RedisCodeStore(CodeStore):
+    """Kode disimpan di Redis (atau server kompatibel) dengan TTL native."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "sibeda:code", client=None):  # type: ignore[no-untyped-def]
+        if client is None:
+            if redis is None:
+                raise RuntimeError("redis belum terpasang: pip install redis")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+        self.prefix = prefix
+        self._verify = self.client.register_script(_VERIFY_SCRIPT)
+
+    def _key(self, purpose: str, user_id: int) -> str:
+        return f"{self.prefix}:{purpose}:u:{user_id}"
+
+    def _code_key(self, purpose: str, code: str) -> str:
+        return f"{self.prefix}:{purpose}:c:{code}"
+
+    @staticmethod
+    def _decode(purpose: str, user_id: int, raw: Optional[str]) -> Optional[CodeRecord]:
+        if not raw:
+            return None
+        code, _, exp = raw.partition("|")
+        return CodeRecord(user_id, purpose, code, datetime.fromtimestamp(int(exp), tz=timezone.utc))
+
+    def put(self, purpose: str, user_id: int, code: str, ttl_seconds: int, db: Optional[Session] = None) -> CodeRecord:
+        rec = CodeRecord(user_id, purpose, code, _utc_now() + timedelta(seconds=ttl_seconds))
+        expire = ttl_seconds + EXPIRED_GRACE_SECONDS
+        pipe = self.client.pipeline()
+        pipe.set(self._key(purpose, user_id), f"{code}|{int(rec.expired_at.timestamp())}", ex=expire)
+        pipe.set(self._code_key(purpose, code), str(user_id), ex=expire)
+        pipe.execute()
+        return rec
+
+    def get(self, purpose: str, user_id: int, db: Optional[Session] = None) -> Optional[CodeRecord]:
+        return self._decode(purpose, user_id, self.client.get(self._key(purpose, user_id)))
+
+    def verify(
+        self, purpose: str, user_id: int, code: str, consume: bool = False, db: Optional[Session] = None
+    ) -> VerifyResult:
+        result = self._verify(
+            keys=[self._key(purpose, user_id), self._code_key(purpose, code)],
+            args=[code, int(time.time()), "1" if consume else "0", str(user_id)],
+        )
+        if int(result) == 1:
+            return True, None
+        return False, "expired" if int(result) == -1 else "invalid"
+
+    def find_user(self, purpose: str, code: str, db: Optional[Session] = None) -> Optional[int]:
+        user_id = self.client.get(self._code_key(purpose, code))
+        if user_id is None:
+            return None
+        rec = self.get(purpose, int(user_id))
+        if rec is None or rec.kode_unik != code or rec.is_expired():
+            return None
+        return int(user_id)
+
+
+# ---------------- SQL (tabel unique_code_generators) ----------------
+
+class SqlCodeStore(CodeStore):
+    """Fallback ke tabel unique_code_generators (memakai session request)."""
+
+    name = "sql"
+
+    @staticmethod
+    def _require(db: Optional[Session]) -> Session:
+        if db is None:
+            raise ValueError("SqlCodeStore membutuhkan session database")
+        return db
+
+    @staticmethod
+    def _to_record(row: models.UniqueCodeGenerator) -> CodeRecord:
+        return CodeRecord(
+            user_id=row.user_id,
+            purpose=row.purpose.value if hasattr(row.purpose, "value") else str(row.purpose),
+            kode_unik=row.kode_unik,
+            expired_at=_to_utc(row.expired_at),
+        )
+
+    def put(self, purpose: str, user_id: int, code: str, ttl_seconds: int, db: Optional[Session] = None) -> CodeRecord:
+        db = self._require(db)
+        expired_at = _utc_now() + timedelta(seconds=ttl_seconds)
+        db.query(models.UniqueCodeGenerator).filter(
+            models.UniqueCodeGenerator.user_id == user_id,
+            models.UniqueCodeGenerator.purpose == purpose,
+        ).delete(synchronize_session=False)
+        db.add(models.UniqueCodeGenerator(user_id=user_id, kode_unik=code, purpose=purpose, expired_at=expired_at))
+        db.commit()
+        return CodeRecord(user_id, purpose, code, expired_at)
+
+    def get(self, purpose: str, user_id: int, db: Optional[Session] = None) -> Optional[CodeRecord]:
+        row = self._require(db).query(models.UniqueCodeGenerator).filter(
+            models.UniqueCodeGenerator.user_id == user_id,
+            models.UniqueCodeGenerator.purpose == purpose,
+        ).order_by(models.UniqueCodeGenerator.id.desc()).first()
+        return self._to_record(row) if row else None
+
+    def verify(
+        self, purpose: str, user_id: int, code: str, consume: bool = False, db: Optional[Session] = None
+    ) -> VerifyResult:
+        db = self._require(db)
+        base = db.query(models.UniqueCodeGenerator).filter(
+            models.UniqueCodeGenerator.user_id == user_id,
+            models.UniqueCodeGenerator.purpose == purpose,
+            models.UniqueCodeGenerator.kode_unik == code,
+        )
+        if consume:
+            # DELETE bersyarat: hanya satu request yang bisa memakai kode
+            deleted = base.filter(models.UniqueCodeGenerator.expired_at >= _utc_now()).delete(synchronize_session=False)
+            db.commit()
+            if deleted:
+                return True, None
+        else:
+            row = base.first()
+            if row and not self._to_record(row).is_expired():
+                return True, None
+        return (False, "expired") if base.first() else (False, "invalid")
+
+    def find_user(self, purpose: str, code: str, db: Optional[Session] = None) -> Optional[int]:
+        row = self._require(db).query(models.UniqueCodeGenerator).filter(
+            models.UniqueCodeGenerator.purpose == purpose,
+            models.UniqueCodeGenerator.kode_unik == code,
+        ).order_by(models.UniqueCodeGenerator.id.desc()).first()
+        if row is None or self._to_record(row).is_expired():
+            return None
+        return row.user_id
+
+    def purge_expired(
+        self,
+        db: Optional[Session] = None,
+        batch_size: int = 500,
+        max_batches: int = 100,
+        pause_seconds: float = 0.05,
+    ) -> int:
+        """
+        Hapus row expired dalam batch kecil (SELECT id via index expired_at,
+        lalu DELETE by primary key) agar lock dan undo log tetap pendek.
+        """
+        db = self._require(db)
+        cutoff = _utc_now() - timedelta(seconds=EXPIRED_GRACE_SECONDS)
+        total = 0
+        for _ in range(max_batches):
+            ids = [
+                row_id for (row_id,) in db.query(models.UniqueCodeGenerator.id)
+                .filter(models.UniqueCodeGenerator.expired_at < cutoff)
+                .order_by(models.UniqueCodeGenerator.expired_at.asc())
+                .limit(batch_size)
+                .all()
+            ]
+            if not ids:
+                break
+            total += db.query(models.UniqueCodeGenerator).filter(
+                models.UniqueCodeGenerator.id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.commit()
+            if len(ids) < batch_size:
+                break
+            time.sleep(pause_seconds)
+        return total
+
+
+@lru_cache
+def get_code_store() -> CodeStore:
+    """
+    Backend aktif sesuai CODE_STORE_BACKEND (auto | memory | redis | sql).
+
+    auto: redis jika REDIS_URL diset, selain itu tabel SQL.
+    """
+    settings = get_settings()
+    backend = settings.code_store_backend
+    if backend == "auto":
+        backend = "redis" if settings.redis_url else "sql"
+    if backend == "redis":
+        if not settings.redis_url:
+            raise ValueError("REDIS_URL wajib diisi jika CODE_STORE_BACKEND=redis")
+        return RedisCodeStore(settings.redis_url)
+    if backend == "memory":
+        return MemoryCodeStore()
+    return SqlCodeStore()
+
+
+def purge_expired_codes(batch_size: int = 500) -> int:
+    """
+    Job janitor: hapus kode expired dari backend aktif dan tabel SQL.
+
+    Tabel tetap dibersihkan walaupun backend redis/memory dipakai, karena
+    row lama dari sebelum migrasi backend masih tersimpan di sana.
+    """
+    from database.database import SessionLocal
+
+    store = get_code_store()
+    with SessionLocal() as db:
+        total = SqlCodeStore().purge_expired(db, batch_size=batch_size)
+        if store.name != SqlCodeStore.name:
+            total += store.purge_expired(db, batch_size=batch_size)
+    if total:
+        logger.info(f"Purge kode expired: {total} dihapus")
+    return total
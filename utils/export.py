@@ -0,0 +1,78 @@
+from __future__ import annotations
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from database.database import SessionLocal
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+# Jumlah row yang diambil per fetch dari server-side cursor
+YIELD_PER = 1000
+
+
+def parse_columns(requested: Optional[str], available: Dict[str, Any]) -> List[str]:
+    """`?columns=a,b,c` -> daftar kolom tervalidasi; kosong berarti semua kolom."""
+    if not requested:
+        return list(available)
+    names = [name.strip() for name in requested.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Kolom tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(available)}",
+        )
+    return list(dict.fromkeys(names))
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def stream_rows(
+    build_statement: Callable[[], Any],
+    names: Sequence[str],
+    fmt: str,
+    session_factory: Callable[[], Session] = SessionLocal,
+) -> Iterator[bytes]:
+    """
+    Generator body export: row diambil lewat server-side cursor (stream_results +
+    yield_per) dan diformat per partisi, jadi memori tetap konstan berapapun jumlah row.
+
+    Session dibuka sendiri di dalam generator karena dependency get_db sudah ditutup
+    sebelum StreamingResponse mulai mengirim body.
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        yield buffer.getvalue().encode("utf-8")
+
+    with session_factory() as db:
+        result = db.execute(
+            build_statement().execution_options(stream_results=True, yield_per=YIELD_PER)
+        )
+        for partition in result.partitions():
+            if fmt == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([_plain(v) for v in row] for row in partition)
+                chunk = buffer.getvalue()
+            else:
+                chunk = "".join(
+                    json.dumps(dict(zip(names, map(_plain, row))), ensure_ascii=False) + "\n"
+                    for row in partition
+                )
+            yield chunk.encode("utf-8")
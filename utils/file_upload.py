@@ -1,17 +1,28 @@
-from datetime import datetime
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+import time
 from pathlib import Path
-from typing import Optional
-import uuid
+from typing import BinaryIO, Dict, Optional, Tuple
 from fastapi import UploadFile, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from utils import metrics, tracing
+from utils.storage import get_storage
 
 # Konfigurasi
 ASSETS_DIR = Path("assets")
 REPORTS_DIR = ASSETS_DIR / "reports"
 VEHICLES_DIR = ASSETS_DIR / "vehicles"
+BLOBS_DIR = ASSETS_DIR / "blobs"
+TMP_PREFIX = ".upload-"
 
 # Allowed image extensions
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+CHUNK_SIZE = 1024 * 1024  # 1MB chunks
 
 def validate_image_file(file: UploadFile) -> None:
     """Validasi file gambar"""
@@ -30,71 +41,130 @@ def validate_image_file(file: UploadFile) -> None:
             detail="File must be an image"
         )
 
-def generate_unique_filename(original_filename: str) -> str:
-    """Generate unique filename dengan timestamp dan UUID"""
-    file_ext = Path(original_filename).suffix.lower()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
-    return f"{timestamp}_{unique_id}{file_ext}"
+def blob_path(digest: str, ext: str) -> Path:
+    """Path content-addressed untuk blob: assets/blobs/ab/cd/<sha256><ext>"""
+    return BLOBS_DIR / digest[:2] / digest[2:4] / f"{digest}{ext}"
+
+def normalize_extension(filename: str) -> str:
+    """Ambil ekstensi file dalam huruf kecil (.jpeg diseragamkan menjadi .jpg)"""
+    ext = Path(filename).suffix.lower()
+    return ".jpg" if ext == ".jpeg" else ext
+
+def blob_key(digest: str, ext: str) -> str:
+    """Key storage (dan nilai kolom database) untuk blob"""
+    return str(blob_path(digest, ext)).replace("\\", "/")
+
+def _write_stream_atomic(
+    source: BinaryIO,
+    ext: str,
+    max_size: int,
+) -> Tuple[str, int, str]:
+    """
+    Salin stream upload ke blob store secara atomik (dijalankan di thread pool).
+
+    Data ditulis ke file sementara sambil di-hash (SHA-256) dan dihitung
+    ukurannya per chunk, lalu di-fsync dan diserahkan ke storage backend
+    (rename lokal atau multipart upload ke object store) dengan key berdasarkan
+    hash. File parsial tidak pernah terlihat dengan nama akhir, dan konten yang
+    sama hanya disimpan sekali.
+
+    Returns:
+        (key blob, ukuran byte, hex digest SHA-256)
+    """
+    storage = get_storage()
+    staging = storage.staging_dir()
+    staging.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=staging, prefix=TMP_PREFIX, suffix=".part")
+    tmp_path = Path(tmp_name)
+    hasher = hashlib.sha256()
+    file_size = 0
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := source.read(CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > max_size:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File too large. Maximum size: {max_size / (1024*1024):.0f}MB"
+                    )
+                hasher.update(chunk)
+                buffer.write(chunk)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+        digest = hasher.hexdigest()
+        key = blob_key(digest, ext)
+        storage.put_file(tmp_path, key)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return key, file_size, digest
+
+def store_bytes(data: bytes, ext: str) -> str:
+    """
+    Simpan bytes (misal hasil re-encode gambar) ke blob store.
+
+    Returns:
+        Relative path blob (e.g., "assets/blobs/ab/cd/<sha256>.webp")
+    """
+    key, _size, _digest = _write_stream_atomic(io.BytesIO(data), ext, len(data))
+    return key
 
 async def save_upload_file(
     upload_file: UploadFile,
-    destination_dir: Path,
     max_size: int = MAX_FILE_SIZE
 ) -> str:
     """
-    Save uploaded file dan return relative path
+    Save uploaded file ke blob store dan return relative path
     
+    Nama file adalah SHA-256 dari isinya, sehingga upload ulang foto yang sama
+    tidak menambah file baru. Penulisan ke disk dilakukan di thread pool
+    sehingga event loop tidak terblokir.
+
     Args:
         upload_file: File yang diupload
-        destination_dir: Directory tujuan (relative to project root)
         max_size: Maximum file size in bytes
     
     Returns:
-        Relative path to saved file (e.g., "assets/reports/20251127_abc123.jpg")
+        Relative path to saved file (e.g., "assets/blobs/ab/cd/<sha256>.jpg")
     """
     # Validate
     validate_image_file(upload_file)
     
-    # Check file size
-    file_size = 0
-    chunk_size = 1024 * 1024  # 1MB chunks
-    
-    # Create destination directory if not exists
-    destination_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate unique filename
     if not upload_file.filename:
         raise HTTPException(status_code=400, detail="Filename is required")
+
+    # Tolak lebih awal jika ukuran sudah diketahui dari parser multipart
+    if upload_file.size is not None and upload_file.size > max_size:
+        await upload_file.close()
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size: {max_size / (1024*1024):.0f}MB"
+        )
     
-    unique_filename = generate_unique_filename(upload_file.filename)
-    file_path = destination_dir / unique_filename
+    ext = normalize_extension(upload_file.filename)
     
     # Save file
-    try:
-        with open(file_path, "wb") as buffer:
-            while chunk := await upload_file.read(chunk_size):
-                file_size += len(chunk)
-                if file_size > max_size:
-                    # Remove partial file
-                    buffer.close()
-                    file_path.unlink(missing_ok=True)
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"File too large. Maximum size: {max_size / (1024*1024):.0f}MB"
-                    )
-                buffer.write(chunk)
-    except Exception as e:
-        # Cleanup on error
-        file_path.unlink(missing_ok=True)
-        if isinstance(e, HTTPException):
+    start = time.perf_counter()
+    with tracing.span("file.save_upload", **{"file.extension": ext}) as span:
+        try:
+            key, size, _digest = await run_in_threadpool(
+                _write_stream_atomic, upload_file.file, ext, max_size
+            )
+        except HTTPException:
+            metrics.observe_upload(0, time.perf_counter() - start, ok=False)
             raise
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
-    finally:
-        await upload_file.close()
+        except Exception as e:
+            metrics.observe_upload(0, time.perf_counter() - start, ok=False)
+            raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+        finally:
+            await upload_file.close()
+        if span is not None:
+            span.set_attribute("file.size", size)
+            span.set_attribute("file.key", key)
+    metrics.observe_upload(size, time.perf_counter() - start)
     
-    # Return relative path (for database storage)
-    return str(file_path).replace("\\", "/")
+    # Return key (for database storage)
+    return key
 
 async def save_report_photo(
     upload_file: Optional[UploadFile],
@@ -113,9 +183,34 @@ async def save_report_photo(
     if not upload_file or not upload_file.filename:
         return None
     
-    # Create subdirectory for photo type
-    destination = REPORTS_DIR / photo_type
-    return await save_upload_file(upload_file, destination)
+    return await save_upload_file(upload_file)
+
+async def save_report_photos(photos: Dict[str, Optional[UploadFile]]) -> Dict[str, Optional[str]]:
+    """
+    Save beberapa foto report secara paralel.
+
+    Semua file ditulis bersamaan; jika salah satu gagal, error pertama
+    di-raise. Blob yang sudah tersimpan tidak dihapus di sini karena bisa saja
+    dipakai bersama row lain; blob tanpa referensi dibersihkan oleh GC
+    (python -m utils.asset_store gc).
+
+    Args:
+        photos: Mapping photo_type -> UploadFile (atau None)
+
+    Returns:
+        Mapping photo_type -> relative path (atau None)
+    """
+    photo_types = list(photos.keys())
+    results = await asyncio.gather(
+        *(save_report_photo(photos[t], t) for t in photo_types),
+        return_exceptions=True,
+    )
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        raise errors[0]
+
+    return {t: r for t, r in zip(photo_types, results)}  # type: ignore[misc]
 
 async def save_vehicle_photo(upload_file: Optional[UploadFile]) -> Optional[str]:
     """
@@ -130,20 +225,14 @@ async def save_vehicle_photo(upload_file: Optional[UploadFile]) -> Optional[str]
     if not upload_file or not upload_file.filename:
         return None
     
-    return await save_upload_file(upload_file, VEHICLES_DIR)
+    return await save_upload_file(upload_file)
 
 def delete_file(file_path: Optional[str]) -> None:
-    """Delete file from filesystem"""
+    """Delete file from storage backend"""
     if not file_path:
         return
     
-    try:
-        path = Path(file_path)
-        if path.exists() and path.is_file():
-            path.unlink()
-    except Exception:
-        # Silently fail - file might already be deleted
-        pass
+    get_storage().delete(file_path)
 
 def get_file_url(file_path: Optional[str], base_url: str = "") -> Optional[str]:
     """
@@ -159,6 +248,11 @@ def get_file_url(file_path: Optional[str], base_url: str = "") -> Optional[str]:
     if not file_path:
         return None
     
+    storage = get_storage()
+    if storage.name != "local":
+        # Object store: URL langsung (presigned/CDN), tanpa lewat API
+        return storage.url(file_path)
+
     # Remove leading slash if exists
     clean_path = file_path.lstrip("/")
     
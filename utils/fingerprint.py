@@ -0,0 +1,67 @@
+from __future__ import annotations
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from utils.http_cache import make_etag
+from utils.storage import get_storage
+
+# (ModelLog, kolom FK ke model induk), misal (models.ReportLog, models.ReportLog.report_id)
+LogSpec = Tuple[Any, Any]
+JoinSpec = Tuple[Any, Any]
+
+
+def _log_max(model: Any, log: LogSpec, conditions: Sequence[Any], joins: Iterable[JoinSpec]):
+    log_model, log_fk = log
+    stmt = select(func.max(log_model.id)).select_from(log_model).join(model, log_fk == model.id)
+    for target, onclause in joins:
+        stmt = stmt.join(target, onclause)
+    # Subquery berdiri sendiri; jangan dikorelasikan dengan FROM query luar
+    return stmt.where(*conditions).correlate(None).scalar_subquery()
+
+
+def aggregate_fingerprint(
+    db: Session,
+    model: Any,
+    *conditions: Any,
+    joins: Sequence[JoinSpec] = (),
+    log: Optional[LogSpec] = None,
+) -> Tuple[Any, ...]:
+    """
+    Fingerprint satu set baris dari satu query agregat:
+    (count, sum(id), max(updated_at)[, max(log.id)]).
+
+    count + sum(id) berubah saat baris masuk/keluar dari filter, max(updated_at)
+    saat ada baris yang diubah, dan max(log.id) saat ada riwayat status baru.
+    """
+    columns = [func.count(model.id), func.coalesce(func.sum(model.id), 0), func.max(model.updated_at)]
+    if log is not None:
+        columns.append(_log_max(model, log, conditions, joins))
+    stmt = select(*columns).select_from(model)
+    for target, onclause in joins:
+        stmt = stmt.join(target, onclause)
+    return tuple(db.execute(stmt.where(*conditions)).one())
+
+
+def row_fingerprint(db: Session, model: Any, row_id: int, log: Optional[LogSpec] = None) -> Optional[Tuple[Any, ...]]:
+    """(updated_at[, max(log.id)]) untuk satu baris, atau None bila tidak ada."""
+    columns = [model.updated_at]
+    if log is not None:
+        log_model, log_fk = log
+        columns.append(select(func.max(log_model.id)).where(log_fk == row_id).scalar_subquery())
+    row = db.execute(select(*columns).where(model.id == row_id)).first()
+    return tuple(row) if row is not None else None
+
+
+def fingerprint_etag(namespace: str, fingerprint: Iterable[Any], **params: Any) -> str:
+    """
+    Weak ETag dari fingerprint + parameter request (filter, paging, scope user).
+
+    Response berisi URL foto; bila storage memberi presigned URL, jendela masa
+    berlakunya ikut di tag sehingga 304 tidak mengembalikan URL yang sudah kedaluwarsa.
+    """
+    window = get_storage().url_window()
+    if window is not None:
+        params = {**params, "url_window": window}
+    return make_etag(namespace, *fingerprint, *sorted(params.items()), weak=True)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Data per-user / butuh login: boleh di-cache client, wajib revalidasi ke server
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: object, weak: bool = False) -> str:
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Perbandingan weak sesuai RFC 9110 untuk If-None-Match."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == opaque:
+            return True
+    return False
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str = REVALIDATE_CACHE_CONTROL,
+) -> Optional[Response]:
+    """
+    Pasang ETag/Cache-Control di `response` (parameter Response FastAPI).
+
+    Return response 304 bila If-None-Match cocok; endpoint cukup me-return
+    nilai ini apa adanya. Return None bila body lengkap harus dikirim.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
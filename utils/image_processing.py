@@ -0,0 +1,223 @@
+from __future__ import annotations
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from config import get_settings
+from utils.file_upload import store_bytes
+from utils.storage import get_storage
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover - Pillow opsional
+    Image = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Kolom foto asli -> kolom thumbnail
+REPORT_PHOTO_COLUMNS: Dict[str, str] = {
+    "vehicle_physical_photo_path": "vehicle_physical_photo_thumb_path",
+    "odometer_photo_path": "odometer_photo_thumb_path",
+    "invoice_photo_path": "invoice_photo_thumb_path",
+    "my_pertamina_photo_path": "my_pertamina_photo_thumb_path",
+}
+VEHICLE_PHOTO_COLUMNS: Dict[str, str] = {
+    "foto_fisik": "foto_fisik_thumb",
+}
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def is_available() -> bool:
+    """Pillow terpasang dan pemrosesan gambar diaktifkan."""
+    return Image is not None and settings.image_processing_enabled
+
+
+def _output_format() -> Tuple[str, str]:
+    """Pilih WebP jika build Pillow mendukung, fallback ke JPEG."""
+    if features.check("webp"):
+        return "WEBP", ".webp"
+    return "JPEG", ".jpg"
+
+
+def _encode(img: "Image.Image", fmt: str) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "WEBP":
+        img.save(buf, fmt, quality=WEBP_QUALITY, method=4)
+    else:
+        img.save(buf, fmt, quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+def process_image(file_path: str) -> Optional[Tuple[str, str]]:
+    """
+    Downscale, strip EXIF, re-encode, dan buat thumbnail untuk satu foto.
+
+    Hasil re-encode dan thumbnail disimpan sebagai blob content-addressed;
+    file asli tidak dihapus di sini karena bisa dipakai row lain (dibersihkan
+    GC setelah tidak direferensikan). Orientasi EXIF diterapkan dulu sebelum
+    metadata dibuang agar foto dari HP tidak terbalik.
+
+    Args:
+        file_path: Relative path foto asli (e.g., "assets/blobs/ab/cd/<sha256>.jpg")
+
+    Returns:
+        (path foto hasil, path thumbnail) atau None jika file tidak bisa diproses
+    """
+    if Image is None:
+        return None
+
+    try:
+        source = get_storage().open(file_path)
+    except FileNotFoundError:
+        return None
+
+    fmt, ext = _output_format()
+
+    try:
+        with source, Image.open(source) as raw:
+            img = ImageOps.exif_transpose(raw)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+            if fmt == "JPEG" and img.mode == "RGBA":
+                img = img.convert("RGB")
+
+            # Image baru tanpa info/exif dari file asli
+            img.info = {}
+            max_dim = settings.image_max_dimension
+            img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+            display_bytes = _encode(img, fmt)
+
+            thumb_dim = settings.image_thumb_dimension
+            thumb = img.copy()
+            thumb.thumbnail((thumb_dim, thumb_dim), Image.Resampling.LANCZOS)
+            thumb_bytes = _encode(thumb, fmt)
+    except Exception as e:
+        logger.warning(f"Gagal memproses gambar {file_path}: {e}")
+        return None
+
+    return store_bytes(display_bytes, ext), store_bytes(thumb_bytes, ext)
+
+
+def _process_row(model_name: str, row_id: int) -> None:
+    """Proses semua foto pada satu row yang belum punya thumbnail (jalan di worker)."""
+    # Import lokal untuk menghindari circular import saat startup
+    import model.models as models
+    import utils.asset_store  # noqa: F401  (reference count juga saat jalan dari CLI)
+    from database.database import SessionLocal
+
+    model_cls = getattr(models, model_name)
+    columns = REPORT_PHOTO_COLUMNS if model_name == "Report" else VEHICLE_PHOTO_COLUMNS
+
+    db = SessionLocal()
+    try:
+        row = db.query(model_cls).filter(model_cls.id == row_id).first()
+        if not row:
+            return
+
+        pending = {
+            photo_col: getattr(row, photo_col)
+            for photo_col, thumb_col in columns.items()
+            if getattr(row, photo_col) and not getattr(row, thumb_col)
+        }
+        if not pending:
+            return
+
+        results = {col: process_image(path) for col, path in pending.items()}
+
+        # Reload: foto bisa saja sudah diganti selama diproses (blob hasil yang
+        # tidak terpakai akan dibersihkan GC)
+        db.refresh(row)
+        changed = False
+        for photo_col, result in results.items():
+            if not result:
+                continue
+            display_path, thumb_path = result
+            if getattr(row, photo_col) != pending[photo_col]:
+                continue
+            setattr(row, photo_col, display_path)
+            setattr(row, columns[photo_col], thumb_path)
+            changed = True
+
+        if changed:
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Image processing {model_name}#{row_id} gagal: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.image_workers), thread_name_prefix="image-worker"
+        )
+    return _executor
+
+
+def schedule_report_images(report_id: int) -> None:
+    """Antrekan pemrosesan foto report ke worker pool (tidak memblokir request)."""
+    if is_available():
+        _get_executor().submit(_process_row, "Report", report_id)
+
+
+def schedule_vehicle_image(vehicle_id: int) -> None:
+    """Antrekan pemrosesan foto fisik kendaraan ke worker pool."""
+    if is_available():
+        _get_executor().submit(_process_row, "Vehicle", vehicle_id)
+
+
+def shutdown(wait: bool = True) -> None:
+    """Hentikan worker pool (dipanggil saat shutdown aplikasi)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+
+
+def backfill(batch_size: int = 500) -> int:
+    """Proses ulang semua foto lama yang belum punya thumbnail. Return jumlah row."""
+    import model.models as models
+    from database.database import SessionLocal
+    from sqlalchemy import or_
+
+    total = 0
+    for model_name, columns in (("Report", REPORT_PHOTO_COLUMNS), ("Vehicle", VEHICLE_PHOTO_COLUMNS)):
+        model_cls = getattr(models, model_name)
+        condition = or_(*(
+            (getattr(model_cls, photo_col).isnot(None)) & (getattr(model_cls, thumb_col).is_(None))
+            for photo_col, thumb_col in columns.items()
+        ))
+        last_id = 0
+        while True:
+            with SessionLocal() as db:
+                ids = [
+                    row_id for (row_id,) in db.query(model_cls.id)
+                    .filter(condition, model_cls.id > last_id)
+                    .order_by(model_cls.id.asc())
+                    .limit(batch_size)
+                    .all()
+                ]
+            if not ids:
+                break
+            for row_id in ids:
+                _process_row(model_name, row_id)
+            total += len(ids)
+            last_id = ids[-1]
+            logger.info(f"Backfill {model_name}: {total} row diproses")
+    return total
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if Image is None:
+        raise SystemExit("Pillow belum terpasang: pip install Pillow")
+    count = backfill()
+    logger.info(f"Selesai, {count} row diproses")
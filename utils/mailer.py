@@ -6,6 +6,7 @@ import time
 from email.message import EmailMessage
 from typing import Iterable, Tuple
 from config import get_settings
+from utils import metrics, tracing
 
 logger = logging.getLogger(__name__)
 
@@ -151,11 +152,16 @@ def _otp_templates(kind: str, otp: str) -> Tuple[str, Tuple[str, str]]:
         return subject, (plain, html)
 
 def send_email(subject: str, body_text: str, to: Iterable[str], body_html: str | None = None):
+    to_list = list(to)
+    attributes = {"server.address": get_settings().smtp_host, "email.recipients": len(to_list)}
+    with tracing.span("smtp.send", kind=tracing.KIND_CLIENT, **attributes):
+        return _send_email(subject, body_text, to_list, body_html)
+
+def _send_email(subject: str, body_text: str, to_list: list[str], body_html: str | None = None):
     settings = get_settings()
     if not settings.smtp_host or not settings.mail_from:
         logger.warning("SMTP not configured (SMTP_HOST or MAIL_FROM missing)")
         raise MailSendError("SMTP not configured (SMTP_HOST or MAIL_FROM missing)")
-    to_list = list(to)
     if not to_list:
         raise ValueError("Recipient list empty")
 
@@ -170,6 +176,7 @@ def send_email(subject: str, body_text: str, to: Iterable[str], body_html: str |
     context.check_hostname = False
     context.verify_mode = ssl.CERT_NONE
     
+    sent = False
     try:
         logger.info(f"Sending email to {to_list}: {subject}")
         
@@ -230,6 +237,7 @@ def send_email(subject: str, body_text: str, to: Iterable[str], body_html: str |
                 
                 duration = time.time() - start_time
                 logger.info(f"Email sent successfully to {to_list} in {duration:.2f}s")
+        sent = True
     
     # Exception handling: most specific first, then general
     except smtplib.SMTPAuthenticationError as e:
@@ -248,6 +256,8 @@ def send_email(subject: str, body_text: str, to: Iterable[str], body_html: str |
         duration = time.time() - start_time
         logger.error(f"Email send failed after {duration:.2f}s: {e}", exc_info=True)
         raise MailSendError(str(e)) from e
+    finally:
+        metrics.observe_smtp(time.time() - start_time, sent)
 
 def send_registration_otp(email: str, otp: str):
     try:
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import os
+import time
+import weakref
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Mode multi-proses aktif bila env ini di-set SEBELUM proses start (prometheus_client
+# membacanya saat import). Tiap worker uvicorn menulis nilai ke file mmap di direktori
+# tersebut dan /metrics menggabungkan semuanya.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or None
+UNMATCHED_ROUTE = "<unmatched>"
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_SIZE_BUCKETS = (16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024)
+_QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+HTTP_REQUESTS = Counter(
+    "sibeda_http_requests_total", "Jumlah request HTTP", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "sibeda_http_request_duration_seconds", "Latency request HTTP per template route",
+    ["method", "route"], buckets=_LATENCY_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "sibeda_http_requests_in_progress", "Request HTTP yang sedang diproses",
+    ["method"], multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKOUTS = Counter("sibeda_db_pool_checkouts_total", "Jumlah checkout koneksi dari pool")
+DB_POOL_CHECKED_OUT = Gauge(
+    "sibeda_db_pool_checked_out", "Koneksi pool yang sedang dipakai", multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "sibeda_db_pool_overflow", "Koneksi overflow di atas pool_size", multiprocess_mode="livesum"
+)
+DB_REQUEST_TIME = Histogram(
+    "sibeda_db_request_duration_seconds", "Total waktu query DB per request, per service",
+    ["service"], buckets=_LATENCY_BUCKETS,
+)
+DB_REQUEST_QUERIES = Histogram(
+    "sibeda_db_request_queries", "Jumlah query DB per request, per service",
+    ["service"], buckets=_QUERY_COUNT_BUCKETS,
+)
+
+UPLOAD_BYTES = Counter("sibeda_upload_bytes_total", "Total byte file upload yang disimpan")
+UPLOAD_SIZE = Histogram("sibeda_upload_size_bytes", "Ukuran file upload", buckets=_SIZE_BUCKETS)
+UPLOAD_DURATION = Histogram(
+    "sibeda_upload_duration_seconds", "Durasi menulis file upload ke storage",
+    ["result"], buckets=_LATENCY_BUCKETS,
+)
+
+SMTP_SEND_DURATION = Histogram(
+    "sibeda_smtp_send_duration_seconds", "Latency pengiriman email SMTP",
+    ["result"], buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+CACHE_REQUESTS = Counter(
+    "sibeda_cache_requests_total", "Lookup cache in-process", ["cache", "result"]
+)
+
+JOB_RUNS = Counter("sibeda_job_runs_total", "Eksekusi job periodik", ["job", "result"])
+JOB_DURATION = Histogram(
+    "sibeda_job_duration_seconds", "Durasi job periodik", ["job"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0),
+)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Template route (misal '/report/{id}') dari scope; bukan path mentah agar
+    kardinalitas label tetap kecil. Request yang tidak cocok route mana pun
+    (404, static) digabung ke satu label.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    return UNMATCHED_ROUTE
+
+
+def service_label(route: str) -> str:
+    """Segmen pertama template route ('/report/{id}' -> 'report') = router/service pemilik."""
+    if route == UNMATCHED_ROUTE:
+        return route
+    return route.strip("/").split("/", 1)[0] or "root"
+
+
+def observe_db(route: str, query_count: int, total_ms: float) -> None:
+    service = service_label(route)
+    DB_REQUEST_QUERIES.labels(service).observe(query_count)
+    DB_REQUEST_TIME.labels(service).observe(total_ms / 1000)
+
+
+def observe_upload(size: int, seconds: float, ok: bool = True) -> None:
+    if ok:
+        UPLOAD_BYTES.inc(size)
+        UPLOAD_SIZE.observe(size)
+    UPLOAD_DURATION.labels("ok" if ok else "error").observe(seconds)
+
+
+def observe_smtp(seconds: float, ok: bool) -> None:
+    SMTP_SEND_DURATION.labels("ok" if ok else "error").observe(seconds)
+
+
+def observe_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observe_job(job: str, seconds: float, ok: bool) -> None:
+    JOB_RUNS.labels(job, "ok" if ok else "error").inc()
+    JOB_DURATION.labels(job).observe(seconds)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI murni untuk latency, jumlah dan in-flight request HTTP.
+
+    Dipasang paling luar agar status akhir (termasuk error handler) ikut tercatat.
+    Label route diambil dari scope["route"] yang diisi router FastAPI setelah
+    matching, sehingga prefix bahasa (/en/...) tidak menambah seri baru.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = route_template(scope)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+
+
+_pool_instrumented: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+
+def _sample_overflow(pool) -> None:
+    # Hanya QueuePool yang punya overflow; SQLite (StaticPool/SingletonThreadPool) dilewati
+    overflow = getattr(pool, "overflow", None)
+    if callable(overflow):
+        DB_POOL_OVERFLOW.set(max(0, overflow()))
+
+
+def install_pool_metrics(engine: Engine) -> None:
+    if engine in _pool_instrumented:
+        return
+    _pool_instrumented.add(engine)
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+        _sample_overflow(engine.pool)
+
+    def on_checkin(dbapi_connection, connection_record) -> None:
+        DB_POOL_CHECKED_OUT.dec()
+        _sample_overflow(engine.pool)
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+
+
+def render_latest(registry: Optional[CollectorRegistry] = None) -> Tuple[bytes, str]:
+    """Body text exposition + content type untuk endpoint /metrics."""
+    if registry is None and MULTIPROC_DIR:
+        # Registry baru per scrape: MultiProcessCollector membaca file semua worker
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry or REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Buang file gauge 'live' milik worker yang berhenti (mode multi-proses)."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid or os.getpid())
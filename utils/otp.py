@@ -1,13 +1,14 @@
 from __future__ import annotations
 import random
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 from typing import TYPE_CHECKING
 from model import models    
 from config import get_settings
-import hmac, hashlib, base64, json
+from utils.code_store import CodeRecord, get_code_store
+import hmac, hashlib, base64, json, struct, threading, time
 if TYPE_CHECKING:
-    from model.models import User, UniqueCodeGenerator
+    from model.models import User
 
 
 PurposeEnum = models.PurposeEnum
@@ -88,134 +89,137 @@ def extract_kode_unik_from_qr(qr_input: str) -> str:
     
     return qr_input
 
-def create_password_reset_code(db: Session, user: 'User') -> 'UniqueCodeGenerator':
-    db.query(models.UniqueCodeGenerator).filter(
-        models.UniqueCodeGenerator.user_id == user.id,
-        models.UniqueCodeGenerator.purpose == PurposeEnum.password_reset
-    ).delete()
-    otp = generate_otp()
-    rec = models.UniqueCodeGenerator(
-        user_id=user.id,
-        kode_unik=otp,
-        purpose=PurposeEnum.password_reset,
-        expired_at=_utc_now() + timedelta(minutes=OTP_EXP_MINUTES),
-    )
-    db.add(rec)
-    db.commit()
-    db.refresh(rec)
-    return rec
+def _store_ttl() -> int:
+    return OTP_EXP_MINUTES * 60
 
-def verify_password_reset_code(db: Session, user: 'User', otp: str):
-    rec = db.query(models.UniqueCodeGenerator).filter(
-        models.UniqueCodeGenerator.user_id == user.id,
-        models.UniqueCodeGenerator.purpose == PurposeEnum.password_reset,
-        models.UniqueCodeGenerator.kode_unik == otp,
-    ).first()
-    if not rec:
+# --- Stateless QR token (binary, v1) ---
+# payload: version (1B) | uid (4B) | exp epoch (4B) | nonce (4B), lalu HMAC-SHA256
+# dipotong 16 byte. Hasil base64url 39 karakter, tanpa titik (beda dari token lama).
+QR_TOKEN_VERSION = 1
+_QR_PAYLOAD = struct.Struct(">BII4s")
+_QR_SIG_BYTES = 16
+QR_TOKEN_LENGTH = len(_b64url(b"\0" * (_QR_PAYLOAD.size + _QR_SIG_BYTES)))
+
+
+class _ReplayGuard:
+    """Set token yang sudah dipakai, disimpan sampai token expired (per proses)."""
+
+    def __init__(self, max_entries: int = 100_000):
+        self._used: dict[bytes, int] = {}
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def mark_used(self, token_id: bytes, exp: int) -> bool:
+        """Return False jika token sudah pernah dipakai."""
+        now = int(time.time())
+        with self._lock:
+            if token_id in self._used:
+                return False
+            if len(self._used) >= self.max_entries:
+                self._used = {k: v for k, v in self._used.items() if v >= now}
+                if len(self._used) >= self.max_entries:
+                    # Penuh oleh token yang masih aktif: buang yang paling cepat expired
+                    for k in sorted(self._used, key=self._used.__getitem__)[: self.max_entries // 10]:
+                        del self._used[k]
+            self._used[token_id] = exp
+            return True
+
+
+_qr_replay_guard = _ReplayGuard()
+
+
+def is_stateless_qr_token(value: str) -> bool:
+    return len(value) == QR_TOKEN_LENGTH and "." not in value
+
+
+def encode_stateless_qr_token(user_id: int, now: int | None = None) -> tuple[str, datetime]:
+    """
+    Buat token QR bertanda tangan tanpa menyimpan apapun di server.
+
+    Token deterministik per window TTL sehingga polling /qr/my menghasilkan
+    token (dan gambar QR) yang sama sampai window berganti. Masa berlaku
+    token antara satu dan dua kali TTL.
+
+    Returns:
+        (token, waktu expired)
+    """
+    ttl = _store_ttl()
+    now = int(time.time()) if now is None else now
+    window_start = now - now % ttl
+    exp = window_start + 2 * ttl
+    nonce = hmac.new(_QR_SECRET, struct.pack(">II", user_id, window_start), hashlib.sha256).digest()[:4]
+    payload = _QR_PAYLOAD.pack(QR_TOKEN_VERSION, user_id, exp, nonce)
+    sig = hmac.new(_QR_SECRET, payload, hashlib.sha256).digest()[:_QR_SIG_BYTES]
+    return _b64url(payload + sig), datetime.fromtimestamp(exp, tz=timezone.utc)
+
+def decode_stateless_qr_token(token: str) -> tuple[bool, str | None, int | None]:
+    """
+    Validasi token QR stateless (satu HMAC, tanpa query).
+
+    Returns:
+        (ok, reason "invalid" | "expired", user id)
+    """
+    try:
+        raw = _b64url_decode(token)
+    except Exception:
+        return False, "invalid", None
+    if len(raw) != _QR_PAYLOAD.size + _QR_SIG_BYTES:
+        return False, "invalid", None
+    payload, sig = raw[:_QR_PAYLOAD.size], raw[_QR_PAYLOAD.size:]
+    expected = hmac.new(_QR_SECRET, payload, hashlib.sha256).digest()[:_QR_SIG_BYTES]
+    if not hmac.compare_digest(sig, expected):
+        return False, "invalid", None
+    version, uid, exp, _nonce = _QR_PAYLOAD.unpack(payload)
+    if version != QR_TOKEN_VERSION:
+        return False, "invalid", None
+    if exp < int(time.time()):
+        return False, "expired", uid
+    return True, None, uid
+
+def consume_stateless_qr_token(token: str, user_id: int) -> tuple[bool, str | None]:
+    """Validasi token untuk user tertentu dan tandai terpakai (anti replay)."""
+    ok, reason, uid = decode_stateless_qr_token(token)
+    if not ok:
+        return False, reason
+    if uid != user_id:
+        return False, "invalid"
+    raw = _b64url_decode(token)
+    _v, _uid, exp, _nonce = _QR_PAYLOAD.unpack(raw[:_QR_PAYLOAD.size])
+    if not _qr_replay_guard.mark_used(raw[:_QR_PAYLOAD.size], exp):
         return False, "invalid"
-    now = _utc_now()
-    exp_val = getattr(rec, "expired_at", None)
-    if isinstance(exp_val, datetime):
-        if _to_utc(exp_val) < now:
-            return False, "expired"
-    else:
-        
-        return False, "expired"
     return True, None
 
+def create_password_reset_code(db: Session, user: 'User') -> CodeRecord:
+    return get_code_store().put(PurposeEnum.password_reset.value, int(user.id), generate_otp(), _store_ttl(), db=db)
+
+def verify_password_reset_code(db: Session, user: 'User', otp: str):
+    return get_code_store().verify(PurposeEnum.password_reset.value, int(user.id), otp, db=db)
+
 def consume_password_reset_code(db: Session, user: 'User', otp: str):
-    db.query(models.UniqueCodeGenerator).filter(
-        models.UniqueCodeGenerator.user_id == user.id,
-        models.UniqueCodeGenerator.purpose == PurposeEnum.password_reset,
-        models.UniqueCodeGenerator.kode_unik == otp,
-    ).delete()
-    db.commit()
-
-def create_account_verification_code(db: Session, user: 'User') -> 'UniqueCodeGenerator':
-    db.query(models.UniqueCodeGenerator).filter(
-        models.UniqueCodeGenerator.user_id == user.id,
-        models.UniqueCodeGenerator.purpose == PurposeEnum.register
-    ).delete()
-    otp = generate_otp()
-    rec = models.UniqueCodeGenerator(
-        user_id=user.id,
-        kode_unik=otp,
-        purpose=PurposeEnum.register,
-        expired_at=_utc_now() + timedelta(minutes=OTP_EXP_MINUTES),
-    )
-    db.add(rec)
-    db.commit()
-    db.refresh(rec)
-    return rec
+    """Verifikasi dan hapus kode secara atomik (hanya satu request yang berhasil)."""
+    return get_code_store().verify(PurposeEnum.password_reset.value, int(user.id), otp, consume=True, db=db)
+
+def create_account_verification_code(db: Session, user: 'User') -> CodeRecord:
+    return get_code_store().put(PurposeEnum.register.value, int(user.id), generate_otp(), _store_ttl(), db=db)
 
 def verify_account_verification_code(db: Session, user: 'User', otp: str):
-    rec = db.query(models.UniqueCodeGenerator).filter(
-        models.UniqueCodeGenerator.user_id == user.id,
-        models.UniqueCodeGenerator.purpose == PurposeEnum.register,
-        models.UniqueCodeGenerator.kode_unik == otp,
-    ).first()
-    if not rec:
-        return False, "invalid"
-    now = _utc_now()
-    exp_val = getattr(rec, "expired_at", None)
-    if isinstance(exp_val, datetime):
-        if _to_utc(exp_val) < now:
-            return False, "expired"
-    else:
-        return False, "expired"
-    return True, None
+    return get_code_store().verify(PurposeEnum.register.value, int(user.id), otp, db=db)
 
 def consume_account_verification_code(db: Session, user: 'User', otp: str):
-    db.query(models.UniqueCodeGenerator).filter(
-        models.UniqueCodeGenerator.user_id == user.id,
-        models.UniqueCodeGenerator.purpose == PurposeEnum.register,
-        models.UniqueCodeGenerator.kode_unik == otp,
-    ).delete()
-    db.commit()
+    """Verifikasi dan hapus kode secara atomik (hanya satu request yang berhasil)."""
+    return get_code_store().verify(PurposeEnum.register.value, int(user.id), otp, consume=True, db=db)
 
 # ---------------- QR Code (Purpose: otp) ----------------
-def get_or_create_qr_code(db: Session, user: 'User') -> 'UniqueCodeGenerator':
-  
-    now = _utc_now()
-    rec = db.query(models.UniqueCodeGenerator).filter(
-        models.UniqueCodeGenerator.user_id == user.id,
-        models.UniqueCodeGenerator.purpose == PurposeEnum.otp,
-    ).order_by(models.UniqueCodeGenerator.id.desc()).first()
-    if rec is not None:
-        exp_val = getattr(rec, "expired_at", None)
-        if isinstance(exp_val, datetime) and _to_utc(exp_val) > now:
-            return rec
-    # else create new
-    new_rec = models.UniqueCodeGenerator(
-        user_id=user.id,
-        kode_unik=generate_otp(),
-        purpose=PurposeEnum.otp,
-        expired_at=now + timedelta(minutes=OTP_EXP_MINUTES),
-    )
-    db.add(new_rec)
-    db.commit()
-    db.refresh(new_rec)
-    return new_rec
+def get_or_create_qr_code(db: Session, user: 'User') -> CodeRecord:
+    return get_code_store().get_or_create(PurposeEnum.otp.value, int(user.id), generate_otp, _store_ttl(), db=db)
 
 def verify_qr_code(db: Session, user: 'User', code: str):
-    rec = db.query(models.UniqueCodeGenerator).filter(
-        models.UniqueCodeGenerator.user_id == user.id,
-        models.UniqueCodeGenerator.purpose == PurposeEnum.otp,
-        models.UniqueCodeGenerator.kode_unik == code,
-    ).first()
-    if not rec:
-        return False, "invalid"
-    if isinstance(rec.expired_at, datetime):
-        if _to_utc(rec.expired_at) < _utc_now():
-            return False, "expired"
-    else:
-        return False, "expired"
-    return True, None
+    return get_code_store().verify(PurposeEnum.otp.value, int(user.id), code, db=db)
+
+def consume_qr_code(db: Session, user: 'User', code: str):
+    """Verifikasi dan hapus kode QR secara atomik."""
+    return get_code_store().verify(PurposeEnum.otp.value, int(user.id), code, consume=True, db=db)
 
-def consume_qr_code(db: Session, user: 'User', code: str) -> None:
-    db.query(models.UniqueCodeGenerator).filter(
-        models.UniqueCodeGenerator.user_id == user.id,
-        models.UniqueCodeGenerator.purpose == PurposeEnum.otp,
-        models.UniqueCodeGenerator.kode_unik == code,
-    ).delete()
-    db.commit()
\ No newline at end of file
+def find_qr_code_owner(db: Session, code: str) -> int | None:
+    """User id pemilik kode QR aktif, atau None."""
+    return get_code_store().find_user(PurposeEnum.otp.value, code, db=db)
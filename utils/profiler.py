@@ -0,0 +1,221 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAM = "__profile"
+ARTIFACT_SUFFIX = ".collapsed"
+_SAFE_ID_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+# Penanda request yang sedang diprofil; diwarisi thread pool lewat copy context
+_session: contextvars.ContextVar[Optional["StackSampler"]] = contextvars.ContextVar("profile_session", default=None)
+
+
+def _frame_label(frame) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    # co_qualname baru ada di Python 3.11
+    return f"{module}:{getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+
+
+def collapse_stack(frame) -> str:
+    """Stack dari root ke leaf dalam format 'a;b;c' (collapsed stack / flamegraph.pl)."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """
+    Sampling profiler sederhana untuk SATU request.
+
+    Thread sampler membaca sys._current_frames() tiap `interval` detik dan hanya
+    mencatat stack milik request ini:
+    - thread event loop, saat task yang sedang jalan adalah task request ini
+    - thread worker anyio (endpoint/dependency sync) yang sedang menjalankan
+      context berisi session ini
+    Request lain yang berjalan bersamaan di worker yang sama tidak ikut tercatat.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def start(self) -> contextvars.Token:
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._loop_thread = threading.get_ident()
+        token = _session.set(self)
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return token
+
+    def stop(self, token: contextvars.Token) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        _session.reset(token)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if ident == self._loop_thread:
+                    if asyncio.current_task(self._loop) is not self._task:
+                        continue
+                elif not self._runs_session(frame):
+                    continue
+                self.samples[collapse_stack(frame)] += 1
+
+    def _runs_session(self, frame) -> bool:
+        # Worker anyio memanggil context.run(func) dengan variabel lokal `context`
+        while frame is not None:
+            if frame.f_code.co_name == "run":
+                ctx = frame.f_locals.get("context")
+                if isinstance(ctx, contextvars.Context):
+                    return ctx.get(_session) is self
+            frame = frame.f_back
+        return False
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def artifact_path(directory: str, request_id: str) -> Path:
+    return Path(directory) / f"{_SAFE_ID_RE.sub('_', request_id)[:64]}{ARTIFACT_SUFFIX}"
+
+
+def _prune(directory: Path, keep: int) -> None:
+    files = sorted(directory.glob(f"*{ARTIFACT_SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[keep:]:
+        old.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """
+    Profiling on-demand: request dengan header `X-Profile: 1` (atau ?__profile=1)
+    dari token admin dijalankan di bawah StackSampler, lalu hasilnya disimpan
+    sebagai file collapsed stack (speedscope / flamegraph.pl) dengan nama
+    request ID. Response membawa header X-Profile-Id untuk mengambil artifact
+    lewat GET /system/profiles/{id}.
+
+    Saat PROFILING_ENABLED=false middleware ini tidak dipasang sama sekali;
+    saat aktif, request biasa hanya membayar satu lookup header. Header dari
+    non-admin diabaikan, dan hanya satu request yang diprofil per worker.
+    """
+
+    def __init__(self, app: ASGIApp, artifact_dir: str, interval_ms: float = 5.0, max_artifacts: int = 50):
+        self.app = app
+        self.artifact_dir = artifact_dir
+        self.interval = interval_ms / 1000
+        self.max_artifacts = max_artifacts
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope) or not self._is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, self._with_headers(send, {"X-Profile": "busy"}))
+            return
+
+        request_id = scope.get("state", {}).get("request_id") or uuid.uuid4().hex
+        sampler = StackSampler(self.interval)
+        token = sampler.start()
+        try:
+            await self.app(scope, receive, self._with_headers(send, {"X-Profile-Id": request_id}))
+        finally:
+            sampler.stop(token)
+            self._busy.release()
+            self._store(request_id, sampler)
+
+    def _requested(self, scope: Scope) -> bool:
+        for key, value in scope.get("headers", ()):
+            if key == PROFILE_HEADER.encode():
+                return value not in (b"", b"0", b"false")
+        query = scope.get("query_string", b"")
+        return PROFILE_QUERY_PARAM.encode() in query and QueryParams(query).get(PROFILE_QUERY_PARAM) not in (None, "", "0")
+
+    def _is_admin(self, scope: Scope) -> bool:
+        from controller.auth import decode_access_token
+        from model.models import RoleEnum
+
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        claims = decode_access_token(token)
+        return bool(claims) and claims.get("role") == RoleEnum.admin.value
+
+    @staticmethod
+    def _with_headers(send: Send, extra: Dict[str, str]) -> Send:
+        async def wrapped(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in extra.items():
+                    headers[name] = value
+            await send(message)
+        return wrapped
+
+    def _store(self, request_id: str, sampler: StackSampler) -> None:
+        try:
+            path = artifact_path(self.artifact_dir, request_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(sampler.collapsed(), encoding="utf-8")
+            _prune(path.parent, self.max_artifacts)
+            logger.info(
+                f"Profil request {request_id}: {sum(sampler.samples.values())} sample, "
+                f"{sampler.duration * 1000:.1f}ms -> {path}"
+            )
+        except OSError as e:
+            logger.warning(f"Gagal menyimpan profil request {request_id}: {e}")
+
+
+def load_artifact(directory: str, request_id: str) -> Optional[str]:
+    path = artifact_path(directory, request_id)
+    if not path.is_file():
+        return None
+    return path.read_text(encoding="utf-8")
+
+
+def summarize(collapsed: str, top: int = 20) -> Dict[str, Any]:
+    """Ringkasan self-time per fungsi (frame paling atas tiap stack)."""
+    self_counts: Counter = Counter()
+    total = 0
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+        n = int(count)
+        total += n
+        self_counts[stack.rsplit(";", 1)[-1]] += n
+    return {
+        "samples": total,
+        "top_self": [{"frame": f, "samples": n} for f, n in self_counts.most_common(top)],
+    }
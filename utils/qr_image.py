@@ -0,0 +1,400 @@
+"""
+Encoder QR Code pure-Python (byte mode, versi 1-10) dan renderer PNG/SVG.
+
+Cukup untuk token QR aplikasi (39 karakter untuk token stateless, sekitar
+100 karakter untuk token JSON lama) tanpa dependency tambahan.
+"""
+from __future__ import annotations
+import hashlib
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Bits format per level error correction
+EC_FORMAT_BITS = {"L": 1, "M": 0, "Q": 3, "H": 2}
+
+# (EC codeword per blok, [(jumlah blok, data codeword per blok), ...]) per versi
+EC_BLOCKS: Dict[int, Dict[str, Tuple[int, List[Tuple[int, int]]]]] = {
+    1: {"L": (7, [(1, 19)]), "M": (10, [(1, 16)]), "Q": (13, [(1, 13)]), "H": (17, [(1, 9)])},
+    2: {"L": (10, [(1, 34)]), "M": (16, [(1, 28)]), "Q": (22, [(1, 22)]), "H": (28, [(1, 16)])},
+    3: {"L": (15, [(1, 55)]), "M": (26, [(1, 44)]), "Q": (18, [(2, 17)]), "H": (22, [(2, 13)])},
+    4: {"L": (20, [(1, 80)]), "M": (18, [(2, 32)]), "Q": (26, [(2, 24)]), "H": (16, [(4, 9)])},
+    5: {"L": (26, [(1, 108)]), "M": (24, [(2, 43)]), "Q": (18, [(2, 15), (2, 16)]), "H": (22, [(2, 11), (2, 12)])},
+    6: {"L": (18, [(2, 68)]), "M": (16, [(4, 27)]), "Q": (24, [(4, 19)]), "H": (28, [(4, 15)])},
+    7: {"L": (20, [(2, 78)]), "M": (18, [(4, 31)]), "Q": (18, [(2, 14), (4, 15)]), "H": (26, [(4, 13), (1, 14)])},
+    8: {"L": (24, [(2, 97)]), "M": (22, [(2, 38), (2, 39)]), "Q": (22, [(4, 18), (2, 19)]), "H": (26, [(4, 14), (2, 15)])},
+    9: {"L": (30, [(2, 116)]), "M": (22, [(3, 36), (2, 37)]), "Q": (20, [(4, 16), (4, 17)]), "H": (24, [(4, 12), (4, 13)])},
+    10: {"L": (18, [(2, 68), (2, 69)]), "M": (26, [(4, 43), (1, 44)]), "Q": (24, [(6, 19), (2, 20)]), "H": (28, [(6, 15), (2, 16)])},
+}
+
+ALIGNMENT_POSITIONS: Dict[int, List[int]] = {
+    1: [], 2: [6, 18], 3: [6, 22], 4: [6, 26], 5: [6, 30],
+    6: [6, 34], 7: [6, 22, 38], 8: [6, 24, 42], 9: [6, 26, 46], 10: [6, 28, 50],
+}
+
+MAX_VERSION = max(EC_BLOCKS)
+
+
+# ---------------- Reed-Solomon (GF(256), polinomial 0x11D) ----------------
+
+_EXP = [0] * 512
+_LOG = [0] * 256
+_x = 1
+for _i in range(255):
+    _EXP[_i] = _x
+    _LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x100:
+        _x ^= 0x11D
+for _i in range(255, 512):
+    _EXP[_i] = _EXP[_i - 255]
+
+
+def _gf_mul(a: int, b: int) -> int:
+    if a == 0 or b == 0:
+        return 0
+    return _EXP[_LOG[a] + _LOG[b]]
+
+
+def _rs_generator(degree: int) -> List[int]:
+    poly = [1]
+    for i in range(degree):
+        nxt = [0] * (len(poly) + 1)
+        for j, coef in enumerate(poly):
+            nxt[j] ^= coef
+            nxt[j + 1] ^= _gf_mul(coef, _EXP[i])
+        poly = nxt
+    return poly
+
+
+def _rs_remainder(data: Sequence[int], degree: int) -> List[int]:
+    gen = _rs_generator(degree)
+    rem = [0] * degree
+    for byte in data:
+        factor = byte ^ rem[0]
+        rem = rem[1:] + [0]
+        if factor:
+            for i in range(degree):
+                rem[i] ^= _gf_mul(gen[i + 1], factor)
+    return rem
+
+
+# ---------------- Encoding ----------------
+
+def _data_capacity(version: int, ec_level: str) -> int:
+    return sum(n * k for n, k in EC_BLOCKS[version][ec_level][1])
+
+
+def _choose_version(length: int, ec_level: str) -> int:
+    for version in range(1, MAX_VERSION + 1):
+        count_bits = 8 if version <= 9 else 16
+        needed = 4 + count_bits + length * 8
+        if needed <= _data_capacity(version, ec_level) * 8:
+            return version
+    raise ValueError(f"Data terlalu panjang untuk QR versi {MAX_VERSION} level {ec_level}")
+
+
+def _encode_codewords(data: bytes, version: int, ec_level: str) -> List[int]:
+    capacity = _data_capacity(version, ec_level)
+    bits: List[int] = []
+
+    def append(value: int, length: int) -> None:
+        bits.extend((value >> i) & 1 for i in range(length - 1, -1, -1))
+
+    append(0b0100, 4)  # byte mode
+    append(len(data), 8 if version <= 9 else 16)
+    for b in data:
+        append(b, 8)
+    append(0, min(4, capacity * 8 - len(bits)))  # terminator
+    append(0, -len(bits) % 8)
+
+    codewords = [int("".join(map(str, bits[i:i + 8])), 2) for i in range(0, len(bits), 8)]
+    pad = (0xEC, 0x11)
+    while len(codewords) < capacity:
+        codewords.append(pad[(len(codewords) - len(bits) // 8) % 2])
+
+    # Bagi ke blok, hitung EC per blok, lalu interleave
+    ec_len, groups = EC_BLOCKS[version][ec_level]
+    blocks: List[List[int]] = []
+    pos = 0
+    for count, size in groups:
+        for _ in range(count):
+            blocks.append(codewords[pos:pos + size])
+            pos += size
+    ec_blocks = [_rs_remainder(block, ec_len) for block in blocks]
+
+    result: List[int] = []
+    for i in range(max(len(b) for b in blocks)):
+        result.extend(b[i] for b in blocks if i < len(b))
+    for i in range(ec_len):
+        result.extend(b[i] for b in ec_blocks)
+    return result
+
+
+# ---------------- Matrix ----------------
+
+_MASKS = [
+    lambda r, c: (r + c) % 2 == 0,
+    lambda r, c: r % 2 == 0,
+    lambda r, c: c % 3 == 0,
+    lambda r, c: (r + c) % 3 == 0,
+    lambda r, c: (r // 2 + c // 3) % 2 == 0,
+    lambda r, c: (r * c) % 2 + (r * c) % 3 == 0,
+    lambda r, c: ((r * c) % 2 + (r * c) % 3) % 2 == 0,
+    lambda r, c: ((r + c) % 2 + (r * c) % 3) % 2 == 0,
+]
+
+
+class _Matrix:
+    def __init__(self, version: int):
+        self.version = version
+        self.size = version * 4 + 17
+        self.modules = [[False] * self.size for _ in range(self.size)]
+        self.function = [[False] * self.size for _ in range(self.size)]
+
+    def set_function(self, x: int, y: int, dark: bool) -> None:
+        self.modules[y][x] = dark
+        self.function[y][x] = True
+
+    def draw_function_patterns(self) -> None:
+        size = self.size
+        for i in range(size):
+            self.set_function(6, i, i % 2 == 0)
+            self.set_function(i, 6, i % 2 == 0)
+        for cx, cy in ((3, 3), (size - 4, 3), (3, size - 4)):
+            for dy in range(-4, 5):
+                for dx in range(-4, 5):
+                    x, y = cx + dx, cy + dy
+                    if 0 <= x < size and 0 <= y < size:
+                        self.set_function(x, y, max(abs(dx), abs(dy)) not in (2, 4))
+        positions = ALIGNMENT_POSITIONS[self.version]
+        last = len(positions) - 1
+        for i, ax in enumerate(positions):
+            for j, ay in enumerate(positions):
+                if (i, j) in ((0, 0), (0, last), (last, 0)):
+                    continue
+                for dy in range(-2, 3):
+                    for dx in range(-2, 3):
+                        self.set_function(ax + dx, ay + dy, max(abs(dx), abs(dy)) != 1)
+        # Reservasi area format (diisi ulang setelah mask dipilih)
+        self.draw_format_bits("M", 0)
+        if self.version >= 7:
+            rem = self.version
+            for _ in range(12):
+                rem = (rem << 1) ^ ((rem >> 11) * 0x1F25)
+            bits = self.version << 12 | rem
+            for i in range(18):
+                dark = (bits >> i) & 1 == 1
+                a, b = size - 11 + i % 3, i // 3
+                self.set_function(a, b, dark)
+                self.set_function(b, a, dark)
+
+    def draw_format_bits(self, ec_level: str, mask: int) -> None:
+        data = EC_FORMAT_BITS[ec_level] << 3 | mask
+        rem = data
+        for _ in range(10):
+            rem = (rem << 1) ^ ((rem >> 9) * 0x537)
+        bits = (data << 10 | rem) ^ 0x5412
+        size = self.size
+
+        def bit(i: int) -> bool:
+            return (bits >> i) & 1 == 1
+
+        for i in range(6):
+            self.set_function(8, i, bit(i))
+        self.set_function(8, 7, bit(6))
+        self.set_function(8, 8, bit(7))
+        self.set_function(7, 8, bit(8))
+        for i in range(9, 15):
+            self.set_function(14 - i, 8, bit(i))
+        for i in range(8):
+            self.set_function(size - 1 - i, 8, bit(i))
+        for i in range(8, 15):
+            self.set_function(8, size - 15 + i, bit(i))
+        self.set_function(8, size - 8, True)  # dark module
+
+    def draw_codewords(self, codewords: Sequence[int]) -> None:
+        size = self.size
+        total_bits = len(codewords) * 8
+        i = 0
+        right = size - 1
+        while right >= 1:
+            if right == 6:
+                right = 5
+            upward = ((right + 1) & 2) == 0
+            for vert in range(size):
+                y = size - 1 - vert if upward else vert
+                for j in range(2):
+                    x = right - j
+                    if not self.function[y][x] and i < total_bits:
+                        self.modules[y][x] = (codewords[i >> 3] >> (7 - (i & 7))) & 1 == 1
+                        i += 1
+            right -= 2
+
+    def apply_mask(self, mask: int) -> None:
+        cond = _MASKS[mask]
+        for y in range(self.size):
+            row, func = self.modules[y], self.function[y]
+            for x in range(self.size):
+                if not func[x] and cond(y, x):
+                    row[x] = not row[x]
+
+    def penalty(self) -> int:
+        size = self.size
+        m = self.modules
+        score = 0
+        lines = [row for row in m] + [[m[y][x] for y in range(size)] for x in range(size)]
+        finder_a = [True, False, True, True, True, False, True, False, False, False, False]
+        finder_b = finder_a[::-1]
+        for line in lines:
+            run = 1
+            for i in range(1, size):
+                if line[i] == line[i - 1]:
+                    run += 1
+                else:
+                    if run >= 5:
+                        score += run - 2
+                    run = 1
+            if run >= 5:
+                score += run - 2
+            for i in range(size - 10):
+                window = line[i:i + 11]
+                if window == finder_a or window == finder_b:
+                    score += 40
+        for y in range(size - 1):
+            for x in range(size - 1):
+                c = m[y][x]
+                if c == m[y][x + 1] == m[y + 1][x] == m[y + 1][x + 1]:
+                    score += 3
+        dark = sum(sum(row) for row in m)
+        percent = dark * 100 // (size * size)
+        score += abs(percent - 50) // 5 * 10
+        return score
+
+
+def encode(data: str | bytes, ec_level: str = "M", mask: Optional[int] = None) -> List[List[bool]]:
+    """
+    Encode data menjadi matriks QR (True = modul gelap, tanpa quiet zone).
+
+    Args:
+        data: Teks/bytes yang di-encode (byte mode)
+        ec_level: Level error correction L/M/Q/H
+        mask: Paksa mask 0-7 (default: pilih penalty terendah)
+    """
+    raw = data.encode("utf-8") if isinstance(data, str) else data
+    version = _choose_version(len(raw), ec_level)
+    codewords = _encode_codewords(raw, version, ec_level)
+
+    base = _Matrix(version)
+    base.draw_function_patterns()
+    base.draw_codewords(codewords)
+
+    best: Optional[_Matrix] = None
+    best_score = 0
+    for candidate in ([mask] if mask is not None else range(8)):
+        mat = _Matrix(version)
+        mat.modules = [row[:] for row in base.modules]
+        mat.function = base.function
+        mat.apply_mask(candidate)
+        mat.draw_format_bits(ec_level, candidate)
+        score = mat.penalty() if mask is None else 0
+        if best is None or score < best_score:
+            best, best_score = mat, score
+    assert best is not None
+    return best.modules
+
+
+# ---------------- Rendering ----------------
+
+def render_svg(matrix: List[List[bool]], border: int = 4) -> bytes:
+    """Render matriks ke SVG (satu <path>, run horizontal digabung)."""
+    size = len(matrix) + border * 2
+    parts = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < len(row):
+            if row[x]:
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                parts.append(f"M{start + border},{y + border}h{x - start}v1h-{x - start}z")
+            else:
+                x += 1
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" '
+        f'shape-rendering="crispEdges"><rect width="100%" height="100%" fill="#fff"/>'
+        f'<path d="{"".join(parts)}" fill="#000"/></svg>'
+    )
+    return svg.encode("ascii")
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def render_png(matrix: List[List[bool]], scale: int = 8, border: int = 4) -> bytes:
+    """Render matriks ke PNG grayscale 1-bit (tanpa Pillow)."""
+    modules = len(matrix) + border * 2
+    width = modules * scale
+    rows = bytearray()
+    blank = [False] * modules
+    padded = [blank] * border + [[False] * border + row + [False] * border for row in matrix] + [blank] * border
+    for row in padded:
+        # Bit 1 = putih, 0 = hitam
+        bits = "".join(("0" if dark else "1") * scale for dark in row)
+        bits += "1" * (-len(bits) % 8)
+        line = b"\x00" + int(bits, 2).to_bytes(len(bits) // 8, "big")
+        rows.extend(line * scale)
+    header = struct.pack(">IIBBBBB", width, width, 1, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", zlib.compress(bytes(rows), 9))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+class QRImageCache:
+    """LRU terbatas untuk gambar QR yang sudah dirender, berlaku sampai token expired."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[tuple, Tuple[bytes, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[Tuple[bytes, str, float]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[2] <= time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item
+
+    def put(self, key: tuple, body: bytes, expires_at: float) -> Tuple[bytes, str, float]:
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        item = (body, etag, expires_at)
+        with self._lock:
+            self._items[key] = item
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def render(payload: str, fmt: str, scale: int = 8) -> bytes:
+    matrix = encode(payload)
+    if fmt == "svg":
+        return render_svg(matrix)
+    return render_png(matrix, scale=scale)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import model.models as models
+import schemas.schemas as schemas
+from config import get_settings
+from utils import metrics
+from utils.http_cache import make_etag
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedList:
+    items: Tuple[BaseModel, ...]
+    by_id: Dict[int, BaseModel]
+    etag: str
+    loaded_at: float
+
+
+class ReferenceCache:
+    """
+    Cache read-through untuk tabel referensi kecil (dinas, tipe kendaraan, tipe wallet).
+
+    Data disimpan sebagai schema Pydantic yang sudah tervalidasi plus ETag dari
+    isinya. Invalidasi dilakukan oleh mapper event saat ada insert/update/delete
+    (lihat bawah); TTL hanya jaring pengaman untuk perubahan dari worker/proses lain.
+    """
+
+    def __init__(self, name: str, model: Type[Any], schema: Type[BaseModel]):
+        self.name = name
+        self.model = model
+        self.schema = schema
+        self._entry: Optional[CachedList] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, entry: Optional[CachedList]) -> bool:
+        if entry is None:
+            return False
+        ttl = get_settings().reference_cache_ttl_seconds
+        return ttl <= 0 or time.monotonic() - entry.loaded_at < ttl
+
+    def get(self, db: Session) -> CachedList:
+        entry = self._entry
+        if self._is_fresh(entry):
+            metrics.observe_cache(self.name, hit=True)
+            return entry  # type: ignore[return-value]
+        with self._lock:
+            entry = self._entry
+            if self._is_fresh(entry):
+                metrics.observe_cache(self.name, hit=True)
+                return entry  # type: ignore[return-value]
+            metrics.observe_cache(self.name, hit=False)
+            generation = self._generation
+            entry = self._load(db)
+            # Jangan simpan hasil load bila ada invalidasi selama query berjalan
+            if generation == self._generation:
+                self._entry = entry
+            return entry
+
+    def _load(self, db: Session) -> CachedList:
+        rows = db.query(self.model).order_by(self.model.id.asc()).all()
+        items = tuple(self.schema.model_validate(row) for row in rows)
+        payload = json.dumps([item.model_dump(mode="json") for item in items], sort_keys=True)
+        return CachedList(
+            items=items,
+            by_id={item.id: item for item in items},  # type: ignore[attr-defined]
+            etag=make_etag(self.name, payload),
+            loaded_at=time.monotonic(),
+        )
+
+    def list(self, db: Session) -> List[BaseModel]:
+        return list(self.get(db).items)
+
+    def get_by_id(self, db: Session, item_id: int) -> Optional[BaseModel]:
+        return self.get(db).by_id.get(item_id)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._entry = None
+
+
+dinas_cache = ReferenceCache("dinas", models.Dinas, schemas.DinasResponse)
+vehicle_type_cache = ReferenceCache("vehicle_type", models.VehicleType, schemas.VehicleTypeResponse)
+wallet_type_cache = ReferenceCache("wallet_type", models.WalletType, schemas.WalletTypeResponse)
+
+REFERENCE_CACHES: Dict[Type[Any], ReferenceCache] = {
+    cache.model: cache for cache in (dinas_cache, vehicle_type_cache, wallet_type_cache)
+}
+_DIRTY_KEY = "reference_caches_dirty"
+
+
+def warm_reference_caches(db: Session) -> None:
+    for cache in REFERENCE_CACHES.values():
+        try:
+            cache.get(db)
+        except Exception as e:
+            logger.warning(f"Gagal memuat cache referensi {cache.name}: {e}")
+
+
+# --- Invalidasi ---
+# Invalidasi langsung saat flush, lalu sekali lagi setelah commit agar pembaca
+# yang sempat memuat data lama di antara flush dan commit tidak menetap di cache.
+
+def _mark_dirty(mapper, connection, target) -> None:
+    cache = REFERENCE_CACHES[type(target)]
+    cache.invalidate()
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_KEY, set()).add(cache.name)
+
+
+for _model in REFERENCE_CACHES:
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _mark_dirty)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    names = session.info.pop(_DIRTY_KEY, None)
+    if not names:
+        return
+    for cache in REFERENCE_CACHES.values():
+        if cache.name in names:
+            cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_dirty_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
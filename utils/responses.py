@@ -5,18 +5,28 @@ from i18n.messages import get_message, normalize_lang
 
 # Helper untuk menentukan bahasa dari request
 LANG_HEADER = "X-Lang"
+# Hasil detect_lang disimpan di request.state agar handler/exception handler
+# berikutnya pada request yang sama tidak mem-parse ulang query/header
+_STATE_KEY = "resolved_lang"
+
+
+def _resolve_lang(request: Request) -> str:
+    # prioritas: query ?lang= > header X-Lang > prefix path/token claim (request.state.lang) > default
+    lang = request.query_params.get("lang") or request.headers.get(LANG_HEADER)
+    if lang:
+        return normalize_lang(lang)
+    return normalize_lang(getattr(request.state, "lang", None))
 
 
 def detect_lang(request: Request, explicit_lang: str | None = None) -> str:
     if explicit_lang:
         return normalize_lang(explicit_lang)
-    # prioritas: query ?lang= > header X-Lang > token claim (request.state.lang) > default
-    if request.query_params.get("lang"):
-        return normalize_lang(request.query_params.get("lang"))
-    if request.headers.get(LANG_HEADER):
-        return normalize_lang(request.headers.get(LANG_HEADER))
-    state_lang = getattr(request.state, "lang", None)
-    return normalize_lang(state_lang)
+    state = request.state
+    lang = getattr(state, _STATE_KEY, None)
+    if lang is None:
+        lang = _resolve_lang(request)
+        setattr(state, _STATE_KEY, lang)
+    return lang
 
 
 def success_payload(data: Any = None, message_key: str | None = None, lang: str | None = None) -> Dict[str, Any]:
@@ -0,0 +1,121 @@
+from __future__ import annotations
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    # Jumlah kumulatif nilai return job (misal row yang dihapus)
+    total_processed: int = 0
+    last_processed: int = 0
+    last_started_at: Optional[datetime] = None
+    last_duration_ms: float = 0.0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class PeriodicJob:
+    """
+    Job maintenance periodik.
+
+    `func` adalah fungsi sync (dijalankan di thread pool) yang boleh me-return
+    jumlah item yang diproses untuk dicatat di metrics.
+    """
+
+    name: str
+    func: Callable[[], Optional[int]]
+    interval_seconds: float
+    # Variasi acak +/- dari interval agar beberapa worker tidak jalan bersamaan
+    jitter: float = 0.1
+    initial_delay: float = 0.0
+    stats: JobStats = field(default_factory=JobStats)
+
+    def next_delay(self) -> float:
+        spread = self.interval_seconds * self.jitter
+        return max(1.0, self.interval_seconds + random.uniform(-spread, spread))
+
+
+class Scheduler:
+    """Scheduler asyncio sederhana yang dijalankan dari lifespan FastAPI."""
+
+    def __init__(self):
+        self.jobs: Dict[str, PeriodicJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, job: PeriodicJob) -> PeriodicJob:
+        if job.name in self.jobs:
+            raise ValueError(f"Job '{job.name}' sudah terdaftar")
+        self.jobs[job.name] = job
+        return job
+
+    async def run_once(self, job: PeriodicJob) -> None:
+        stats = job.stats
+        stats.last_started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await run_in_threadpool(job.func)
+            stats.last_processed = int(result or 0)
+            stats.total_processed += stats.last_processed
+            stats.last_error = None
+            ok = True
+        except Exception as e:
+            stats.failures += 1
+            stats.last_error = str(e)
+            logger.error(f"Job {job.name} gagal: {e}", exc_info=True)
+        finally:
+            stats.runs += 1
+            stats.last_duration_ms = (time.perf_counter() - start) * 1000
+            metrics.observe_job(job.name, stats.last_duration_ms / 1000, ok)
+
+    async def _loop(self, job: PeriodicJob) -> None:
+        # Delay awal juga diberi jitter agar worker yang start bersamaan tersebar
+        await asyncio.sleep(job.initial_delay + random.uniform(0, job.interval_seconds * job.jitter))
+        while True:
+            await self.run_once(job)
+            await asyncio.sleep(job.next_delay())
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"job:{job.name}"))
+        if self._tasks:
+            logger.info(f"Scheduler aktif: {', '.join(self.jobs)}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "interval_seconds": job.interval_seconds,
+                "runs": job.stats.runs,
+                "failures": job.stats.failures,
+                "total_processed": job.stats.total_processed,
+                "last_processed": job.stats.last_processed,
+                "last_started_at": job.stats.last_started_at.isoformat() if job.stats.last_started_at else None,
+                "last_duration_ms": round(job.stats.last_duration_ms, 2),
+                "last_error": job.stats.last_error,
+            }
+            for name, job in self.jobs.items()
+        }
+
+
+scheduler = Scheduler()
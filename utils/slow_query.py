@@ -0,0 +1,318 @@
+from __future__ import annotations
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.sql_stats import statement_shape
+
+logger = logging.getLogger(__name__)
+
+# Modul yang dianggap "pemanggil" saat mencari fungsi asal query di stack
+CALLER_MODULE_PREFIXES = ("services.", "routers.", "controller.", "utils.")
+_SKIP_CALLER_MODULES = (__name__, "utils.sql_stats", "utils.metrics", "utils.change_tracking")
+# Prefix EXPLAIN per dialect; dialect lain tidak di-EXPLAIN
+_EXPLAIN_PREFIX = {
+    "mysql": "EXPLAIN ",
+    "mariadb": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+_START_KEY = "slow_query_start_time"
+
+
+def fingerprint(shape: str) -> str:
+    return hashlib.sha1(shape.encode("utf-8")).hexdigest()[:16]
+
+
+def _redact_value(value: Any) -> Any:
+    # Nilai parameter bisa berisi NIP, email, hash password -> hanya tipe & panjangnya
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (str, bytes, bytearray)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {k: _redact_value(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: cukup baris pertama + jumlahnya
+            return {"first": redact_parameters(parameters[0]), "rows": len(parameters)}
+        return [_redact_value(v) for v in parameters]
+    return _redact_value(parameters)
+
+
+def find_caller() -> Optional[str]:
+    """Fungsi aplikasi terdekat di stack, misal 'services.report_service:ReportService.list'."""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(CALLER_MODULE_PREFIXES) and module not in _SKIP_CALLER_MODULES:
+            # co_qualname baru ada di Python 3.11
+            where = f"{module}:{getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+            if module.startswith("services."):
+                return where
+            fallback = fallback or where
+        frame = frame.f_back
+    return fallback
+
+
+class SlowQueryRecorder:
+    """
+    Catat statement yang melewati threshold ke file JSON lines (rotating).
+
+    Hook di engine hanya mengukur waktu dan menaruh record ke antrean; EXPLAIN
+    dan penulisan file dikerjakan satu thread background lewat koneksi pool
+    terpisah, sehingga request yang sudah lambat tidak bertambah lambat.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold_ms: float = 200.0,
+        explain: bool = True,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        explain_interval_seconds: float = 60.0,
+        queue_size: int = 256,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_interval_seconds = explain_interval_seconds
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=queue_size)
+        self._last_explain: Dict[str, float] = {}
+        self._worker: Optional[threading.Thread] = None
+        self._local = threading.local()
+        self.dropped = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._log = logging.getLogger(f"{__name__}.file")
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        self._log.addHandler(self._handler)
+
+    # --- hook engine -------------------------------------------------------
+
+    def install(self, engine: Engine) -> None:
+        if not event.contains(engine, "before_cursor_execute", self._before):
+            event.listen(engine, "before_cursor_execute", self._before)
+            event.listen(engine, "after_cursor_execute", self._after)
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if getattr(self._local, "explaining", False):
+            return
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        starts = conn.info.get(_START_KEY)
+        if getattr(self._local, "explaining", False) or not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+        shape = statement_shape(statement)
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "fingerprint": fingerprint(shape),
+            "duration_ms": round(elapsed_ms, 2),
+            "statement": shape,
+            "parameters": redact_parameters(parameters),
+            "rows": cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None,
+            "caller": find_caller(),
+        }
+        explain_args = None
+        if self._should_explain(conn.engine, statement, record["fingerprint"]):
+            explain_args = (conn.engine, statement, parameters)
+        self.submit(record, explain_args)
+
+    def _on_error(self, exception_context) -> None:
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_START_KEY):
+            conn.info[_START_KEY].pop()
+
+    def _should_explain(self, engine: Engine, statement: str, fp: str) -> bool:
+        if not self.explain or engine.dialect.name not in _EXPLAIN_PREFIX:
+            return False
+        # Hanya SELECT: EXPLAIN pada DML di beberapa dialect tetap mengeksekusi statement
+        if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return False
+        now = time.monotonic()
+        if now - self._last_explain.get(fp, float("-inf")) < self.explain_interval_seconds:
+            return False
+        self._last_explain[fp] = now
+        return True
+
+    # --- worker ------------------------------------------------------------
+
+    def submit(self, record: Dict[str, Any], explain_args: Optional[tuple] = None) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((record, explain_args))
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        self._local.explaining = True
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                record, explain_args = item
+                if explain_args is not None:
+                    record["explain"] = self._explain(*explain_args)
+                self._log.info(json.dumps(record, default=str, ensure_ascii=False))
+            except Exception as e:  # worker tidak boleh mati karena satu record
+                logger.warning(f"Slow query log gagal ditulis: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _explain(self, engine: Engine, statement: str, parameters: Any) -> Any:
+        prefix = _EXPLAIN_PREFIX[engine.dialect.name]
+        try:
+            with engine.connect() as conn:
+                result = conn.exec_driver_sql(prefix + statement, parameters)
+                return [dict(row._mapping) for row in result]
+        except Exception as e:
+            return {"error": str(e)}
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Tunggu antrean kosong (dipakai saat shutdown dan di test)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self._handler.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join(timeout=5)
+        self._log.removeHandler(self._handler)
+        self._handler.close()
+
+
+_recorder: Optional[SlowQueryRecorder] = None
+
+
+def install(engine: Engine, path: str, threshold_ms: float, explain: bool = True,
+            max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5) -> SlowQueryRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = SlowQueryRecorder(
+            path, threshold_ms=threshold_ms, explain=explain, max_bytes=max_bytes, backup_count=backup_count,
+        )
+    _recorder.install(engine)
+    return _recorder
+
+
+def shutdown() -> None:
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+# --- CLI: ranking fingerprint ---------------------------------------------
+
+def iter_records(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def log_files(path: str) -> List[str]:
+    """File log aktif + hasil rotasi (path.1, path.2, ...)."""
+    return [p for p in [path, *sorted(glob.glob(f"{glob.escape(path)}.*"))] if Path(p).is_file()]
+
+
+def rank(records: Iterable[Dict[str, Any]], since: Optional[str] = None) -> List[Dict[str, Any]]:
+    groups: Dict[str, Dict[str, Any]] = {}
+    for rec in records:
+        if since and rec.get("ts", "") < since:
+            continue
+        fp = rec.get("fingerprint")
+        if not fp:
+            continue
+        g = groups.get(fp)
+        if g is None:
+            g = groups[fp] = {
+                "fingerprint": fp, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "statement": rec.get("statement"), "callers": set(), "explain": None,
+            }
+        ms = float(rec.get("duration_ms") or 0)
+        g["count"] += 1
+        g["total_ms"] += ms
+        g["max_ms"] = max(g["max_ms"], ms)
+        if rec.get("caller"):
+            g["callers"].add(rec["caller"])
+        if rec.get("explain") is not None:
+            g["explain"] = rec["explain"]
+    ranked = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+    for g in ranked:
+        g["avg_ms"] = g["total_ms"] / g["count"]
+        g["callers"] = sorted(g["callers"])
+    return ranked
+
+
+def main(argv: list[str] | None = None) -> None:
+    from config import get_settings
+
+    parser = argparse.ArgumentParser(description="Ranking slow query log berdasarkan total waktu")
+    parser.add_argument("--file", default=get_settings().slow_query_log_path, help="Path file log JSON lines")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--since", help="Hanya record sejak timestamp ISO ini, misal 2026-10-01")
+    parser.add_argument("--explain", action="store_true", help="Tampilkan EXPLAIN terakhir tiap fingerprint")
+    parser.add_argument("--json", action="store_true", help="Output JSON, bukan tabel")
+    args = parser.parse_args(argv)
+
+    files = log_files(args.file)
+    if not files:
+        raise SystemExit(f"Log tidak ditemukan: {args.file}")
+    ranked = rank(iter_records(files), since=args.since)[: args.top]
+
+    if args.json:
+        print(json.dumps(ranked, default=str, indent=2))
+        return
+    print(f"{'total_ms':>10} {'count':>6} {'avg_ms':>9} {'max_ms':>9}  fingerprint       caller")
+    for g in ranked:
+        callers = ", ".join(g["callers"]) or "-"
+        print(f"{g['total_ms']:>10.1f} {g['count']:>6} {g['avg_ms']:>9.1f} {g['max_ms']:>9.1f}  {g['fingerprint']}  {callers}")
+        print(f"{'':>38}{(g['statement'] or '')[:160]}")
+        if args.explain and g["explain"] is not None:
+            print(f"{'':>38}EXPLAIN: {json.dumps(g['explain'], default=str)[:400]}")
+
+
+if __name__ == "__main__":
+    main()
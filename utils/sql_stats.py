@@ -0,0 +1,89 @@
+from __future__ import annotations
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_IN_LIST_RE = re.compile(r"\(\s*(?:%s|\?|:\w+|%\(\w+\)s)(?:\s*,\s*(?:%s|\?|:\w+|%\(\w+\)s))*\s*\)")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalisasi SQL agar query yang sama dengan parameter berbeda punya satu bentuk."""
+    shape = _SPACE_RE.sub(" ", statement).strip()
+    shape = _IN_LIST_RE.sub("(?)", shape)
+    return _NUMBER_RE.sub("?", shape)
+
+
+@dataclass
+class RequestQueryStats:
+    request_id: Optional[str] = None
+    count: int = 0
+    total_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Bentuk statement yang berulang >= threshold kali (indikasi N+1)."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries"'
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("sql_request_stats", default=None)
+
+
+def begin_request(request_id: Optional[str] = None) -> RequestQueryStats:
+    """
+    Mulai pencatatan untuk request saat ini.
+
+    Object stats disimpan di ContextVar; thread pool (endpoint sync) dan task
+    call_next mewarisi context yang sama sehingga semua query masuk ke object ini.
+    """
+    stats = RequestQueryStats(request_id=request_id)
+    _current.set(stats)
+    return stats
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    stats.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+
+def _handle_error(exception_context) -> None:
+    # Query gagal tidak memicu after_cursor_execute; buang waktu mulai yang tertinggal
+    conn = exception_context.connection
+    if conn is not None and _current.get() is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def install(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import os
+import re
+from pathlib import PurePosixPath
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Scope
+
+from config import get_settings
+from utils.storage import IMMUTABLE_CACHE_CONTROL, content_type_for
+
+settings = get_settings()
+
+# assets/blobs/ab/cd/<sha256>.<ext> -> isi file tidak pernah berubah
+BLOB_NAME_RE = re.compile(r"^blobs/[0-9a-f]{2}/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})\.[a-z0-9]+$")
+# File lama (assets/reports, assets/vehicles) tidak dijamin immutable
+LEGACY_CACHE_CONTROL = "public, max-age=86400"
+
+
+class AssetStaticFiles(StaticFiles):
+    """
+    StaticFiles untuk folder assets/ dengan header cache yang tepat.
+
+    - Blob content-addressed mendapat `Cache-Control: immutable` dan strong
+      ETag berupa hash SHA-256 dari nama file, sehingga client cukup
+      mengirim If-None-Match dan mendapat 304 tanpa body.
+    - Range request dan `http.response.pathsend` (zero-copy di server yang
+      mendukung, misal Granian) ditangani FileResponse Starlette.
+    - Jika ASSETS_ACCEL_REDIRECT_PREFIX diset, response hanya berisi header
+      `X-Accel-Redirect` dan byte file dikirim langsung oleh nginx.
+    """
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        rel_path = self._relative_path(full_path)
+
+        headers = {"Cache-Control": LEGACY_CACHE_CONTROL}
+        match = BLOB_NAME_RE.match(rel_path) if rel_path else None
+        if match:
+            headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": f'"{match.group("digest")}"'}
+
+        accel_prefix = settings.assets_accel_redirect_prefix
+        if accel_prefix and rel_path and status_code == 200:
+            response: Response = Response(
+                status_code=status_code,
+                media_type=content_type_for(rel_path),
+                headers={**headers, "X-Accel-Redirect": f"{accel_prefix.rstrip('/')}/{rel_path}"},
+            )
+            # Tanpa body; nginx yang mengisi Content-Length dan menangani Range
+            del response.headers["content-length"]
+        else:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _relative_path(self, full_path: PathLike) -> str | None:
+        if self.directory is None:
+            return None
+        try:
+            rel = os.path.relpath(os.path.realpath(full_path), os.path.realpath(self.directory))
+        except ValueError:
+            return None
+        return PurePosixPath(*rel.split(os.sep)).as_posix()
@@ -0,0 +1,291 @@
+from __future__ import annotations
+import logging
+import os
+import shutil
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from config import get_settings
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # pragma: no cover - boto3 opsional, hanya untuk backend s3
+    boto3 = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+# Blob content-addressed tidak pernah berubah isinya
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def content_type_for(key: str) -> str:
+    return CONTENT_TYPES.get(Path(key).suffix.lower(), "application/octet-stream")
+
+
+class StorageBackend(ABC):
+    """
+    Driver penyimpanan file assets.
+
+    Key adalah path relatif yang disimpan di database
+    (e.g., "assets/blobs/ab/cd/<sha256>.jpg"), sama untuk semua backend.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def staging_dir(self) -> Path:
+        """Direktori lokal untuk file sementara sebelum di-commit ke storage."""
+
+    @abstractmethod
+    def put_file(self, local_path: Path, key: str) -> None:
+        """Pindahkan/upload file lokal ke key. File lokal dianggap habis dipakai."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def mtime(self, key: str) -> Optional[float]:
+        """Waktu modifikasi terakhir (epoch), atau None jika file tidak ada."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Buka file untuk dibaca. Raise FileNotFoundError jika tidak ada."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def iter_files(self, prefix: str) -> Iterator[Tuple[str, float, int]]:
+        """Iterasi (key, mtime epoch, ukuran byte) untuk semua file di bawah prefix."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """URL yang dikirim ke client untuk mengakses file."""
+
+    def url_window(self) -> Optional[int]:
+        """
+        Nomor jendela waktu URL yang dihasilkan `url()`, atau None bila URL tidak kedaluwarsa.
+        Ikut dimasukkan ke ETag response yang berisi URL file supaya client tidak
+        terus memakai body cache dengan URL yang sudah kedaluwarsa.
+        """
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """File disimpan di disk lokal relatif terhadap working directory."""
+
+    name = "local"
+
+    def staging_dir(self) -> Path:
+        # Harus di filesystem yang sama dengan tujuan agar os.replace atomik
+        from utils.file_upload import BLOBS_DIR
+        return BLOBS_DIR
+
+    def put_file(self, local_path: Path, key: str) -> None:
+        final_path = Path(key)
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        if final_path.exists():
+            # Konten sama sudah ada: buang file sementara, perbarui mtime agar
+            # tidak ikut terhapus oleh GC yang sedang berjalan
+            local_path.unlink(missing_ok=True)
+            os.utime(final_path)
+        else:
+            os.replace(local_path, final_path)
+
+    def exists(self, key: str) -> bool:
+        return Path(key).is_file()
+
+    def mtime(self, key: str) -> Optional[float]:
+        try:
+            return Path(key).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def open(self, key: str) -> BinaryIO:
+        return open(key, "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            path = Path(key)
+            if path.exists() and path.is_file():
+                path.unlink()
+        except Exception:
+            # Silently fail - file might already be deleted
+            pass
+
+    def iter_files(self, prefix: str) -> Iterator[Tuple[str, float, int]]:
+        root = Path(prefix)
+        if not root.exists():
+            return
+        for path in root.rglob("*"):
+            try:
+                if not path.is_file():
+                    continue
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            yield str(path).replace("\\", "/"), st.st_mtime, st.st_size
+
+    def url(self, key: str) -> str:
+        # Tetap path relatif; client menambahkan base URL API (dilayani /assets)
+        return key
+
+
+class S3Storage(StorageBackend):
+    """
+    Object store S3-compatible (AWS S3, MinIO, R2, dll).
+
+    Upload memakai multipart upload boto3 (streaming dari file sementara per
+    part), dan client menerima presigned GET URL atau URL publik/CDN sehingga
+    byte foto tidak lewat worker API.
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        public_base_url: Optional[str] = None,
+        presign_expires: int = 3600,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        client=None,  # type: ignore[no-untyped-def]
+    ):
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("boto3 belum terpasang: pip install boto3")
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region,
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                config=BotoConfig(signature_version="s3v4", s3={"addressing_style": "path" if endpoint_url else "auto"}),
+            )
+        self.client = client
+        self.bucket = bucket
+        self.public_base_url = public_base_url.rstrip("/") if public_base_url else None
+        self.presign_expires = presign_expires
+        self.transfer_config = (
+            TransferConfig(multipart_threshold=multipart_threshold, multipart_chunksize=multipart_threshold)
+            if boto3 is not None else None
+        )
+
+    def staging_dir(self) -> Path:
+        return Path(tempfile.gettempdir())
+
+    def put_file(self, local_path: Path, key: str) -> None:
+        try:
+            if self.exists(key):
+                # Copy ke diri sendiri untuk memperbarui LastModified (grace period GC)
+                self.client.copy_object(
+                    Bucket=self.bucket, Key=key, CopySource={"Bucket": self.bucket, "Key": key},
+                    MetadataDirective="REPLACE", ContentType=content_type_for(key),
+                    CacheControl=IMMUTABLE_CACHE_CONTROL,
+                )
+                return
+            extra = {"ContentType": content_type_for(key), "CacheControl": IMMUTABLE_CACHE_CONTROL}
+            with open(local_path, "rb") as f:
+                kwargs = {"ExtraArgs": extra}
+                if self.transfer_config is not None:
+                    kwargs["Config"] = self.transfer_config
+                self.client.upload_fileobj(f, self.bucket, key, **kwargs)
+        finally:
+            local_path.unlink(missing_ok=True)
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def mtime(self, key: str) -> Optional[float]:
+        head = self._head(key)
+        return head["LastModified"].timestamp() if head is not None else None
+
+    def _head(self, key: str) -> Optional[dict]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def open(self, key: str) -> BinaryIO:
+        # Di-spool ke file sementara agar bisa di-seek (dibutuhkan Pillow)
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(key) from e
+            raise
+        spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        shutil.copyfileobj(body, spool)
+        spool.seek(0)
+        return spool  # type: ignore[return-value]
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            logger.warning(f"Gagal menghapus object {key}: {e}")
+
+    def iter_files(self, prefix: str) -> Iterator[Tuple[str, float, int]]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix.rstrip("/") + "/"):
+            for obj in page.get("Contents", []):
+                yield obj["Key"], obj["LastModified"].timestamp(), obj["Size"]
+
+    def url(self, key: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url}/{key}"
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=self.presign_expires
+        )
+
+    def url_window(self) -> Optional[int]:
+        if self.public_base_url:
+            return None
+        # Setengah masa berlaku: body yang di-cache masih punya URL valid minimal separuh expiry
+        return int(time.time() // max(1, self.presign_expires // 2))
+
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    """Backend storage aktif sesuai STORAGE_BACKEND (local | s3)."""
+    settings = get_settings()
+    if settings.storage_backend == "s3":
+        if not settings.s3_bucket:
+            raise ValueError("S3_BUCKET wajib diisi jika STORAGE_BACKEND=s3")
+        return S3Storage(
+            bucket=settings.s3_bucket,
+            endpoint_url=settings.s3_endpoint_url,
+            region=settings.s3_region,
+            access_key=settings.s3_access_key,
+            secret_key=settings.s3_secret_key,
+            public_base_url=settings.s3_public_base_url,
+            presign_expires=settings.s3_presign_expires,
+            multipart_threshold=settings.s3_multipart_threshold_mb * 1024 * 1024,
+        )
+    return LocalStorage()
+
+
+def public_url(key: Optional[str]) -> Optional[str]:
+    """Map key yang tersimpan di database ke URL untuk client."""
+    if not key:
+        return key
+    return get_storage().url(key)
@@ -0,0 +1,428 @@
+from __future__ import annotations
+import functools
+import importlib
+import inspect
+import json
+import logging
+import pkgutil
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.sql_stats import statement_shape
+
+logger = logging.getLogger(__name__)
+
+# Nilai enum mengikuti proto OTLP (trace.proto)
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_SPAN_STACK_KEY = "trace_sql_spans"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    kind: int = KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: int = STATUS_UNSET
+    status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"[:500]
+        self.attributes["exception.type"] = type(exc).__name__
+
+    def end(self) -> None:
+        if not self.end_ns:
+            self.end_ns = time.time_ns()
+            if _tracer is not None:
+                _tracer.processor.on_end(self)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_span_id:
+            data["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            data["status"]["message"] = self.status_message
+        return data
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        v = {"boolValue": value}
+    elif isinstance(value, int):
+        v = {"intValue": str(value)}
+    elif isinstance(value, float):
+        v = {"doubleValue": value}
+    else:
+        v = {"stringValue": str(value)}
+    return {"key": key, "value": v}
+
+
+def otlp_payload(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """Body ExportTraceServiceRequest (OTLP/JSON) untuk file maupun OTLP/HTTP."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+            "scopeSpans": [{"scope": {"name": "sibeda"}, "spans": [s.to_otlp() for s in spans]}],
+        }]
+    }
+
+
+# --- exporter ---------------------------------------------------------------
+
+class FileSpanExporter:
+    """Satu baris OTLP/JSON per batch (bisa dibaca receiver otlpjsonfile OpenTelemetry Collector)."""
+
+    def __init__(self, path: str, service_name: str, max_bytes: int = 50 * 1024 * 1024, backup_count: int = 3):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.service_name = service_name
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(otlp_payload(spans, self.service_name), separators=(",", ":"))
+        self._handler.emit(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+
+    def shutdown(self) -> None:
+        self._handler.close()
+
+
+class OtlpHttpSpanExporter:
+    """POST OTLP/JSON ke collector (misal http://localhost:4318/v1/traces), tanpa SDK tambahan."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.url = endpoint.rstrip("/")
+        if not self.url.endswith("/v1/traces"):
+            self.url += "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        body = json.dumps(otlp_payload(spans, self.service_name)).encode("utf-8")
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            resp.read()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BatchSpanProcessor:
+    """Kumpulkan span yang selesai dan export di thread background per batch."""
+
+    def __init__(self, exporter, max_batch: int = 256, flush_interval: float = 2.0, queue_size: int = 4096):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=queue_size)
+        self._worker = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._worker.start()
+        self.dropped = 0
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.flush_interval
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (stop or len(batch) >= self.max_batch or time.monotonic() >= deadline):
+                self._export(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+    def _export(self, batch: List[Span]) -> None:
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            logger.warning(f"Export {len(batch)} span gagal: {e}")
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._worker.join(timeout=10)
+        self.exporter.shutdown()
+
+
+# --- tracer & context -------------------------------------------------------
+
+@dataclass
+class Tracer:
+    processor: BatchSpanProcessor
+    sample_ratio: float = 1.0
+
+
+_tracer: Optional[Tracer] = None
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Span anak dari span aktif. Tanpa span aktif (tracing mati, request tidak
+    ter-sample, atau di luar request) tidak ada yang dibuat.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(
+        name=name, trace_id=parent.trace_id, span_id=secrets.token_hex(8),
+        parent_span_id=parent.span_id, kind=kind,
+        attributes={k: v for k, v in attributes.items() if v is not None},
+    )
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def traced(name: str, func: Callable, **attributes: Any) -> Callable:
+    """Bungkus fungsi sync/async agar setiap panggilan menjadi span."""
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return await func(*args, **kwargs)
+            with span(name, **attributes):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _current_span.get() is None:
+            return func(*args, **kwargs)
+        with span(name, **attributes):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple]:
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1
+
+
+# --- instrumentasi ----------------------------------------------------------
+
+class TracingMiddleware:
+    """
+    Span SERVER per request. Melanjutkan trace dari header `traceparent` (W3C),
+    memakai X-Request-ID yang ada (atau membuatnya, lalu menyuntikkan ke header
+    request agar RequestLoggingMiddleware memakai ID yang sama), dan menambahkan
+    X-Trace-Id ke response.
+    """
+
+    def __init__(self, app: ASGIApp, request_id_header: str = "X-Request-ID"):
+        self.app = app
+        self.request_id_header = request_id_header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _tracer is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or ())
+        request_id = headers.get(self.request_id_header, b"").decode("latin-1")
+        if not request_id:
+            request_id = uuid.uuid4().hex
+            scope["headers"] = [*scope.get("headers", ()), (self.request_id_header, request_id.encode("latin-1"))]
+
+        parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        if parent is not None:
+            trace_id, parent_span_id, sampled = parent
+        else:
+            trace_id, parent_span_id = secrets.token_hex(16), None
+            sampled = random.random() < _tracer.sample_ratio
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        root = Span(
+            name=f"{scope['method']} {scope.get('path', '')}",
+            trace_id=trace_id, span_id=secrets.token_hex(8), parent_span_id=parent_span_id,
+            kind=KIND_SERVER,
+            attributes={"http.request.method": scope["method"], "url.path": scope.get("path", ""), "request.id": request_id},
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = STATUS_ERROR
+                MutableHeaders(scope=message)["X-Trace-Id"] = trace_id
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.name = f"{scope['method']} {route}"
+                root.set_attribute("http.route", route)
+            root.end()
+
+
+def instrument_services(package: str = "services") -> int:
+    """Bungkus setiap method publik kelas *Service di package `services` menjadi span."""
+    count = 0
+    pkg = importlib.import_module(package)
+    for info in pkgutil.iter_modules(pkg.__path__):
+        module = importlib.import_module(f"{package}.{info.name}")
+        for cls_name, cls in vars(module).items():
+            if not (inspect.isclass(cls) and cls_name.endswith("Service") and cls.__module__ == module.__name__):
+                continue
+            for attr, raw in list(vars(cls).items()):
+                if attr.startswith("_") or getattr(raw, "__traced__", False):
+                    continue
+                if isinstance(raw, staticmethod):
+                    wrapped = staticmethod(traced(f"{cls_name}.{attr}", raw.__func__, **{"code.namespace": cls_name}))
+                elif isinstance(raw, classmethod):
+                    wrapped = classmethod(traced(f"{cls_name}.{attr}", raw.__func__, **{"code.namespace": cls_name}))
+                elif inspect.isfunction(raw):
+                    wrapped = traced(f"{cls_name}.{attr}", raw, **{"code.namespace": cls_name})
+                else:
+                    continue
+                wrapped.__traced__ = True
+                setattr(cls, attr, wrapped)
+                count += 1
+    return count
+
+
+def instrument_routes(app) -> int:
+    """Span 'handler' di sekitar fungsi endpoint; selisih dengan span SERVER = validasi & serialisasi."""
+    from fastapi.routing import APIRoute
+
+    count = 0
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "__traced__", False):
+            call = traced(f"handler {route.name}", route.dependant.call, **{"code.function": route.name})
+            call.__traced__ = True
+            route.dependant.call = call
+            count += 1
+    return count
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    parent = _current_span.get()
+    if parent is None:
+        return
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    child = Span(
+        name=f"SQL {keyword}", trace_id=parent.trace_id, span_id=secrets.token_hex(8),
+        parent_span_id=parent.span_id, kind=KIND_CLIENT,
+        attributes={"db.system": conn.engine.dialect.name, "db.statement": statement_shape(statement)[:2000]},
+    )
+    conn.info.setdefault(_SPAN_STACK_KEY, []).append(child)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stack = conn.info.get(_SPAN_STACK_KEY)
+    if stack:
+        child = stack.pop()
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            child.set_attribute("db.rows", cursor.rowcount)
+        child.end()
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    stack = conn.info.get(_SPAN_STACK_KEY) if conn is not None else None
+    if stack:
+        child = stack.pop()
+        child.record_exception(exception_context.original_exception)
+        child.end()
+
+
+def instrument_engine(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def install(exporter, sample_ratio: float = 1.0) -> Tracer:
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(processor=BatchSpanProcessor(exporter), sample_ratio=sample_ratio)
+    return _tracer
+
+
+def shutdown() -> None:
+    global _tracer
+    if _tracer is not None:
+        _tracer.processor.shutdown()
+        _tracer = None